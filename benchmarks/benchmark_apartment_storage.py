@@ -0,0 +1,109 @@
+"""
+Benchmark of memory usage and load/save time of all storage backends on a history of synthetic apartments.
+
+Execute from the root directory of the repository:
+python benchmarks/benchmark_apartment_storage.py [number of apartments]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.apartment import Apartment
+from core.apartment_store import create_apartment_store
+
+
+class ApartmentDict:
+    """
+    Apartment storing its attributes in a __dict__ like Apartment did before using __slots__
+    """
+    def __init__(self, *args):
+        for (name, value) in zip(Apartment.__slots__, args):
+            setattr(self, name, value)
+
+
+def create_apartments(num: int) -> list[Apartment]:
+    rng = random.Random(0)
+    places = ['München', 'Augsburg', 'Nürnberg', 'Regensburg', 'Ingolstadt', 'Würzburg']
+    streets = [f'Straße {i}' for i in range(500)]
+    heating_types = ['Gas', 'Öl', 'Fernwärme', 'Wärmepumpe', None]
+    energy_efficiency_classes = ['A+', 'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', None]
+    timestamp_start = time.time() - 3 * 365 * 86400
+
+    apartments = []
+    for i in range(num):
+        apartments.append(Apartment(
+            id=f'{rng.randrange(10 ** 9)}-{i}',
+            description=f'{rng.choice(["Schöne", "Helle", "Ruhige"])} {rng.randint(1, 5)}-Zimmer-Wohnung',
+            url=f'https://www.example.com/immobilien/{i}',
+            zip=rng.randint(80000, 99999),
+            place=rng.choice(places),
+            street=rng.choice(streets),
+            house_number=rng.choice([rng.randint(1, 200), None]),
+            rent_cold=rng.randint(300, 3000),
+            rent_warm=rng.choice([rng.randint(400, 3500), None]),
+            rooms=rng.choice([1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 5.0]),
+            apartment_size=round(rng.uniform(20, 150), 2),
+            floor=rng.choice([0, 1, 2, 3, 4, 5, None]),
+            year_of_construction=rng.choice([rng.randint(1900, 2025), None]),
+            heating_type=rng.choice(heating_types),
+            energy_efficiency_class=rng.choice(energy_efficiency_classes),
+            exchange_apartment=rng.choice([False, False, False, True, None]),
+            released=timestamp_start + i * 3 * 365 * 86400 / num
+        ))
+    return apartments
+
+
+def measure_memory(func) -> tuple[object, int]:
+    tracemalloc.start()
+    result = func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main(num: int):
+    apartments = create_apartments(num)
+    print(f'{num} synthetic apartments\n')
+
+    values = [[getattr(x, y) for y in Apartment.__slots__] for x in apartments]
+    _, size_slots = measure_memory(lambda: [Apartment(*x) for x in values])
+    _, size_dict = measure_memory(lambda: [ApartmentDict(*x) for x in values])
+    print(f'Memory of objects (attributes shared): __dict__ {size_dict / 2 ** 20:.1f} MiB, '
+          f'__slots__ {size_slots / 2 ** 20:.1f} MiB\n')
+
+    print(f'{"backend":<10}{"save [s]":>10}{"load [s]":>10}{"file [MiB]":>12}{"loaded [MiB]":>14}')
+    for backend in ['json', 'jsonl', 'sqlite', 'binary']:
+        with tempfile.TemporaryDirectory() as path_files:
+            config = {'storage_backend': backend, 'jsonl_compaction_threshold': 0.3}
+            path_0 = os.path.join(path_files, 'benchmark_0.json')
+            path_1 = os.path.join(path_files, 'benchmark_1.json')
+
+            store = create_apartment_store(config, path_0, path_1)
+            start = time.perf_counter()
+            store.add_apartments(0, apartments)
+            duration_save = time.perf_counter() - start
+            store.close()
+
+            store = create_apartment_store(config, path_0, path_1)
+            start = time.perf_counter()
+            apartments_loaded = store.load_apartments(0)
+            duration_load = time.perf_counter() - start
+            store.close()
+            assert len(apartments_loaded) == num
+
+            store = create_apartment_store(config, path_0, path_1)
+            _, size_loaded = measure_memory(lambda: store.load_apartments(0))
+            store.close()
+
+            size_files = sum(os.path.getsize(os.path.join(path_files, x)) for x in os.listdir(path_files))
+            print(f'{backend:<10}{duration_save:>10.3f}{duration_load:>10.3f}{size_files / 2 ** 20:>12.1f}'
+                  f'{size_loaded / 2 ** 20:>14.1f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
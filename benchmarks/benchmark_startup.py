@@ -0,0 +1,41 @@
+"""
+Benchmark of the startup of main.py: the time from starting the interpreter until the first HTTP request can be
+sent, checked against the startup budget (see core.startup_profile). Each measurement uses a new interpreter, the
+fastest one is compared to the budget since single measurements vary with the load of the machine.
+Exits with status 1 if the budget is exceeded.
+
+Execute from the root directory of the repository:
+python benchmarks/benchmark_startup.py [number of measurements]
+"""
+import os
+import statistics
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.startup_profile import measure_startup, startup_budget, startup_budget_margin
+
+if __name__ == '__main__':
+    num_measurements = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    durations = []
+    steps_fastest = []
+    with tempfile.TemporaryDirectory() as path_files:
+        for _ in range(num_measurements):
+            duration, steps, _ = measure_startup(path_files)
+            if not durations or duration < min(durations):
+                steps_fastest = steps
+            durations.append(duration)
+
+    print(f'{num_measurements} measurements until the first request\n')
+    print(f'{"Fastest [ms]":>14}{"Median [ms]":>14}{"Budget [ms]":>14}')
+    print(f'{min(durations) * 1000:>14.1f}{statistics.median(durations) * 1000:>14.1f}'
+          f'{startup_budget * 1000:>14.0f}\n')
+    print(f'{"Step (fastest measurement)":<40}{"Duration [ms]":>15}')
+    for name, duration_step in steps_fastest:
+        print(f'{name:<40}{duration_step * 1000:>15.1f}')
+
+    if min(durations) > startup_budget * startup_budget_margin:
+        print('\nStartup budget exceeded, set WOHNUNGSSUCHER_STARTUP_BUDGET to override the budget', file=sys.stderr)
+        sys.exit(1)
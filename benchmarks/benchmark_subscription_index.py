@@ -0,0 +1,109 @@
+"""
+Benchmark of matching apartments against many synthetic subscriptions (saved searches):
+checking every subscription with ApartmentFilter compared to a single SubscriptionIndex.
+Both methods are verified to return the same matches.
+
+Execute from the root directory of the repository:
+python benchmarks/benchmark_subscription_index.py [number of subscriptions] [number of apartments]
+"""
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.apartment_filter import ApartmentFilter
+from core.subscription_index import SubscriptionIndex
+from core.utils import BoolPlus
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_apartment_storage import create_apartments
+
+default_keys = ['zip', 'place', 'rent_cold', 'rent_warm', 'room', 'apartment_size', 'floor',
+                'energy_efficiency_class', 'year_of_construction', 'exchange_apartment']
+
+
+def create_subscriptions(num: int) -> list[tuple[SimpleNamespace, dict, dict]]:
+    """
+    :return: normalized requirements (see WohnungssucherBase.set_configurations), defaults_0 and defaults_1 of
+        each subscription
+    """
+    rng = random.Random(1)
+    places = ['München', 'Augsburg', 'Nürnberg', 'Regensburg', 'Ingolstadt', 'Würzburg']
+    defaults_0 = {x: False for x in default_keys}
+
+    subscriptions = []
+    for _ in range(num):
+        rent_cold_min = rng.choice([0, rng.randrange(200, 1000, 50)])
+        zip_start = rng.randrange(80000, 99000, 100)
+        requirements = SimpleNamespace(
+            zips_included=rng.choice([None, list(range(zip_start, zip_start + rng.randint(1, 300)))]),
+            zips_excluded=rng.choice([[], [rng.randint(80000, 99999)]]),
+            places_included=rng.choice([None, rng.sample(places, rng.randint(1, 3))]),
+            places_excluded=rng.choice([[], [rng.choice(places)]]),
+            rent_cold_min=rent_cold_min,
+            rent_cold_max=rng.choice([sys.maxsize, rent_cold_min + rng.randrange(300, 2000, 50)]),
+            rent_warm_min=0,
+            rent_warm_max=rng.choice([sys.maxsize, rng.randrange(800, 3000, 100)]),
+            rooms_min=rng.choice([0, 1, 2, 2.5, 3]),
+            rooms_max=rng.choice([sys.maxsize, 3, 4, 5]),
+            apartment_size_min=rng.choice([0, 30, 40, 50, 60, 70]),
+            apartment_size_max=rng.choice([sys.maxsize, 80, 100, 120]),
+            floors=rng.choice([None, [0, 1, 2], [1, 2, 3, 4, 5]]),
+            energy_efficiency_classes=rng.choice([None, ['A+', 'A', 'B', 'C', 'D']]),
+            year_of_construction_min=rng.choice([0, 1950, 1980]),
+            year_of_construction_max=sys.maxsize,
+            exchange_apartment=rng.choice([BoolPlus.false(), BoolPlus.maybe()])
+        )
+        defaults_1 = {x: rng.choice([True, False]) for x in default_keys}
+        subscriptions.append((requirements, defaults_0, defaults_1))
+    return subscriptions
+
+
+if __name__ == '__main__':
+    num_subscriptions = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    num_apartments = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    subscriptions = create_subscriptions(num_subscriptions)
+    apartments = create_apartments(num_apartments)
+
+    start = time.perf_counter()
+    filters = [ApartmentFilter(*x) for x in subscriptions]
+    duration_build_linear = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches_linear = []
+    for apartment in apartments:
+        matches = {}
+        for i, apartment_filter in enumerate(filters):
+            category = apartment_filter.categorize(apartment)
+            if category is not None:
+                matches[i] = category
+        matches_linear.append(matches)
+    duration_linear = time.perf_counter() - start
+
+    start = time.perf_counter()
+    subscription_index = SubscriptionIndex()
+    for i, subscription in enumerate(subscriptions):
+        subscription_index.add(i, *subscription)
+    subscription_index.match(apartments[0])
+    duration_build_index = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches_index = [subscription_index.match(x) for x in apartments]
+    duration_index = time.perf_counter() - start
+
+    assert matches_linear == matches_index, 'SubscriptionIndex returned different matches than ApartmentFilter'
+
+    num_matches = sum(len(x) for x in matches_index)
+    print(f'{num_subscriptions} subscriptions, {num_apartments} apartments, {num_matches} matches\n')
+    print(f'{"Method":<20}{"Build [ms]":>12}{"Match [ms]":>12}{"Per apartment [µs]":>20}')
+    for name, duration_build, duration in [
+        ('ApartmentFilter', duration_build_linear, duration_linear),
+        ('SubscriptionIndex', duration_build_index, duration_index)
+    ]:
+        print(f'{name:<20}{duration_build * 1000:>12.1f}{duration * 1000:>12.1f}'
+              f'{duration / num_apartments * 1e6:>20.1f}')
@@ -0,0 +1,137 @@
+"""
+Polling intervals of the daemon adapted to the number of new apartments each platform publishes per weekday.
+
+The arrival rate of each platform is estimated from the release dates of the stored apartments.
+Since the release date is only stored with a resolution of days, the rates are estimated per weekday.
+Polling a platform every T minutes delays the notification about a new apartment by T/2 on average.
+Minimizing the average delay of all new apartments for a fixed number of runs per day (budget) results in
+a number of runs per platform proportional to the square root of its arrival rate. No platform is polled more
+often than required to reach the target latency or less often than daemon_interval.
+"""
+from __future__ import annotations
+
+import math
+import sys
+from collections.abc import Iterable
+from datetime import datetime
+
+# number of weeks of release dates considered to estimate the arrival rates
+lookback_weeks = 8
+
+minutes_per_day = 24 * 60
+
+weekday_names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+def estimate_arrival_rates(released: Iterable[float], now: float) -> list[float]:
+    """
+    Estimates the average number of new apartments per weekday
+    :param released: release dates of the stored apartments
+    :param now: current timestamp
+    :return: average number of new apartments for each weekday (0: monday)
+    """
+    timestamp_min = now - lookback_weeks * 7 * 86400
+    counts = [0] * 7
+    timestamp_first = now
+    for timestamp in released:
+        if timestamp < timestamp_min:
+            continue
+        counts[datetime.fromtimestamp(timestamp).weekday()] += 1
+        timestamp_first = min(timestamp_first, timestamp)
+
+    weeks_observed = max(1.0, (now - timestamp_first) / (7 * 86400))
+    return [x / weeks_observed for x in counts]
+
+
+def allocate_runs(rates: dict[str, float], budget: float, runs_min: float, runs_max: float) -> dict[str, float]:
+    """
+    Distributes a number of runs per day between platforms proportional to the square root of their arrival rates
+    :param rates: arrival rate per platform name
+    :param budget: total number of runs per day of all platforms
+    :param runs_min: minimum number of runs per day of each platform
+    :param runs_max: maximum number of runs per day of each platform
+    :return: number of runs per day per platform name
+    """
+    runs = dict.fromkeys(rates, runs_min)
+    active = [x for x in rates if rates[x] > 0 and runs_min < runs_max]
+    while active:
+        remaining = budget - sum(runs.values())
+        if remaining <= 0:
+            break
+        total = sum(math.sqrt(rates[x]) for x in active)
+        shares = {x: remaining * math.sqrt(rates[x]) / total for x in active}
+        capped = [x for x in active if runs[x] + shares[x] >= runs_max]
+        if not capped:
+            for name in active:
+                runs[name] += shares[name]
+            break
+        for name in capped:
+            runs[name] = runs_max
+            active.remove(name)
+    return runs
+
+
+class PollingSchedule:
+    """
+    Polling interval of each platform per weekday
+    """
+    # average number of new apartments per weekday per platform name
+    arrival_rates: dict[str, list[float]]
+
+    # interval between two runs in minutes per weekday per platform name
+    intervals: dict[str, list[float]]
+
+    def __init__(
+            self,
+            arrival_rates: dict[str, list[float]],
+            target_latency: float,
+            budget: float,
+            interval_max: float
+    ):
+        """
+        :param arrival_rates: average number of new apartments per weekday per platform name
+        :param target_latency: average delay in minutes between the release and the notification to be reached
+        :param budget: maximum number of runs per day of all platforms together
+        :param interval_max: maximum interval between two runs of a platform in minutes
+        """
+        self.arrival_rates = arrival_rates
+        self.intervals = {x: [interval_max] * 7 for x in arrival_rates}
+
+        runs_min = minutes_per_day / interval_max
+        runs_max = max(minutes_per_day / (2 * target_latency), runs_min)
+        if runs_min * len(arrival_rates) > budget:
+            # interval_max is kept, hence the budget is exceeded
+            print(f'Warning: polling {len(arrival_rates)} platforms every {interval_max} minutes requires '
+                  f'{runs_min * len(arrival_rates):.0f} runs per day, which exceeds the polling budget of {budget} '
+                  f'runs per day', file=sys.stderr)
+        for weekday in range(7):
+            runs = allocate_runs({x: rates[weekday] for x, rates in arrival_rates.items()}, budget, runs_min, runs_max)
+            for name, runs_platform in runs.items():
+                self.intervals[name][weekday] = minutes_per_day / runs_platform
+
+    def get_interval(self, name: str, weekday: int) -> float | None:
+        """
+        :return: interval between two runs of the platform in minutes or None if the platform is unknown
+        """
+        if name not in self.intervals:
+            return None
+        return self.intervals[name][weekday]
+
+    def get_expected_latency(self, name: str, weekday: int) -> float:
+        """
+        :return: average delay in minutes between the release of an apartment and the notification
+        """
+        return self.intervals[name][weekday] / 2
+
+    def __str__(self):
+        lines = ['Polling schedule (interval / expected latency in minutes, new apartments per day)']
+        lines.append(f'{"":<20}' + ''.join(f'{x:>18}' for x in weekday_names))
+        for name, intervals in self.intervals.items():
+            cells = [
+                f'{interval:.0f} / {interval / 2:.0f} ({rate:.1f})'
+                for interval, rate in zip(intervals, self.arrival_rates[name])
+            ]
+            lines.append(f'{name:<20}' + ''.join(f'{x:>18}' for x in cells))
+        runs = [sum(minutes_per_day / x[weekday] for x in self.intervals.values()) for weekday in range(7)]
+        lines.append(f'{"runs per day":<20}' + ''.join(f'{x:>18.1f}' for x in runs))
+        return '\n'.join(lines)
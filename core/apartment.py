@@ -7,6 +7,26 @@ from core.utils import BoolPlus
 
 
 class Apartment:
+    __slots__ = (
+        'id',
+        'description',
+        'url',
+        'zip',
+        'place',
+        'street',
+        'house_number',
+        'rent_cold',
+        'rent_warm',
+        'rooms',
+        'apartment_size',
+        'floor',
+        'year_of_construction',
+        'heating_type',
+        'energy_efficiency_class',
+        'exchange_apartment',
+        'released'
+    )
+
     # Unique ID of the apartment
     id: Any
 
@@ -197,6 +217,32 @@ class Apartment:
 
         return html_head, html_block
 
+    def to_html_reference(self, other_listings: list[tuple[str, str]]) -> str:
+        """
+        Creates a short html block referencing this apartment and its listings on other platforms
+        :param other_listings: name of the platform and url of each other listing
+        :return: html block
+        """
+        description = self.description if self.description is not None else 'Wohnung'
+        links = ', '.join(f'<a href="{url}">{platform}</a>' for platform, url in other_listings)
+
+        return ('\t<div class="block">\n\t\t<div class="inner_block_text">\n'
+                f'\t\t\t<p><a href="{self.url}">{description}</a> (ID {self.id})<br>Bereits gefunden bei: {links}</p>\n'
+                '\t\t</div>\n\t</div>\n')
+
+    def to_html_price_drop(self, price_drop: dict[str, tuple[int, int]]) -> str:
+        """
+        Creates a html block of this apartment headed by its reduced prices
+        :param price_drop: old and new value of each reduced price (rent_cold, rent_warm)
+        :return: html block
+        """
+        names = {'rent_cold': 'Kaltmiete', 'rent_warm': 'Warmmiete'}
+        changes = '<br>'.join(f'{names[x]}: {old} € &rarr; {new} €' for x, (old, new) in price_drop.items())
+
+        return ('\t<div class="block">\n\t\t<div class="inner_block_text">\n'
+                f'\t\t\t<p>{changes}</p>\n'
+                '\t\t</div>\n\t</div>\n' + self.to_html()[1])
+
     @staticmethod
     def get_html_header():
         html_head = ('<head>\n\t<meta charset="UTF-8">\n\t<style>'
@@ -0,0 +1,219 @@
+"""
+Columnar representation of many apartments and a vectorized filter for it.
+
+Filtering long lists of apartments one object at a time (see WohnungssucherBase._check_apartment) is slow,
+e.g., when searching the whole history of stored apartments with new requirements
+(see WohnungssucherBase.search_stored_apartments).
+ApartmentBatch stores every checked attribute of all apartments as NumPy array, BatchFilter evaluates all rules
+as array operations. The results are identical to WohnungssucherBase._check_apartment.
+
+NumPy is an optional dependency and only required if this module is used.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from core.apartment import Apartment
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# attributes stored as numeric column (float64) with null mask
+numeric_fields = ['zip', 'rent_cold', 'rent_warm', 'rooms', 'apartment_size', 'floor', 'year_of_construction']
+
+# attributes stored as categorical column: codes (int32, -1 for None) into a list of categories
+categorical_fields = ['place', 'energy_efficiency_class']
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('Filtering batches of apartments requires NumPy. Install it using "pip install numpy".')
+
+
+class ApartmentBatch:
+    """
+    Attributes of many apartments stored column by column.
+    Numeric attributes are stored as float64 array together with a boolean array marking missing values.
+    Strings are stored as integer codes into a list of categories, missing values have code -1.
+    """
+    # ids of all apartments in the order of the columns
+    ids: list[Any]
+
+    # values (0 if missing) and null mask of each numeric attribute
+    values: dict[str, np.ndarray]
+    nulls: dict[str, np.ndarray]
+
+    # codes and categories of each categorical attribute
+    codes: dict[str, np.ndarray]
+    categories: dict[str, list[str]]
+
+    def __init__(self, records: Iterable[dict]):
+        """
+        :param records: dictionaries containing at least the id and all checked attributes of each apartment,
+            e.g., returned by ApartmentStore.iter_dicts
+        """
+        _require_numpy()
+
+        self.ids = []
+        columns = {x: [] for x in numeric_fields + categorical_fields + ['exchange_apartment']}
+        for record in records:
+            self.ids.append(record['id'])
+            for name, column in columns.items():
+                column.append(record[name])
+
+        self.values = {}
+        self.nulls = {}
+        for name in numeric_fields + ['exchange_apartment']:
+            column = columns[name]
+            self.nulls[name] = np.fromiter((x is None for x in column), dtype=bool, count=len(column))
+            self.values[name] = np.fromiter(
+                (0 if x is None else x for x in column), dtype=np.float64, count=len(column)
+            )
+
+        self.codes = {}
+        self.categories = {}
+        for name in categorical_fields:
+            lookup = {}
+            codes = [-1 if x is None else lookup.setdefault(x, len(lookup)) for x in columns[name]]
+            self.codes[name] = np.array(codes, dtype=np.int32)
+            self.categories[name] = list(lookup)
+
+    @classmethod
+    def from_apartments(cls, apartments: Iterable[Apartment]) -> ApartmentBatch:
+        return cls(x.to_dict() for x in apartments)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class BatchFilter:
+    """
+    Vectorized version of WohnungssucherBase._check_apartment evaluating both default sets at once
+    (see ApartmentFilter for the object path)
+    """
+    # requirements as attributes, e.g., WohnungssucherBase
+    requirements: Any
+
+    defaults_0: dict
+    defaults_1: dict
+
+    def __init__(self, requirements: Any, defaults_0: dict, defaults_1: dict):
+        """
+        :param requirements: object providing the normalized requirements as attributes, e.g., WohnungssucherBase
+        :param defaults_0: result of each check for missing values of apartments of group 0
+        :param defaults_1: result of each check for missing values of apartments of group 1
+        """
+        _require_numpy()
+        self.requirements = requirements
+        self.defaults_0 = defaults_0
+        self.defaults_1 = defaults_1
+
+    def _get_checks(self, batch: ApartmentBatch) -> list[tuple[np.ndarray, np.ndarray, bool, bool]]:
+        """
+        :return: for each check: result for all present values, null mask, result for missing values using
+            defaults_0 and defaults_1
+        """
+        r = self.requirements
+        d_0 = self.defaults_0
+        d_1 = self.defaults_1
+        checks = []
+
+        # Apartment._check_inexcluded
+        values, nulls = batch.values['zip'], batch.nulls['zip']
+        passed = ~np.isin(values, list(r.zips_excluded))
+        if r.zips_included is None:
+            checks.append((passed, nulls, True, True))
+        else:
+            checks.append((passed & np.isin(values, list(r.zips_included)), nulls, d_0['zip'], d_1['zip']))
+
+        codes, categories = batch.codes['place'], batch.categories['place']
+        nulls = codes == -1
+        codes_passed = [i for i, x in enumerate(categories) if x not in r.places_excluded and (
+            r.places_included is None or x in r.places_included
+        )]
+        passed = np.isin(codes, codes_passed)
+        if r.places_included is None:
+            checks.append((passed, nulls, True, True))
+        else:
+            checks.append((passed, nulls, d_0['place'], d_1['place']))
+
+        # Apartment._check_within
+        for name, key_default, value_min, value_max in [
+            ('rent_cold', 'rent_cold', r.rent_cold_min, r.rent_cold_max),
+            ('rent_warm', 'rent_warm', r.rent_warm_min, r.rent_warm_max),
+            ('rooms', 'room', r.rooms_min, r.rooms_max),
+            ('apartment_size', 'apartment_size', r.apartment_size_min, r.apartment_size_max)
+        ]:
+            values = batch.values[name]
+            passed = (values >= value_min) & (values <= value_max)
+            checks.append((passed, batch.nulls[name], d_0[key_default], d_1[key_default]))
+
+        # Apartment._check_in_list
+        if r.floors is not None:
+            passed = np.isin(batch.values['floor'], list(r.floors))
+            checks.append((passed, batch.nulls['floor'], d_0['floor'], d_1['floor']))
+
+        if r.energy_efficiency_classes is not None:
+            codes, categories = batch.codes['energy_efficiency_class'], batch.categories['energy_efficiency_class']
+            codes_passed = [i for i, x in enumerate(categories) if x in r.energy_efficiency_classes]
+            checks.append((
+                np.isin(codes, codes_passed), codes == -1,
+                d_0['energy_efficiency_class'], d_1['energy_efficiency_class']
+            ))
+
+        values = batch.values['year_of_construction']
+        passed = (values >= r.year_of_construction_min) & (values <= r.year_of_construction_max)
+        checks.append((
+            passed, batch.nulls['year_of_construction'],
+            d_0['year_of_construction'], d_1['year_of_construction']
+        ))
+
+        # Apartment.check_exchange_apartment
+        passed = np.where(
+            batch.values['exchange_apartment'] != 0,
+            True == r.exchange_apartment,
+            False == r.exchange_apartment
+        )
+        checks.append((passed, batch.nulls['exchange_apartment'], d_0['exchange_apartment'],
+                       d_1['exchange_apartment']))
+
+        return checks
+
+    def _evaluate(self, batch: ApartmentBatch) -> tuple[np.ndarray, np.ndarray]:
+        """
+        :return: boolean arrays marking the apartments matching using defaults_0 and using defaults_1
+        """
+        is_valid = np.ones(len(batch), dtype=bool)
+        is_0 = np.ones(len(batch), dtype=bool)
+        is_1 = np.ones(len(batch), dtype=bool)
+
+        for passed, nulls, result_none_0, result_none_1 in self._get_checks(batch):
+            is_valid &= nulls | passed
+            if not result_none_0:
+                is_0 &= ~nulls
+            if not result_none_1:
+                is_1 &= ~nulls
+
+        return is_valid & is_0, is_valid & is_1
+
+    def categorize(self, batch: ApartmentBatch) -> np.ndarray:
+        """
+        Checks which apartments match all requirements
+        :param batch: apartments to be checked
+        :return: int8 array containing for each apartment 0 if it matches using defaults_0,
+            1 if it only matches using defaults_1, -1 otherwise
+        """
+        is_0, is_1 = self._evaluate(batch)
+        return np.where(is_0, 0, np.where(is_1, 1, -1)).astype(np.int8)
+
+    def filter(self, batch: ApartmentBatch, defaults: int) -> list[Any]:
+        """
+        :param batch: apartments to be filtered
+        :param defaults: 0 or 1 to apply the rules of _check_apartment using defaults_0 or defaults_1
+        :return: ids of all matching apartments in the order of the batch
+        """
+        mask = self._evaluate(batch)[defaults]
+        return [batch.ids[i] for i in np.flatnonzero(mask)]
@@ -0,0 +1,235 @@
+"""
+Fixed-schema binary format for lists of apartments.
+
+Layout (little endian):
+- header: magic, number of strings (uint32), number of records (uint32)
+  The magic is b'WSA2' if the records are sorted by release date, otherwise b'WSA1' (used by all older versions)
+- string table: for each string its length in bytes (uint32) followed by the utf-8 encoded string
+- records: one fixed-size record per apartment, see record_struct
+
+All string attributes are stored as index into the string table. Every distinct string is stored only once and
+decoded only once, hence all apartments share the same string objects after decoding.
+Attributes being None are marked in a bitmask and stored as 0.
+"""
+from __future__ import annotations
+
+import struct
+from typing import Any
+
+from core.apartment import Apartment
+
+# magic of data whose records are sorted by release date
+magic = b'WSA2'
+
+# magic of data whose records may be in any order
+magic_unsorted = b'WSA1'
+
+header_struct = struct.Struct('<4sII')
+string_length_struct = struct.Struct('<I')
+
+# kind of each attribute of an apartment in the order of Apartment.__init__
+# id: int or index into the string table, str: index into the string table, int, float, bool
+fields = [
+    ('id', 'id'),
+    ('description', 'str'),
+    ('url', 'str'),
+    ('zip', 'int'),
+    ('place', 'str'),
+    ('street', 'str'),
+    ('house_number', 'int'),
+    ('rent_cold', 'int'),
+    ('rent_warm', 'int'),
+    ('rooms', 'float'),
+    ('apartment_size', 'float'),
+    ('floor', 'int'),
+    ('year_of_construction', 'int'),
+    ('heating_type', 'str'),
+    ('energy_efficiency_class', 'str'),
+    ('exchange_apartment', 'bool'),
+    ('released', 'float')
+]
+
+_formats = {'str': 'I', 'int': 'q', 'float': 'd', 'bool': '?'}
+
+# bitmask of None values, 1 if id is a string (0: int), followed by all attributes
+record_struct = struct.Struct('<I?q' + ''.join(_formats[kind] for _, kind in fields[1:]))
+
+# position of each attribute in a record
+_positions = {name: i for i, (name, _) in enumerate(fields)}
+
+# released is the last attribute of a record
+_released_struct = struct.Struct('<d')
+_offset_released = record_struct.size - _released_struct.size
+
+
+def encode_apartments(apartments: list[Apartment]) -> bytes:
+    """
+    Encodes apartments to the binary format
+    :param apartments: apartments to be encoded
+    :return: encoded apartments
+    """
+    return encode_records([tuple(getattr(apt, name) for name, _ in fields) for apt in apartments])
+
+
+def encode_records(values_all: list[tuple[Any, ...]]) -> bytes:
+    """
+    Encodes apartments given as tuple of all attribute values in the order of fields to the binary format
+    :param values_all: attribute values of all apartments, e.g., returned by decode_records
+    :return: encoded apartments
+    """
+    strings = {}
+    records = []
+    is_sorted_released = True
+    released_last = None
+
+    for values in values_all:
+        nulls = 0
+        record = []
+        for i, (value, (_, kind)) in enumerate(zip(values, fields)):
+            if value is None:
+                nulls |= 1 << i
+                if kind == 'id':
+                    record += [False, 0]
+                else:
+                    record.append(0)
+            elif kind == 'id':
+                if isinstance(value, str):
+                    record += [True, strings.setdefault(value, len(strings))]
+                elif isinstance(value, int):
+                    record += [False, value]
+                else:
+                    raise TypeError(f'Cannot encode id of type {type(value).__name__}: {value!r}')
+            elif kind == 'str':
+                record.append(strings.setdefault(value, len(strings)))
+            else:
+                record.append(value)
+        records.append(record_struct.pack(nulls, *record))
+
+        released = record[-1]
+        if released_last is not None and released < released_last:
+            is_sorted_released = False
+        released_last = released
+
+    chunks = [header_struct.pack(magic if is_sorted_released else magic_unsorted, len(strings), len(records))]
+    for string in strings:
+        string_bytes = string.encode('utf-8')
+        chunks.append(string_length_struct.pack(len(string_bytes)))
+        chunks.append(string_bytes)
+    chunks += records
+
+    return b''.join(chunks)
+
+
+def _decode_strings(data: bytes) -> tuple[list[str], int, int]:
+    """
+    :return: string table, number of records and offset of the first record
+    """
+    file_magic, num_strings, num_records = header_struct.unpack_from(data, 0)
+    if file_magic not in (magic, magic_unsorted):
+        raise ValueError('Invalid file format. Expected apartments in binary format.')
+
+    offset = header_struct.size
+    strings = []
+    for _ in range(num_strings):
+        length = string_length_struct.unpack_from(data, offset)[0]
+        offset += string_length_struct.size
+        strings.append(data[offset:offset + length].decode('utf-8'))
+        offset += length
+
+    return strings, num_records, offset
+
+
+def is_sorted(data: bytes) -> bool:
+    """
+    :param data: apartments encoded by encode_apartments
+    :return: whether the apartments are sorted by release date
+    """
+    return not data or header_struct.unpack_from(data, 0)[0] == magic
+
+
+def find_first_released(data: bytes, timestamp: float) -> int:
+    """
+    Finds the first apartment released at or after timestamp by bisection. Only the release dates of the visited
+    records are decoded.
+    :param data: apartments encoded by encode_apartments sorted by release date (see is_sorted)
+    :param timestamp: timestamp to search for
+    :return: index of the first apartment released at or after timestamp
+    """
+    if not data:
+        return 0
+    if not is_sorted(data):
+        raise ValueError('Cannot search apartments which are not sorted by release date')
+
+    _, num_strings, num_records = header_struct.unpack_from(data, 0)
+    offset = _get_offset_records(data, num_strings) + _offset_released
+
+    low, high = 0, num_records
+    while low < high:
+        mid = (low + high) // 2
+        released = _released_struct.unpack_from(data, offset + mid * record_struct.size)[0]
+        if released < timestamp:
+            low = mid + 1
+        else:
+            high = mid
+    return low
+
+
+def _get_offset_records(data: bytes, num_strings: int) -> int:
+    offset = header_struct.size
+    for _ in range(num_strings):
+        offset += string_length_struct.size + string_length_struct.unpack_from(data, offset)[0]
+    return offset
+
+
+def decode_records(data: bytes, start: int = 0, names: list[str] | None = None) -> list[tuple[Any, ...]]:
+    """
+    Decodes the attribute values of all apartments without creating Apartment objects
+    :param data: apartments encoded by encode_apartments
+    :param start: index of the first apartment to be decoded
+    :param names: names of the attributes to be decoded or None to decode all attributes
+    :return: tuple of the attribute values per apartment in the order of names or fields if names is None
+    """
+    if not data:
+        return []
+
+    strings, num_records, offset = _decode_strings(data)
+    records = memoryview(data)[offset + start * record_struct.size:offset + num_records * record_struct.size]
+
+    if names is None:
+        positions = list(range(len(fields)))
+    else:
+        positions = [_positions[x] for x in names]
+    positions_str = [i for i, position in enumerate(positions) if fields[position][1] == 'str']
+    masks = [1 << x for x in positions]
+    index_id = positions.index(0) if 0 in positions else None
+
+    decoded = []
+    for record in record_struct.iter_unpack(records):
+        nulls = record[0]
+        values_all = record[2:]
+        values = [values_all[x] for x in positions]
+        if record[1] and index_id is not None:
+            values[index_id] = strings[values[index_id]]
+        if nulls:
+            for i, mask in enumerate(masks):
+                if nulls & mask:
+                    values[i] = None
+            for i in positions_str:
+                if not nulls & masks[i]:
+                    values[i] = strings[values[i]]
+        else:
+            for i in positions_str:
+                values[i] = strings[values[i]]
+        decoded.append(tuple(values))
+
+    return decoded
+
+
+def decode_apartments(data: bytes, start: int = 0) -> list[Apartment]:
+    """
+    Decodes apartments from the binary format
+    :param data: apartments encoded by encode_apartments
+    :param start: index of the first apartment to be decoded
+    :return: decoded apartments
+    """
+    return [Apartment(*x) for x in decode_records(data, start)]
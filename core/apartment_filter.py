@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from core.apartment import Apartment
+
+# number of evaluated apartments after which the checks are reordered by their observed selectivity
+reorder_interval = 256
+
+
+class FilterCheck:
+    """
+    Single check of an ApartmentFilter for one attribute of an apartment
+    """
+    # name of the checked attribute of the apartment
+    attribute: str
+
+    # returns whether a value (not None) passes the check
+    predicate: Callable[[Any], bool]
+
+    # result of the check for value None using defaults_0 and defaults_1
+    result_none_0: bool
+    result_none_1: bool
+
+    # number of apartments evaluated and rejected by this check
+    evaluated: int
+    rejected: int
+
+    def __init__(self, attribute: str, predicate: Callable[[Any], bool], result_none_0: bool, result_none_1: bool):
+        self.attribute = attribute
+        self.predicate = predicate
+        self.result_none_0 = result_none_0
+        self.result_none_1 = result_none_1
+        self.evaluated = 0
+        self.rejected = 0
+
+    @property
+    def selectivity(self) -> float:
+        """
+        :return: share of the evaluated apartments rejected by this check
+        """
+        if self.evaluated == 0:
+            return 0.0
+        return self.rejected / self.evaluated
+
+
+class ApartmentFilter:
+    """
+    Predicate compiled once from the requirements of a platform (see WohnungssucherBase.set_configurations) and
+    both default sets. It evaluates the same rules as WohnungssucherBase._check_apartment, but
+    - lists of allowed or excluded values are converted to frozensets,
+    - checks that accept every value are omitted and
+    - defaults_0 and defaults_1 are evaluated in a single pass, since they only differ for missing values.
+    Optionally, the checks are reordered periodically such that the check rejecting most apartments runs first.
+    """
+    checks: list[FilterCheck]
+
+    # whether the checks are reordered by their observed selectivity
+    reorder: bool
+
+    # number of apartments evaluated since the last reordering
+    num_evaluated: int
+
+    def __init__(self, requirements: Any, defaults_0: dict, defaults_1: dict, reorder: bool = False):
+        """
+        :param requirements: object providing the normalized requirements as attributes, e.g., WohnungssucherBase
+        :param defaults_0: result of each check for missing values of apartments of group 0
+        :param defaults_1: result of each check for missing values of apartments of group 1
+        :param reorder: whether to reorder the checks by their observed selectivity
+        """
+        self.reorder = reorder
+        self.num_evaluated = 0
+        self.checks = []
+
+        r = requirements
+        self._add_inexcluded('zip', r.zips_included, r.zips_excluded, defaults_0['zip'], defaults_1['zip'])
+        self._add_inexcluded('place', r.places_included, r.places_excluded, defaults_0['place'], defaults_1['place'])
+        self._add_within('rent_cold', r.rent_cold_min, r.rent_cold_max, defaults_0['rent_cold'],
+                         defaults_1['rent_cold'])
+        self._add_within('rent_warm', r.rent_warm_min, r.rent_warm_max, defaults_0['rent_warm'],
+                         defaults_1['rent_warm'])
+        self._add_within('rooms', r.rooms_min, r.rooms_max, defaults_0['room'], defaults_1['room'])
+        self._add_within('apartment_size', r.apartment_size_min, r.apartment_size_max,
+                         defaults_0['apartment_size'], defaults_1['apartment_size'])
+        self._add_in_list('floor', r.floors, defaults_0['floor'], defaults_1['floor'])
+        self._add_in_list('energy_efficiency_class', r.energy_efficiency_classes,
+                          defaults_0['energy_efficiency_class'], defaults_1['energy_efficiency_class'])
+        self._add_within('year_of_construction', r.year_of_construction_min, r.year_of_construction_max,
+                         defaults_0['year_of_construction'], defaults_1['year_of_construction'])
+        self._add_exchange_apartment(r.exchange_apartment, defaults_0['exchange_apartment'],
+                                     defaults_1['exchange_apartment'])
+
+    def _add_inexcluded(
+            self,
+            attribute: str,
+            values_included: list[Any] | None,
+            values_excluded: list[Any],
+            default_0: bool,
+            default_1: bool
+    ):
+        # see Apartment._check_inexcluded
+        excluded = frozenset(values_excluded)
+        if values_included is None:
+            if not excluded:
+                return
+            self.checks.append(FilterCheck(attribute, lambda x: x not in excluded, True, True))
+            return
+
+        included = frozenset(values_included) - excluded
+        self.checks.append(FilterCheck(attribute, lambda x: x in included, default_0, default_1))
+
+    def _add_within(self, attribute: str, value_min: int | float, value_max: int | float, default_0: bool,
+                    default_1: bool):
+        # see Apartment._check_within
+        self.checks.append(FilterCheck(attribute, lambda x: value_min <= x <= value_max, default_0, default_1))
+
+    def _add_in_list(self, attribute: str, allowed_values: list[Any] | None, default_0: bool, default_1: bool):
+        # see Apartment._check_in_list
+        if allowed_values is None:
+            return
+        allowed = frozenset(allowed_values)
+        self.checks.append(FilterCheck(attribute, lambda x: x in allowed, default_0, default_1))
+
+    def _add_exchange_apartment(self, allowed_exchange_apartment: Any, default_0: bool, default_1: bool):
+        # see Apartment.check_exchange_apartment, the comparison with BoolPlus is evaluated once per bool value
+        accepted = {True: True == allowed_exchange_apartment, False: False == allowed_exchange_apartment}
+        if accepted[True] and accepted[False]:
+            predicate = lambda x: True if isinstance(x, bool) else x == allowed_exchange_apartment
+        else:
+            predicate = lambda x: accepted[x] if isinstance(x, bool) else x == allowed_exchange_apartment
+        self.checks.append(FilterCheck('exchange_apartment', predicate, default_0, default_1))
+
+    def categorize(self, apartment: Apartment) -> int | None:
+        """
+        Checks whether the apartment matches all requirements
+        :param apartment: apartment to be checked
+        :return: 0 if the apartment matches using defaults_0, 1 if it only matches using defaults_1, None otherwise
+        """
+        if self.reorder:
+            return self._categorize_counting(apartment)
+
+        is_0 = True
+        is_1 = True
+        for check in self.checks:
+            value = getattr(apartment, check.attribute)
+            if value is None:
+                is_0 = is_0 and check.result_none_0
+                is_1 = is_1 and check.result_none_1
+                if not is_0 and not is_1:
+                    return None
+            elif not check.predicate(value):
+                return None
+
+        return 0 if is_0 else 1
+
+    def _categorize_counting(self, apartment: Apartment) -> int | None:
+        """
+        Same as categorize, but counts the rejections of each check and reorders the checks periodically
+        """
+        self.num_evaluated += 1
+        if self.num_evaluated >= reorder_interval:
+            self.checks.sort(key=lambda x: x.selectivity, reverse=True)
+            self.num_evaluated = 0
+
+        is_0 = True
+        is_1 = True
+        for check in self.checks:
+            check.evaluated += 1
+            value = getattr(apartment, check.attribute)
+            if value is None:
+                is_0 = is_0 and check.result_none_0
+                is_1 = is_1 and check.result_none_1
+                if not is_0 and not is_1:
+                    check.rejected += 1
+                    return None
+            elif not check.predicate(value):
+                check.rejected += 1
+                return None
+
+        return 0 if is_0 else 1
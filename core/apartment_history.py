@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+from core.apartment import Apartment
+
+# attributes whose changes are recorded. The release date is set by the platform once and never tracked.
+history_fields = [x for x in Apartment.__slots__ if x not in ('id', 'released')]
+
+# attributes considered for the notification about price drops
+price_fields = ['rent_cold', 'rent_warm']
+
+
+class ApartmentHistory:
+    """
+    Append-only history of the attributes of all apartments of a platform stored as text file containing
+    one json encoded snapshot per line. The first snapshot of an apartment contains all attributes of history_fields,
+    every following snapshot only the attributes that differ from the previous state (delta).
+    Hence, the file only grows if a listing is new or has been changed by the platform.
+    """
+    # path to the history file
+    path: str
+
+    # current state of each apartment reconstructed from all snapshots or None if not loaded yet
+    states: dict[Any, dict] | None
+
+    # snapshots created since the last call of save
+    snapshots_pending: list[dict]
+
+    def __init__(self, path: str):
+        self.path = path
+        self.states = None
+        self.snapshots_pending = []
+
+    def load(self) -> dict[Any, dict]:
+        """
+        Reconstructs the current state of all apartments by applying all snapshots in order.
+        The file is only read once and kept in memory afterward.
+        :return: current attributes per apartment id
+        """
+        if self.states is not None:
+            return self.states
+
+        self.states = {}
+        if not os.path.exists(self.path):
+            return self.states
+
+        with open(self.path, 'r') as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    snapshot = json.loads(line)
+                    self.states.setdefault(snapshot['id'], {}).update(snapshot['changes'])
+
+        return self.states
+
+    def update(self, apartment: Apartment) -> dict[str, tuple[Any, Any]] | None:
+        """
+        Compares an apartment with its last snapshot and creates a new snapshot containing all changed attributes
+        :param apartment: apartment as currently listed by the platform
+        :return: old and new value of each changed attribute or None if the apartment has no snapshot yet
+        """
+        states = self.load()
+        values = {x: getattr(apartment, x) for x in history_fields}
+
+        state = states.get(apartment.id)
+        if state is None:
+            states[apartment.id] = values
+            self._add_snapshot(apartment.id, values)
+            return None
+
+        changes = {x: (state.get(x), value) for x, value in values.items() if state.get(x) != value}
+        if changes:
+            state.update(values)
+            self._add_snapshot(apartment.id, {x: value for x, (_, value) in changes.items()})
+
+        return changes
+
+    def _add_snapshot(self, apt_id: Any, changes: dict):
+        self.snapshots_pending.append({'id': apt_id, 'timestamp': datetime.now().timestamp(), 'changes': changes})
+
+    def get_snapshots(self, apt_id: Any) -> list[dict]:
+        """
+        Reads all snapshots of an apartment
+        :param apt_id: id of the apartment
+        :return: snapshots sorted by time containing the keys id, timestamp and changes
+        """
+        snapshots = []
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as file:
+                for line in file:
+                    line = line.strip()
+                    if line:
+                        snapshot = json.loads(line)
+                        if snapshot['id'] == apt_id:
+                            snapshots.append(snapshot)
+
+        return snapshots + [x for x in self.snapshots_pending if x['id'] == apt_id]
+
+    def save(self):
+        """
+        Appends all snapshots created since the last call to the history file
+        """
+        if not self.snapshots_pending:
+            return
+
+        with open(self.path, 'a') as file:
+            file.writelines(json.dumps(x) + '\n' for x in self.snapshots_pending)
+        self.snapshots_pending = []
+
+    def retain(self, apt_ids: Iterable[Any]):
+        """
+        Removes the snapshots of all apartments not listed, e.g., after old apartments have been removed
+        :param apt_ids: ids of all apartments whose history is kept
+        """
+        self.save()
+        apt_ids = set(apt_ids)
+        states = self.load()
+        if all(x in apt_ids for x in states):
+            return
+
+        path_tmp = f'{self.path}.tmp'
+        with open(self.path, 'r') as file_in, open(path_tmp, 'w') as file_out:
+            for line in file_in:
+                line = line.strip()
+                if line and json.loads(line)['id'] in apt_ids:
+                    file_out.write(line + '\n')
+        os.replace(path_tmp, self.path)
+
+        self.states = {x: state for x, state in states.items() if x in apt_ids}
+
+
+def get_price_drop(changes: dict[str, tuple[Any, Any]]) -> dict[str, tuple[Any, Any]]:
+    """
+    :param changes: changed attributes returned by ApartmentHistory.update
+    :return: old and new value of each price that has been reduced
+    """
+    return {
+        x: (old, new) for x, (old, new) in changes.items()
+        if x in price_fields and old is not None and new is not None and new < old
+    }
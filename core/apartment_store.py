@@ -0,0 +1,698 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from abc import abstractmethod
+from bisect import bisect_left
+from collections.abc import Iterator
+from typing import Any
+
+from core.apartment import Apartment
+from core.apartment_codec import (
+    decode_apartments, decode_records, encode_apartments, encode_records, find_first_released, is_sorted
+)
+
+# names of all available storage backends, see create_apartment_store
+storage_backends = ['json', 'sqlite', 'jsonl', 'binary']
+
+# filename of the sqlite database used by all platforms
+filename_database = 'apartments.sqlite3'
+
+# names of all attributes of an apartment that are stored
+apartment_fields = list(Apartment.__slots__)
+
+
+def load_apartments_json(filename: str) -> list[Apartment]:
+    """
+    Loads saved apartments from a json file
+    :param filename: path to the json file to be loaded
+    :return: list of loaded apartments
+    """
+    if not os.path.exists(filename):
+        return []
+
+    with open(filename, 'r') as file:
+        apts_json = json.load(file)
+
+    apartments = []
+    for apt in apts_json:
+        apartments.append(Apartment.from_dict(apt))
+
+    return apartments
+
+
+class ApartmentStore:
+    """
+    Base class of all storage backends for the apartments of a platform.
+    The apartments are stored separately for category 0 and category 1 (see defaults_0 and defaults_1).
+    """
+
+    @abstractmethod
+    def load_apartments(self, category: int) -> list[Apartment]:
+        """
+        :param category: 0 or 1
+        :return: all stored apartments of the category
+        """
+        pass
+
+    @abstractmethod
+    def add_apartments(self, category: int, apartments: list[Apartment]):
+        """
+        Stores new apartments. Apartments with an id that is already stored in the category replace the stored ones.
+        :param category: 0 or 1
+        :param apartments: apartments to be stored
+        """
+        pass
+
+    @abstractmethod
+    def remove_apartments_released_before(self, timestamp: float) -> bool:
+        """
+        Removes all apartments of both categories which have been released before timestamp
+        :param timestamp: all apartments with an older release date are removed
+        :return: True if at least one apartment has been removed
+        """
+        pass
+
+    def load_apartments_released_since(self, category: int, timestamp: float | None) -> list[Apartment]:
+        """
+        :param category: 0 or 1
+        :param timestamp: timestamp of the oldest release date to be returned or None to load all apartments
+        :return: all stored apartments of the category released at or after timestamp sorted by release date
+        """
+        apartments = sorted(self.load_apartments(category), key=lambda x: x.released)
+        if timestamp is None:
+            return apartments
+        return apartments[bisect_left(apartments, timestamp, key=lambda x: x.released):]
+
+    def iter_fields(self, category: int, fields: list[str], timestamp: float | None = None) -> Iterator[tuple]:
+        """
+        Streams only the selected attributes of the stored apartments without creating Apartment objects.
+        :param category: 0 or 1
+        :param fields: names of the attributes to be returned, see apartment_fields
+        :param timestamp: timestamp of the oldest release date to be returned or None to return all apartments
+        :return: generator of tuples containing the values of the selected attributes in the order of fields
+        """
+        for apt in self.load_apartments_released_since(category, timestamp):
+            yield tuple(getattr(apt, x) for x in fields)
+
+    def iter_dicts(
+            self,
+            category: int,
+            fields: list[str] | None = None,
+            timestamp: float | None = None
+    ) -> Iterator[dict]:
+        """
+        Like iter_fields, but returns each apartment as dictionary like Apartment.to_dict
+        :param fields: names of the attributes to be returned or None to return all attributes
+        """
+        if fields is None:
+            fields = apartment_fields
+        for values in self.iter_fields(category, fields, timestamp):
+            yield dict(zip(fields, values))
+
+    def iter_ids(self) -> Iterator[Any]:
+        """
+        :return: generator of the ids of all stored apartments of both categories
+        """
+        for category in (0, 1):
+            for values in self.iter_fields(category, ['id']):
+                yield values[0]
+
+    def close(self):
+        pass
+
+
+class JsonApartmentStore(ApartmentStore):
+    """
+    Stores the apartments of each category in a json file sorted by release date. Every change rewrites the whole file.
+    """
+    paths: tuple[str, str]
+
+    def __init__(self, path_savefile_0: str, path_savefile_1: str):
+        self.paths = (path_savefile_0, path_savefile_1)
+
+    def _load(self, category: int) -> list[dict]:
+        """
+        :return: all apartments of the category sorted by release date
+        """
+        if not os.path.exists(self.paths[category]):
+            return []
+        with open(self.paths[category], 'r') as file:
+            # savefiles of older versions are in the order the apartments were found
+            return sorted(json.load(file), key=lambda x: x['released'])
+
+    def _save(self, category: int, apts_json: list[dict]):
+        with open(self.paths[category], 'w') as file:
+            json.dump(apts_json, file)
+
+    def load_apartments(self, category: int) -> list[Apartment]:
+        return [Apartment.from_dict(x) for x in self._load(category)]
+
+    def iter_fields(self, category: int, fields: list[str], timestamp: float | None = None) -> Iterator[tuple]:
+        apts_json = self._load(category)
+        start = 0 if timestamp is None else bisect_left(apts_json, timestamp, key=lambda x: x['released'])
+        for apt_json in apts_json[start:]:
+            yield tuple(apt_json[x] for x in fields)
+
+    def add_apartments(self, category: int, apartments: list[Apartment]):
+        if not apartments:
+            return
+        new_ids = {x.id for x in apartments}
+        apts_json = [x for x in self._load(category) if x['id'] not in new_ids] + [x.to_dict() for x in apartments]
+        self._save(category, sorted(apts_json, key=lambda x: x['released']))
+
+    def remove_apartments_released_before(self, timestamp: float) -> bool:
+        is_removed = False
+        for category in (0, 1):
+            apts_json = self._load(category)
+            index = bisect_left(apts_json, timestamp, key=lambda x: x['released'])
+            if index > 0:
+                self._save(category, apts_json[index:])
+                is_removed = True
+        return is_removed
+
+
+class SqliteApartmentStore(ApartmentStore):
+    """
+    Stores the apartments in a sqlite database. The apartments of each category are stored in a separate table
+    named after the corresponding json savefile, e.g., gvg_0 and gvg_1.
+    Existing json savefiles are imported once and renamed to <savefile>.migrated afterward.
+    """
+    path_database: str
+    paths_json: tuple[str, str]
+    tables: tuple[str, str]
+    connection: sqlite3.Connection | None
+
+    columns = apartment_fields
+
+    def __init__(self, path_database: str, path_savefile_0: str, path_savefile_1: str):
+        self.path_database = path_database
+        self.paths_json = (path_savefile_0, path_savefile_1)
+        self.tables = (self._get_table_name(path_savefile_0), self._get_table_name(path_savefile_1))
+        self.connection = None
+
+    @staticmethod
+    def _get_table_name(path_savefile: str) -> str:
+        name = os.path.splitext(os.path.basename(path_savefile))[0]
+        return re.sub('[^A-Za-z0-9_]', '_', name)
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens the database on first use, creates the tables and migrates existing json savefiles
+        """
+        if self.connection is not None:
+            return self.connection
+
+        self.connection = sqlite3.connect(self.path_database, timeout=60)
+        with self.connection:
+            for table in self.tables:
+                # the column id has no type to keep the datatype of the ids provided by the platform
+                self.connection.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{table}" ('
+                    'id PRIMARY KEY, description TEXT, url TEXT, zip INTEGER, place TEXT, street TEXT, '
+                    'house_number INTEGER, rent_cold INTEGER, rent_warm INTEGER, rooms REAL, apartment_size REAL, '
+                    'floor INTEGER, year_of_construction INTEGER, heating_type TEXT, energy_efficiency_class TEXT, '
+                    'exchange_apartment INTEGER, released REAL)'
+                )
+                self.connection.execute(f'CREATE INDEX IF NOT EXISTS "{table}_released" ON "{table}" (released)')
+
+        for category in (0, 1):
+            self._migrate_json(category)
+
+        return self.connection
+
+    def _migrate_json(self, category: int):
+        path_json = self.paths_json[category]
+        if not os.path.exists(path_json):
+            return
+
+        apartments = load_apartments_json(path_json)
+        with self.connection:
+            self.connection.executemany(
+                f'INSERT OR IGNORE INTO "{self.tables[category]}" VALUES ({", ".join("?" * len(self.columns))})',
+                (self._to_row(x) for x in apartments)
+            )
+        os.replace(path_json, f'{path_json}.migrated')
+        print(f'Migrated {len(apartments)} apartments from "{path_json}" to "{self.path_database}"')
+
+    def _to_row(self, apartment: Apartment) -> tuple:
+        apt_dict = apartment.to_dict()
+        return tuple(apt_dict[x] for x in self.columns)
+
+    def _from_row(self, row: tuple) -> Apartment:
+        apt_dict = dict(zip(self.columns, row))
+        if apt_dict['exchange_apartment'] is not None:
+            apt_dict['exchange_apartment'] = bool(apt_dict['exchange_apartment'])
+        return Apartment.from_dict(apt_dict)
+
+    def load_apartments(self, category: int) -> list[Apartment]:
+        cursor = self._connect().execute(
+            f'SELECT {", ".join(self.columns)} FROM "{self.tables[category]}" ORDER BY released'
+        )
+        return [self._from_row(x) for x in cursor]
+
+    def load_apartments_released_since(self, category: int, timestamp: float | None) -> list[Apartment]:
+        if timestamp is None:
+            return self.load_apartments(category)
+        cursor = self._connect().execute(
+            f'SELECT {", ".join(self.columns)} FROM "{self.tables[category]}" WHERE released >= ? ORDER BY released',
+            (timestamp,)
+        )
+        return [self._from_row(x) for x in cursor]
+
+    def add_apartments(self, category: int, apartments: list[Apartment]):
+        if not apartments:
+            return
+        # upsert: an already stored apartment is replaced including its release date like in all other backends
+        columns_update = ', '.join(f'{x} = excluded.{x}' for x in self.columns if x != 'id')
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                f'INSERT INTO "{self.tables[category]}" ({", ".join(self.columns)}) '
+                f'VALUES ({", ".join("?" * len(self.columns))}) '
+                f'ON CONFLICT (id) DO UPDATE SET {columns_update}',
+                (self._to_row(x) for x in apartments)
+            )
+
+    def remove_apartments_released_before(self, timestamp: float) -> bool:
+        connection = self._connect()
+        num_removed = 0
+        with connection:
+            for table in self.tables:
+                num_removed += connection.execute(f'DELETE FROM "{table}" WHERE released < ?', (timestamp,)).rowcount
+        return num_removed > 0
+
+    def iter_fields(self, category: int, fields: list[str], timestamp: float | None = None) -> Iterator[tuple]:
+        for field in fields:
+            if field not in self.columns:
+                raise ValueError(f'Unknown attribute "{field}"')
+
+        query = f'SELECT {", ".join(fields)} FROM "{self.tables[category]}"'
+        if timestamp is None:
+            cursor = self._connect().execute(query)
+        else:
+            cursor = self._connect().execute(f'{query} WHERE released >= ? ORDER BY released', (timestamp,))
+
+        if 'exchange_apartment' not in fields:
+            yield from cursor
+            return
+
+        position = fields.index('exchange_apartment')
+        for row in cursor:
+            if row[position] is not None:
+                row = row[:position] + (bool(row[position]),) + row[position + 1:]
+            yield row
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class JsonlApartmentStore(ApartmentStore):
+    """
+    Stores the apartments of each category in append-only logs containing one json encoded apartment per line.
+    The logs are split into segments by release date. Each segment <savefile>.<start>.jsonl covers segment_length
+    seconds starting at the timestamp start.
+    New apartments are appended to the segment of their release date. Removing old apartments deletes all segments
+    older than the given timestamp. For the segment containing the timestamp only a watermark on the release date is
+    moved (stored in <savefile>.jsonl.meta), records older than the watermark are skipped by all readers.
+    If the share of removed or replaced records of this segment exceeds compaction_threshold, it is compacted in a
+    background thread. Apartments appended during the compaction are preserved.
+    Existing json savefiles are imported once and renamed to <savefile>.migrated afterward.
+    """
+    # length of the time range covered by one segment in seconds
+    segment_length = 7 * 86400
+
+    paths_base: tuple[str, str]
+    paths_json: tuple[str, str]
+
+    # share of removed or replaced records in a segment that triggers a compaction
+    compaction_threshold: float
+
+    # lock protecting appends, meta files and the replacement of a segment by its compacted version
+    lock: threading.Lock
+    threads_compaction: list[threading.Thread]
+
+    def __init__(self, path_savefile_0: str, path_savefile_1: str, compaction_threshold: float):
+        self.paths_json = (path_savefile_0, path_savefile_1)
+        self.paths_base = (os.path.splitext(path_savefile_0)[0], os.path.splitext(path_savefile_1)[0])
+        self.compaction_threshold = compaction_threshold
+        self.lock = threading.Lock()
+        self.threads_compaction = []
+
+        for category in (0, 1):
+            self._migrate_log(category)
+            self._migrate_json(category)
+
+    def _migrate_json(self, category: int):
+        path_json = self.paths_json[category]
+        if self._get_segments(category) or not os.path.exists(path_json):
+            return
+
+        apartments = load_apartments_json(path_json)
+        self.add_apartments(category, apartments)
+        os.replace(path_json, f'{path_json}.migrated')
+        print(f'Migrated {len(apartments)} apartments from "{path_json}" to "{self.paths_base[category]}.*.jsonl"')
+
+    def _migrate_log(self, category: int):
+        """
+        Splits a log without segments into segments
+        """
+        path_log = f'{self.paths_base[category]}.jsonl'
+        if not os.path.exists(path_log):
+            return
+
+        released_min = self._get_released_min(category)
+        with open(path_log, 'r') as file:
+            records = [json.loads(x) for x in file]
+        self.add_apartments(category, [
+            Apartment.from_dict(x) for x in records if released_min is None or x['released'] >= released_min
+        ])
+        os.remove(path_log)
+
+    def _get_segments(self, category: int) -> list[tuple[int, str]]:
+        """
+        :return: start timestamp and path of all segments of the category sorted by time
+        """
+        path_dir = os.path.dirname(self.paths_base[category])
+        prefix = f'{os.path.basename(self.paths_base[category])}.'
+        if not os.path.isdir(path_dir or '.'):
+            return []
+
+        segments = []
+        for filename in os.listdir(path_dir or '.'):
+            if not filename.startswith(prefix) or not filename.endswith('.jsonl'):
+                continue
+            start = filename[len(prefix):-len('.jsonl')]
+            if start.isdigit():
+                segments.append((int(start), os.path.join(path_dir, filename)))
+
+        return sorted(segments)
+
+    def _get_path_segment(self, category: int, released: float) -> str:
+        start = int(released // self.segment_length * self.segment_length)
+        return f'{self.paths_base[category]}.{start}.jsonl'
+
+    def _get_released_min(self, category: int) -> float | None:
+        path_meta = f'{self.paths_base[category]}.jsonl.meta'
+        if not os.path.exists(path_meta):
+            return None
+        with open(path_meta, 'r') as file:
+            return json.load(file)['released_min']
+
+    def _set_released_min(self, category: int, released_min: float):
+        path_meta = f'{self.paths_base[category]}.jsonl.meta'
+        with open(f'{path_meta}.tmp', 'w') as file:
+            json.dump({'released_min': released_min}, file)
+        os.replace(f'{path_meta}.tmp', path_meta)
+
+    def iter_records(self, category: int, timestamp_min: float | None = None) -> Iterator[dict]:
+        """
+        Streams all records line by line sorted by segment. Records older than the watermark are skipped.
+        If an apartment has been added multiple times, all of its records are returned in the order they were added.
+        :param category: 0 or 1
+        :param timestamp_min: only records released at or after this timestamp are returned,
+            segments ending before are not read at all. None to return all records.
+        :return: generator of all records as dictionaries
+        """
+        released_min = self._get_released_min_read(category, timestamp_min)
+        for path in self._get_paths_read(category, released_min):
+            yield from self._read_segment(path, released_min)
+
+    def _get_released_min_read(self, category: int, timestamp_min: float | None) -> float | None:
+        """
+        :return: release date of the oldest record to be read considering the watermark, None to read all records
+        """
+        released_min = self._get_released_min(category)
+        if released_min is None or (timestamp_min is not None and timestamp_min > released_min):
+            return timestamp_min
+        return released_min
+
+    def _get_paths_read(self, category: int, released_min: float | None) -> list[str]:
+        """
+        :return: paths of all segments sorted by time containing records released at or after released_min
+        """
+        return [
+            path for start, path in self._get_segments(category)
+            if released_min is None or start + self.segment_length > released_min
+        ]
+
+    @staticmethod
+    def _read_segment(path: str, released_min: float | None) -> Iterator[dict]:
+        with open(path, 'r') as file:
+            for line in file:
+                record = json.loads(line)
+                if released_min is None or record['released'] >= released_min:
+                    yield record
+
+    def _iter_latest_records(self, category: int, timestamp_min: float | None) -> Iterator[list[dict]]:
+        """
+        Like iter_records, but only returns the latest record of each apartment. Since an apartment is never added
+        again with an older release date, its latest record is the last one in the last segment containing it.
+        Hence the segments are read from the newest to the oldest one, only a single segment and the ids of the
+        apartments already returned are kept in memory.
+        :return: generator of the latest records of each segment sorted by release date, newest segment first
+        """
+        released_min = self._get_released_min_read(category, timestamp_min)
+        ids_read = set()
+        for path in reversed(self._get_paths_read(category, released_min)):
+            records = []
+            for record in reversed(list(self._read_segment(path, released_min))):
+                if record['id'] not in ids_read:
+                    ids_read.add(record['id'])
+                    records.append(record)
+            yield sorted(records, key=lambda x: x['released'])
+
+    def load_apartments(self, category: int) -> list[Apartment]:
+        return self.load_apartments_released_since(category, None)
+
+    def load_apartments_released_since(self, category: int, timestamp: float | None) -> list[Apartment]:
+        segments = [
+            [Apartment.from_dict(x) for x in records] for records in self._iter_latest_records(category, timestamp)
+        ]
+        return [apt for apartments in reversed(segments) for apt in apartments]
+
+    def iter_fields(self, category: int, fields: list[str], timestamp: float | None = None) -> Iterator[tuple]:
+        for records in self._iter_latest_records(category, timestamp):
+            for record in records:
+                yield tuple(record[x] for x in fields)
+
+    def add_apartments(self, category: int, apartments: list[Apartment]):
+        if not apartments:
+            return
+
+        lines = {}
+        for apt in apartments:
+            lines.setdefault(self._get_path_segment(category, apt.released), []).append(
+                json.dumps(apt.to_dict()) + '\n'
+            )
+
+        with self.lock:
+            for path, lines_segment in lines.items():
+                with open(path, 'a') as file:
+                    file.writelines(lines_segment)
+
+    def remove_apartments_released_before(self, timestamp: float) -> bool:
+        is_removed = False
+        for category in (0, 1):
+            released_min = self._get_released_min(category)
+            if released_min is not None and timestamp <= released_min:
+                continue
+
+            for start, path in self._get_segments(category):
+                if start >= timestamp:
+                    break
+
+                if start + self.segment_length <= timestamp:
+                    # segment is older than timestamp
+                    with self.lock:
+                        os.remove(path)
+                    is_removed = is_removed or released_min is None or start + self.segment_length > released_min
+                    continue
+
+                # segment contains timestamp: count records that are removed now, were removed before
+                # or have been replaced by a newer record
+                num_records = 0
+                num_dead = 0
+                ids = set()
+                with open(path, 'r') as file:
+                    for line in file:
+                        record = json.loads(line)
+                        num_records += 1
+                        if record['released'] < timestamp:
+                            is_removed = is_removed or released_min is None or record['released'] >= released_min
+                            num_dead += 1
+                        elif record['id'] in ids:
+                            num_dead += 1
+                        else:
+                            ids.add(record['id'])
+
+                if num_records and num_dead / num_records > self.compaction_threshold:
+                    thread = threading.Thread(target=self._compact, args=(path, timestamp), name=f'compaction {path}')
+                    thread.start()
+                    self.threads_compaction.append(thread)
+
+            with self.lock:
+                self._set_released_min(category, timestamp)
+
+        return is_removed
+
+    def _compact(self, path: str, released_min: float):
+        """
+        Rewrites a segment keeping only the latest record of each apartment not older than released_min.
+        The segment is read without holding the lock, only the records appended in the meantime are copied while
+        holding the lock.
+        """
+        with self.lock:
+            size = os.path.getsize(path)
+
+        # first pass: find the latest record of each apartment
+        line_latest = {}
+        num_records = 0
+        with open(path, 'rb') as file:
+            for line_number, line in enumerate(self._read_lines(file, size)):
+                line_latest[json.loads(line)['id']] = line_number
+                num_records += 1
+
+        # second pass: write all latest records that have not been removed
+        lines_keep = set(line_latest.values())
+        num_records_keep = 0
+        path_tmp = f'{path}.compact'
+        with open(path, 'rb') as file, open(path_tmp, 'wb') as file_tmp:
+            for line_number, line in enumerate(self._read_lines(file, size)):
+                if line_number not in lines_keep:
+                    continue
+                if json.loads(line)['released'] < released_min:
+                    continue
+                file_tmp.write(line)
+                num_records_keep += 1
+
+            with self.lock:
+                # copy records appended during the compaction
+                file.seek(size)
+                file_tmp.write(file.read())
+                file_tmp.close()
+                os.replace(path_tmp, path)
+
+        print(f'Compacted "{path}": {num_records_keep} of {num_records} records kept')
+
+    @staticmethod
+    def _read_lines(file, size: int) -> Iterator[bytes]:
+        position = 0
+        for line in file:
+            position += len(line)
+            if position > size:
+                return
+            yield line
+
+    def close(self):
+        for thread in self.threads_compaction:
+            thread.join()
+        self.threads_compaction = []
+
+
+class BinaryApartmentStore(ApartmentStore):
+    """
+    Stores the apartments of each category in a file using the binary format of core.apartment_codec.
+    The apartments are sorted by release date, hence time ranges are found by bisection without decoding all records.
+    Files of older versions whose apartments are not sorted are sorted when they are loaded for the first time.
+    Every change rewrites the whole file, but encoding and decoding is considerably faster than json.
+    Existing json savefiles are imported once and renamed to <savefile>.migrated afterward.
+    """
+    paths: tuple[str, str]
+    paths_json: tuple[str, str]
+
+    def __init__(self, path_savefile_0: str, path_savefile_1: str):
+        self.paths_json = (path_savefile_0, path_savefile_1)
+        self.paths = (f'{os.path.splitext(path_savefile_0)[0]}.bin', f'{os.path.splitext(path_savefile_1)[0]}.bin')
+
+        for category in (0, 1):
+            self._migrate_json(category)
+
+    def _migrate_json(self, category: int):
+        path_json = self.paths_json[category]
+        if os.path.exists(self.paths[category]) or not os.path.exists(path_json):
+            return
+
+        apartments = load_apartments_json(path_json)
+        self._save(category, apartments)
+        os.replace(path_json, f'{path_json}.migrated')
+        print(f'Migrated {len(apartments)} apartments from "{path_json}" to "{self.paths[category]}"')
+
+    def _save(self, category: int, apartments: list[Apartment]):
+        path = self.paths[category]
+        with open(f'{path}.tmp', 'wb') as file:
+            file.write(encode_apartments(apartments))
+        os.replace(f'{path}.tmp', path)
+
+    def _load(self, category: int) -> bytes:
+        if not os.path.exists(self.paths[category]):
+            return b''
+        with open(self.paths[category], 'rb') as file:
+            data = file.read()
+
+        if not is_sorted(data):
+            self._save(category, sorted(decode_apartments(data), key=lambda x: x.released))
+            print(f'Sorted the apartments in "{self.paths[category]}" by release date')
+            return self._load(category)
+        return data
+
+    def load_apartments(self, category: int) -> list[Apartment]:
+        return decode_apartments(self._load(category))
+
+    def load_apartments_released_since(self, category: int, timestamp: float | None) -> list[Apartment]:
+        data = self._load(category)
+        if timestamp is None:
+            return decode_apartments(data)
+        return decode_apartments(data, find_first_released(data, timestamp))
+
+    def iter_fields(self, category: int, fields: list[str], timestamp: float | None = None) -> Iterator[tuple]:
+        data = self._load(category)
+        start = 0 if timestamp is None else find_first_released(data, timestamp)
+        yield from decode_records(data, start, fields)
+
+    def add_apartments(self, category: int, apartments: list[Apartment]):
+        if not apartments:
+            return
+        new_ids = {x.id for x in apartments}
+        apartments_keep = [x for x in self.load_apartments(category) if x.id not in new_ids]
+        self._save(category, sorted(apartments_keep + apartments, key=lambda x: x.released))
+
+    def remove_apartments_released_before(self, timestamp: float) -> bool:
+        is_removed = False
+        for category in (0, 1):
+            data = self._load(category)
+            index = find_first_released(data, timestamp)
+            if index > 0:
+                path = self.paths[category]
+                with open(f'{path}.tmp', 'wb') as file:
+                    file.write(encode_records(decode_records(data, index)))
+                os.replace(f'{path}.tmp', path)
+                is_removed = True
+        return is_removed
+
+
+def create_apartment_store(config: dict, path_savefile_0: str, path_savefile_1: str) -> ApartmentStore:
+    """
+    Creates the storage backend selected in the user configuration
+    :param config: user configuration, the backend is selected by the setting storage_backend
+    :param path_savefile_0: path to the json savefile of category 0
+    :param path_savefile_1: path to the json savefile of category 1
+    :return: storage backend
+    """
+    backend = config['storage_backend']
+    if backend == 'json':
+        return JsonApartmentStore(path_savefile_0, path_savefile_1)
+    elif backend == 'sqlite':
+        path_database = os.path.join(os.path.dirname(path_savefile_0), filename_database)
+        return SqliteApartmentStore(path_database, path_savefile_0, path_savefile_1)
+    elif backend == 'jsonl':
+        return JsonlApartmentStore(path_savefile_0, path_savefile_1, config['jsonl_compaction_threshold'])
+    elif backend == 'binary':
+        return BinaryApartmentStore(path_savefile_0, path_savefile_1)
+    else:
+        raise ValueError(f'Unknown storage backend "{backend}". Valid values: {storage_backends}')
@@ -0,0 +1,112 @@
+"""
+Files making runs of a platform resumable if the process is aborted, e.g., killed or the machine has been shut down.
+
+CrawlJournal keeps all apartment pages requested by a run until the run has been saved, hence a run following an
+aborted run does not request the same pages again. MailOutbox keeps each email together with the new apartments it
+lists from before the apartments are saved until it has been sent. If the run is aborted before the apartments have
+been saved, the next run saves them from the outbox before the crawl journal is replayed, hence they are neither lost
+nor found as new apartments and sent again. An email is only sent twice if the process is aborted while sending it.
+"""
+from __future__ import annotations
+
+import json
+import os
+
+from core.utils import send_mail
+
+
+class CrawlJournal:
+    """
+    Journal of the apartment pages requested by the current run. Each page is appended to the journal file as soon
+    as it has been requested. The journal is removed once the run has been saved.
+    """
+    # path to the journal file (json lines)
+    path: str
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> dict[str, dict]:
+        """
+        :return: raw apartment per url of all pages requested by an aborted run
+        """
+        pages = {}
+        if not os.path.exists(self.path):
+            return pages
+
+        with open(self.path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    page = json.loads(line)
+                except json.JSONDecodeError:
+                    # last line of a journal whose run has been aborted while writing
+                    continue
+                pages[page['url']] = page['apartment']
+        return pages
+
+    def add(self, url: str, apt_raw: dict):
+        """
+        Appends a requested page to the journal
+        :param url: url of the apartment page
+        :param apt_raw: raw apartment extracted from the page
+        """
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps({'url': url, 'apartment': apt_raw}) + '\n')
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class MailOutbox:
+    """
+    Emails that have been composed but not sent yet together with the new apartments listed by each email.
+    The outbox file is replaced atomically on each change.
+    """
+    # path to the outbox file (json)
+    path: str
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> list[dict]:
+        """
+        :return: pending entries: arguments of send_mail ('mail') and the new apartments of group 0 and group 1
+            listed by the email as dictionaries ('apartments')
+        """
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def _save(self, entries: list[dict]):
+        if not entries:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+
+        path_tmp = f'{self.path}.tmp'
+        with open(path_tmp, 'w', encoding='utf-8') as file:
+            json.dump(entries, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path_tmp, self.path)
+
+    def add(self, mail: dict, apartments: list[list[dict]]):
+        """
+        :param mail: arguments of send_mail
+        :param apartments: new apartments of group 0 and group 1 as dictionaries which are saved by the run
+        """
+        self._save(self.load() + [{'mail': mail, 'apartments': apartments}])
+
+    def send(self) -> int:
+        """
+        Sends all pending emails in the order they have been added. Each email is removed from the outbox as soon
+        as it has been sent. If sending fails, the email and all following emails are kept.
+        :return: number of emails sent
+        """
+        entries = self.load()
+        for i, entry in enumerate(entries):
+            send_mail(**entry['mail'])
+            self._save(entries[i + 1:])
+        return len(entries)
@@ -1,32 +1,123 @@
+import importlib.util
+import os
+import sys
+from types import ModuleType
+
 import user_configuration
 
 
-def load_configuration():
+def load_configuration(settings: ModuleType | None = None):
+    """
+    :param settings: module providing the settings or None to use user_configuration
+    """
+    if settings is None:
+        settings = user_configuration
+
     config = {
-        'zips_included': user_configuration.zips_included,
-        'zips_excluded': user_configuration.zips_excluded,
-        'places_included': user_configuration.places_included,
-        'places_excluded': user_configuration.places_excluded,
-        'rent_cold_min': user_configuration.rent_cold_min,
-        'rent_cold_max': user_configuration.rent_cold_max,
-        'rent_warm_min': user_configuration.rent_warm_min,
-        'rent_warm_max': user_configuration.rent_warm_max,
-        'rooms_min': user_configuration.rooms_min,
-        'rooms_max': user_configuration.rooms_max,
-        'apartment_size_min': user_configuration.apartment_size_min,
-        'apartment_size_max': user_configuration.apartment_size_max,
-        'floors': user_configuration.floors,
-        'energy_efficiency_classes': user_configuration.energy_efficiency_classes,
-        'year_of_construction_min': user_configuration.year_of_construction_min,
-        'year_of_construction_max': user_configuration.year_of_construction_max,
-        'exchange_apartment': user_configuration.exchange_apartment,
-        'path_files': user_configuration.path_files,
-        'max_apartment_age': user_configuration.max_apartment_age,
-        'email_from_address': user_configuration.email_from_address,
-        'email_to_address': user_configuration.email_to_address,
-        'email_send_status': user_configuration.email_send_status,
-        'defaults_user': user_configuration.defaults,
-        'notify_on_new_apartments_only': user_configuration.notify_on_new_apartments_only
+        'zips_included': settings.zips_included,
+        'zips_excluded': settings.zips_excluded,
+        'places_included': settings.places_included,
+        'places_excluded': settings.places_excluded,
+        'rent_cold_min': settings.rent_cold_min,
+        'rent_cold_max': settings.rent_cold_max,
+        'rent_warm_min': settings.rent_warm_min,
+        'rent_warm_max': settings.rent_warm_max,
+        'rooms_min': settings.rooms_min,
+        'rooms_max': settings.rooms_max,
+        'apartment_size_min': settings.apartment_size_min,
+        'apartment_size_max': settings.apartment_size_max,
+        'floors': settings.floors,
+        'energy_efficiency_classes': settings.energy_efficiency_classes,
+        'year_of_construction_min': settings.year_of_construction_min,
+        'year_of_construction_max': settings.year_of_construction_max,
+        'exchange_apartment': settings.exchange_apartment,
+        'path_files': settings.path_files,
+        'max_apartment_age': settings.max_apartment_age,
+        'reorder_filter_checks': settings.reorder_filter_checks,
+        'storage_backend': settings.storage_backend,
+        'jsonl_compaction_threshold': settings.jsonl_compaction_threshold,
+        'error_log_retention': settings.error_log_retention,
+        'email_from_address': settings.email_from_address,
+        'email_to_address': settings.email_to_address,
+        'email_send_status': settings.email_send_status,
+        'defaults_user': settings.defaults,
+        'notify_on_new_apartments_only': settings.notify_on_new_apartments_only,
+        'notify_on_price_drop': settings.notify_on_price_drop,
+        'notify_early_batch_size': settings.notify_early_batch_size,
+        'notify_early_interval': settings.notify_early_interval,
+        'platforms_enabled': settings.platforms_enabled,
+        'max_parallel_platforms': settings.max_parallel_platforms,
+        'platform_time_budget': settings.platform_time_budget,
+        'daemon_interval': settings.daemon_interval,
+        'platform_intervals': settings.platform_intervals,
+        'adaptive_polling': settings.adaptive_polling,
+        'polling_target_latency': settings.polling_target_latency,
+        'polling_budget': settings.polling_budget,
+        'detect_duplicates_across_platforms': settings.detect_duplicates_across_platforms
     }
 
-    return config
\ No newline at end of file
+    return config
+
+
+def reload_configuration() -> ModuleType:
+    """
+    Loads user_configuration.py again, e.g., after it has been modified while the daemon is running.
+    The loaded settings are not modified until the new module is passed to apply_configuration, hence it can be
+    validated first.
+    :return: new module
+    """
+    spec = importlib.util.find_spec('user_configuration')
+    settings = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(settings)
+    return settings
+
+
+def apply_configuration(settings: ModuleType):
+    """
+    Replaces the loaded settings
+    :param settings: module returned by reload_configuration
+    """
+    global user_configuration
+    user_configuration = settings
+    sys.modules['user_configuration'] = settings
+
+
+# names of the settings in user_configuration.py whose key in the configuration differs
+setting_keys = {'defaults': 'defaults_user'}
+
+# settings affecting the whole run which apply to all profiles and cannot be set per profile
+settings_run = [
+    'platforms_enabled', 'max_parallel_platforms', 'platform_time_budget', 'daemon_interval', 'platform_intervals',
+    'adaptive_polling', 'polling_target_latency', 'polling_budget'
+]
+
+
+def load_profiles(settings: ModuleType | None = None) -> dict[str, dict]:
+    """
+    Loads the configuration of each profile defined in user_configuration.profiles.
+    Each profile overrides the settings of the default configuration except settings_run. If path_files is not
+    overridden, the files of a profile are stored in a subdirectory of path_files named like the profile.
+    :param settings: module providing the settings or None to use user_configuration
+    :return: configuration per profile name. If no profiles are defined, only the profile 'default'
+        containing the default configuration.
+    """
+    if settings is None:
+        settings = user_configuration
+
+    if settings.profiles is None:
+        return {'default': load_configuration(settings)}
+
+    profiles = {}
+    for name, settings_profile in settings.profiles.items():
+        config = load_configuration(settings)
+        config['path_files'] = os.path.join(config['path_files'], name)
+        for setting, value in settings_profile.items():
+            key = setting_keys.get(setting, setting)
+            if key not in config:
+                raise ValueError(f'Unknown setting "{setting}" in profile "{name}"')
+            if key in settings_run:
+                raise ValueError(f'Setting "{setting}" applies to all profiles and cannot be set in profile "{name}"')
+            config[key] = value
+        profiles[name] = config
+
+    return profiles
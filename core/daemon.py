@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import signal
+import sys
+import threading
+import traceback
+from collections.abc import Callable
+from datetime import date, datetime
+
+from core.adaptive_schedule import PollingSchedule, estimate_arrival_rates, lookback_weeks
+from core.config_loader import apply_configuration, load_profiles, reload_configuration
+from core.duplicate_matcher import DuplicateMatcher
+from core.platform_registry import PlatformEntry, get_platforms
+from core.platform_runner import create_duplicate_matchers, print_run_summary, run_platforms
+from core.wohnungssucher_base import WohnungssucherBase
+
+
+class Daemon:
+    """
+    Keeps the process alive and runs each platform repeatedly according to its interval
+    (settings 'platform_intervals', the default interval of the platform in the registry and 'daemon_interval').
+    If 'adaptive_polling' is enabled, the intervals are adapted daily to the number of new apartments of each
+    platform per weekday (see PollingSchedule).
+    In contrast to starting main.py once per run, the parsed configuration, the instances of all platforms
+    (including their HTTP connections, known id indexes and apartment histories) and the duplicate matchers are
+    kept in memory between the runs.
+    SIGTERM and SIGINT stop the daemon after the current runs finished. SIGHUP reloads the configuration. An invalid
+    configuration is rejected and the daemon continues with the previous one.
+    """
+    # list of tuples of the short name and the entry point of each platform
+    platforms: list[tuple[str, PlatformEntry]]
+
+    # called once per day with the platforms and the configuration of each profile, e.g., to send status reports
+    on_new_day: Callable[[list[tuple[str, PlatformEntry]], dict[str, dict]], None] | None
+
+    # user configuration per profile name
+    profiles: dict[str, dict]
+
+    # instances per platform name and profile name
+    instances: dict[str, dict[str, WohnungssucherBase]]
+
+    # duplicate matcher per profile name
+    duplicate_matchers: dict[str, DuplicateMatcher]
+
+    # timestamp of the next run per platform name
+    next_runs: dict[str, float]
+
+    # adaptive polling intervals or None if adaptive_polling is disabled
+    polling_schedule: PollingSchedule | None
+
+    # date on_new_day has been called the last time
+    date_last: date | None
+
+    # set to wake up the scheduler, e.g., if a signal has been received
+    wakeup: threading.Event
+
+    is_stop_requested: bool
+    is_reload_requested: bool
+
+    def __init__(
+            self,
+            platforms: list[tuple[str, PlatformEntry]],
+            on_new_day: Callable[[list[tuple[str, PlatformEntry]], dict[str, dict]], None] | None = None
+    ):
+        self.platforms = platforms
+        self.on_new_day = on_new_day
+        self.profiles = {}
+        self.instances = {}
+        self.duplicate_matchers = {}
+        self.next_runs = {}
+        self.polling_schedule = None
+        self.date_last = None
+        self.wakeup = threading.Event()
+        self.is_stop_requested = False
+        self.is_reload_requested = False
+
+    def _load(self):
+        """
+        Loads the configuration and drops all instances created with the previous configuration
+        """
+        if not self.platforms:
+            raise ValueError('No platform enabled in platforms_enabled')
+        self.profiles = load_profiles()
+        self.instances = {}
+        self.duplicate_matchers = create_duplicate_matchers(self.platforms, self.profiles, self.instances)
+
+    def _reload(self):
+        """
+        Loads and validates the modified configuration before replacing the current one. The enabled platforms
+        are resolved again if 'platforms_enabled' has been changed.
+        """
+        print('Reloading configuration')
+        try:
+            settings = reload_configuration()
+            profiles = load_profiles(settings)
+            config = next(iter(profiles.values()))
+            platforms = self.platforms
+            if config['platforms_enabled'] != next(iter(self.profiles.values()))['platforms_enabled']:
+                platforms = get_platforms(config)
+                if not platforms:
+                    raise ValueError('No platform enabled in platforms_enabled')
+            # imports newly enabled platforms, otherwise only the duplicate detection would create their instances
+            for _, entry in platforms:
+                entry.load()
+            instances = {}
+            duplicate_matchers = create_duplicate_matchers(platforms, profiles, instances)
+        except:
+            # keep the previous configuration
+            print('Invalid configuration, keeping the previous configuration', file=sys.stderr)
+            print(traceback.format_exc(), file=sys.stderr)
+            return
+
+        apply_configuration(settings)
+        self.platforms = platforms
+        self.profiles = profiles
+        self.instances = instances
+        self.duplicate_matchers = duplicate_matchers
+        # newly enabled platforms are run immediately
+        self.next_runs = {x: y for x, y in self.next_runs.items() if x in dict(platforms)}
+        try:
+            self._update_polling_schedule()
+        except:
+            print(traceback.format_exc(), file=sys.stderr)
+
+    def _update_polling_schedule(self):
+        """
+        Estimates the arrival rates of all platforms from the stored apartments of the first profile
+        and adapts the polling intervals to them
+        """
+        profile, config = next(iter(self.profiles.items()))
+        if not config['adaptive_polling']:
+            self.polling_schedule = None
+            return
+
+        now = datetime.now().timestamp()
+        arrival_rates = {}
+        for name, cls in self.platforms:
+            try:
+                instances = self.instances.setdefault(name, {})
+                if profile not in instances:
+                    instances[profile] = cls(config)
+                store = instances[profile].apartment_store
+                released = [
+                    values[0] for category in (0, 1)
+                    for values in store.iter_fields(category, ['released'], now - lookback_weeks * 7 * 86400)
+                ]
+                store.close()
+                arrival_rates[name] = estimate_arrival_rates(released, now)
+            except:
+                # the platform keeps its fixed interval, errors are reported by the runs of the platform
+                print(traceback.format_exc(), file=sys.stderr)
+
+        self.polling_schedule = PollingSchedule(
+            arrival_rates,
+            config['polling_target_latency'],
+            config['polling_budget'],
+            config['daemon_interval']
+        )
+        print(self.polling_schedule)
+
+    def get_interval(self, name: str) -> float:
+        """
+        :param name: short name of the platform
+        :return: interval between two runs of the platform in seconds (the settings apply to all profiles)
+        """
+        if self.polling_schedule is not None:
+            interval = self.polling_schedule.get_interval(name, datetime.now().weekday())
+            if interval is not None:
+                return 60 * interval
+
+        config = next(iter(self.profiles.values()))
+        if name in config['platform_intervals']:
+            return 60 * config['platform_intervals'][name]
+        entry = dict(self.platforms)[name]
+        if entry.default_interval is not None:
+            return 60 * entry.default_interval
+        return 60 * config['daemon_interval']
+
+    def _handle_stop(self, signum, frame):
+        self.is_stop_requested = True
+        self.wakeup.set()
+
+    def _handle_reload(self, signum, frame):
+        self.is_reload_requested = True
+        self.wakeup.set()
+
+    def stop(self):
+        """
+        Stops the daemon after the current runs finished. Can be called from other threads.
+        """
+        self._handle_stop(None, None)
+
+    def _run_due_platforms(self):
+        now = datetime.now().timestamp()
+        platforms_due = [x for x in self.platforms if self.next_runs.get(x[0], 0) <= now]
+        if not platforms_due:
+            return
+
+        start = datetime.now()
+        runs = run_platforms(platforms_due, self.profiles, self.duplicate_matchers, self.instances)
+        print_run_summary(runs, (datetime.now() - start).total_seconds())
+
+        for name, _ in platforms_due:
+            self.next_runs[name] = start.timestamp() + self.get_interval(name)
+
+    def run(self):
+        """
+        Runs the scheduler until SIGTERM or SIGINT is received. Must be called from the main thread.
+        """
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, self._handle_reload)
+
+        self._load()
+        while not self.is_stop_requested:
+            if self.is_reload_requested:
+                self.is_reload_requested = False
+                self._reload()
+
+            if self.date_last != datetime.now().date():
+                self.date_last = datetime.now().date()
+                self._update_polling_schedule()
+                if self.on_new_day is not None:
+                    try:
+                        self.on_new_day(self.platforms, self.profiles)
+                    except:
+                        print(traceback.format_exc(), file=sys.stderr)
+
+            self._run_due_platforms()
+
+            timeout = min(self.next_runs.values()) - datetime.now().timestamp()
+            if timeout > 0 and not self.is_stop_requested and not self.is_reload_requested:
+                # only wakes up early if a signal has been received
+                self.wakeup.wait(timeout)
+                self.wakeup.clear()
+
+        print('Daemon stopped')
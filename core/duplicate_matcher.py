@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Iterable
+
+from core.apartment import Apartment
+
+# attributes of an apartment required by the matcher
+matcher_fields = ['id', 'url', 'zip', 'street', 'house_number', 'rooms', 'apartment_size', 'rent_cold']
+
+# apartments are considered equal if their living space and cold rent differ by at most these values
+tolerance_apartment_size = 1.0
+tolerance_rent_cold = 10
+
+
+class DuplicateMatcher:
+    """
+    Finds apartments that are listed on multiple platforms.
+    All listings are grouped into blocks by zip code, rounded living space and rounded cold rent.
+    Only the listings in the same and neighbouring blocks are compared in detail (street, house number and rooms),
+    hence the costs of a search do not depend on the total number of listings.
+    """
+    # listings per block key (zip, living space in m², cold rent in steps of tolerance_rent_cold)
+    blocks: dict[tuple[int, int, int], list[dict]]
+
+    # protects blocks while platforms are running in parallel threads
+    lock: threading.Lock
+
+    def __init__(self):
+        self.blocks = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _get_block_key(listing: dict) -> tuple[int, int, int] | None:
+        if listing['zip'] is None or listing['apartment_size'] is None or listing['rent_cold'] is None:
+            return None
+        return (
+            listing['zip'],
+            round(listing['apartment_size'] / tolerance_apartment_size),
+            round(listing['rent_cold'] / tolerance_rent_cold)
+        )
+
+    @staticmethod
+    def _normalize_street(street: str) -> str:
+        street = street.lower().replace('ß', 'ss')
+        street = re.sub('str(\\.|asse)?$', 'str', street)
+        return re.sub('[^a-z0-9äöü]', '', street)
+
+    def _is_duplicate(self, listing: dict, other: dict) -> bool:
+        if abs(listing['apartment_size'] - other['apartment_size']) > tolerance_apartment_size:
+            return False
+        if abs(listing['rent_cold'] - other['rent_cold']) > tolerance_rent_cold:
+            return False
+        if listing['rooms'] is not None and other['rooms'] is not None and listing['rooms'] != other['rooms']:
+            return False
+
+        if listing['street'] is None or other['street'] is None:
+            # without address only exact matches are considered duplicates
+            return (listing['apartment_size'] == other['apartment_size'] and
+                    listing['rent_cold'] == other['rent_cold'] and
+                    listing['rooms'] is not None and other['rooms'] is not None)
+
+        if self._normalize_street(listing['street']) != self._normalize_street(other['street']):
+            return False
+        if listing['house_number'] is not None and other['house_number'] is not None:
+            return listing['house_number'] == other['house_number']
+        return True
+
+    def add(self, platform_name: str, listings: Iterable[dict]):
+        """
+        Adds listings of a platform, e.g., all stored apartments
+        :param platform_name: name of the platform the listings belong to
+        :param listings: dictionaries containing at least all matcher_fields
+        """
+        with self.lock:
+            for listing in listings:
+                self._add(platform_name, listing)
+
+    def _add(self, platform_name: str, listing: dict):
+        key = self._get_block_key(listing)
+        if key is None:
+            return
+        listing = {x: listing[x] for x in matcher_fields}
+        listing['platform'] = platform_name
+        self.blocks.setdefault(key, []).append(listing)
+
+    def _find(self, platform_name: str, listing: dict) -> list[dict]:
+        key = self._get_block_key(listing)
+        if key is None:
+            return []
+
+        duplicates = []
+        for d_size in (-1, 0, 1):
+            for d_rent in (-1, 0, 1):
+                for other in self.blocks.get((key[0], key[1] + d_size, key[2] + d_rent), []):
+                    if other['platform'] != platform_name and self._is_duplicate(listing, other):
+                        duplicates.append(other)
+        return duplicates
+
+    def find_and_add(self, platform_name: str, apartment: Apartment) -> list[dict]:
+        """
+        Searches for listings of the apartment on other platforms and adds the apartment afterward.
+        Both steps are executed atomically, hence two platforms finding the same apartment in parallel
+        detect the duplicate exactly once.
+        :param platform_name: name of the platform the apartment belongs to
+        :param apartment: apartment to be searched for
+        :return: all listings of this apartment on other platforms (dictionaries containing matcher_fields
+            and the key platform)
+        """
+        listing = apartment.to_dict()
+        with self.lock:
+            duplicates = self._find(platform_name, listing)
+            self._add(platform_name, listing)
+        return duplicates
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+
+# the active segment is rotated if it is larger than this number of bytes
+segment_max_size = 1024 * 1024
+
+# the active segment is rotated if its first error is older than this number of seconds
+segment_max_age = 7 * 86400
+
+
+class ErrorLog:
+    """
+    Append-only log of the errors of a platform split into segments containing one json encoded error per line.
+    New errors are appended to the active segment <name>.jsonl. It is rotated to <name>.<timestamp>.jsonl
+    if it exceeds segment_max_size or segment_max_age.
+    The index <name>.index.json lists all segments sorted by time together with the timestamps of their
+    first and last error. Hence, reading the errors of a time range only reads the segments covering this range.
+    Rotated segments are only deleted if a retention is set.
+    """
+    # path to the logfile without extension
+    path_base: str
+
+    # path to the legacy json logfile which is migrated on first use
+    path_legacy: str
+
+    # rotated segments are deleted if their last error is older than this number of days, None to keep all segments
+    retention: int | None
+
+    def __init__(self, path_logfile: str, retention: int | None = None):
+        self.path_legacy = path_logfile
+        self.path_base = os.path.splitext(path_logfile)[0]
+        self.retention = retention
+
+    @property
+    def path_active(self) -> str:
+        return f'{self.path_base}.jsonl'
+
+    @property
+    def path_index(self) -> str:
+        return f'{self.path_base}.index.json'
+
+    def _load_index(self) -> list[dict]:
+        """
+        Loads the index and migrates the legacy json logfile if it still exists
+        :return: list of all segments sorted by time. Each segment is described by the keys file, first and last.
+        """
+        index = []
+        if os.path.exists(self.path_index):
+            with open(self.path_index, 'r') as file:
+                index = json.load(file)
+
+        if os.path.exists(self.path_legacy) and self.path_legacy != self.path_active:
+            index = self._migrate_legacy(index)
+            self._save_index(index)
+
+        return index
+
+    def _save_index(self, index: list[dict]):
+        with open(f'{self.path_index}.tmp', 'w') as file:
+            json.dump(index, file)
+        os.replace(f'{self.path_index}.tmp', self.path_index)
+
+    def _migrate_legacy(self, index: list[dict]) -> list[dict]:
+        """
+        Moves the errors of the legacy json logfile to a rotated segment
+        """
+        with open(self.path_legacy, 'r') as file:
+            errors = sorted(json.load(file), key=lambda x: x['timestamp'])
+
+        if errors:
+            path_segment = f'{self.path_base}.{int(errors[0]["timestamp"])}.jsonl'
+            with open(path_segment, 'w') as file:
+                file.writelines(json.dumps(x) + '\n' for x in errors)
+            segment = {
+                'file': os.path.basename(path_segment),
+                'first': errors[0]['timestamp'],
+                'last': errors[-1]['timestamp']
+            }
+            index = sorted(index + [segment], key=lambda x: x['first'])
+
+        os.replace(self.path_legacy, f'{self.path_legacy}.migrated')
+        return index
+
+    def append(self, errors: list[dict]):
+        """
+        Appends errors to the active segment. The active segment is rotated before if it is too large or too old.
+        :param errors: errors in the format created by WohnungssucherBase.log_error
+        """
+        if not errors:
+            return
+
+        index = self._load_index()
+        now = datetime.now().timestamp()
+        name_active = os.path.basename(self.path_active)
+        active = index[-1] if index and index[-1]['file'] == name_active else None
+
+        if active is not None and (
+                os.path.getsize(self.path_active) > segment_max_size or now - active['first'] > segment_max_age
+        ):
+            name_rotated = f'{os.path.basename(self.path_base)}.{int(active["first"])}.jsonl'
+            os.replace(self.path_active, os.path.join(os.path.dirname(self.path_active), name_rotated))
+            active['file'] = name_rotated
+            active = None
+
+        # delete expired segments
+        if self.retention is not None:
+            index_keep = []
+            for segment in index:
+                if segment['file'] != name_active and now - segment['last'] > self.retention * 86400:
+                    os.remove(os.path.join(os.path.dirname(self.path_active), segment['file']))
+                else:
+                    index_keep.append(segment)
+            index = index_keep
+
+        with open(self.path_active, 'a') as file:
+            file.writelines(json.dumps(x) + '\n' for x in errors)
+
+        timestamps = [x['timestamp'] for x in errors]
+        if active is None:
+            active = {'file': name_active, 'first': min(timestamps), 'last': max(timestamps)}
+            index.append(active)
+        else:
+            active['last'] = max(active['last'], max(timestamps))
+        self._save_index(index)
+
+    def read(self, timestamp_min: float | None = None) -> list[dict]:
+        """
+        Reads all errors which occurred at or after timestamp_min. Only segments covering this time range are read.
+        :param timestamp_min: timestamp of the oldest error to be returned or None to return all errors
+        :return: list of errors sorted by the time they were logged
+        """
+        index = self._load_index()
+
+        errors = []
+        for segment in index:
+            if timestamp_min is not None and segment['last'] < timestamp_min:
+                continue
+            with open(os.path.join(os.path.dirname(self.path_active), segment['file']), 'r') as file:
+                for line in file:
+                    error = json.loads(line)
+                    if timestamp_min is None or error['timestamp'] >= timestamp_min:
+                        errors.append(error)
+
+        return errors
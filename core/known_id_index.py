@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterable
+from typing import Any
+
+
+class KnownIdIndex:
+    """
+    Persistent index of the ids of all known apartments of a platform.
+    The index is stored as text file containing one json encoded id per line.
+    This allows checking whether an apartment is known without loading the savefiles
+    and adding new ids by appending lines to the file.
+    """
+    # path to the index file
+    path: str
+
+    # ids loaded from the index file or None if not loaded yet
+    ids: set | None
+
+    def __init__(self, path: str):
+        self.path = path
+        self.ids = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> set:
+        """
+        Loads all ids from the index file. The ids are only read once and kept in memory afterward.
+        :return: set of all known ids
+        """
+        if self.ids is not None:
+            return self.ids
+
+        self.ids = set()
+        if not self.exists():
+            return self.ids
+
+        with open(self.path, 'r') as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    self.ids.add(json.loads(line))
+
+        return self.ids
+
+    def __contains__(self, apt_id: Any) -> bool:
+        return apt_id in self.load()
+
+    def __len__(self):
+        return len(self.load())
+
+    def add(self, apt_ids: Iterable[Any]):
+        """
+        Adds ids to the index by appending them to the index file. Already known ids are ignored.
+        :param apt_ids: ids of the new apartments
+        """
+        ids = self.load()
+        lines = []
+        for apt_id in apt_ids:
+            if apt_id not in ids:
+                ids.add(apt_id)
+                lines.append(json.dumps(apt_id) + '\n')
+
+        if not lines:
+            return
+
+        with open(self.path, 'a') as file:
+            file.writelines(lines)
+
+    def rebuild(self, apt_ids: Iterable[Any]):
+        """
+        Replaces the content of the index by the given ids, e.g., after old apartments have been removed.
+        :param apt_ids: ids of all known apartments
+        """
+        self.ids = set(apt_ids)
+
+        path_tmp = f'{self.path}.tmp'
+        with open(path_tmp, 'w') as file:
+            file.writelines(json.dumps(apt_id) + '\n' for apt_id in self.ids)
+        os.replace(path_tmp, self.path)
@@ -0,0 +1,92 @@
+"""
+Registry of all apartment platforms. The module of a platform is only imported when the platform is constructed
+for the first time, hence platforms that are not run do not slow down the startup or use memory.
+Only the platforms enabled by the setting 'platforms_enabled' are run.
+"""
+from __future__ import annotations
+
+import importlib
+import threading
+
+
+class PlatformEntry:
+    """
+    Entry point of a platform. Can be used like the class of the platform: calling it with a user configuration
+    imports the module on first use and returns a new instance.
+    """
+    # short name of the platform, e.g., 'gvg'
+    name: str
+
+    # module containing the class of the platform, e.g., 'wohnungssucher_platforms.ws_gvg'
+    module: str
+
+    # name of the class of the platform (subclass of WohnungssucherBase)
+    __name__: str
+
+    # minutes between two runs in the daemon mode unless set by platform_intervals or None to use daemon_interval
+    default_interval: int | None
+
+    # maximum number of apartment pages requested from the platform in parallel
+    max_parallel_requests: int
+
+    # class of the platform once the module has been imported
+    _cls: type | None
+
+    _lock: threading.Lock
+
+    def __init__(
+            self,
+            name: str,
+            module: str,
+            class_name: str,
+            default_interval: int | None = None,
+            max_parallel_requests: int = 1
+    ):
+        self.name = name
+        self.module = module
+        self.__name__ = class_name
+        self.default_interval = default_interval
+        self.max_parallel_requests = max_parallel_requests
+        self._cls = None
+        self._lock = threading.Lock()
+
+    def load(self) -> type:
+        """
+        :return: class of the platform, the module is imported on the first call
+        """
+        with self._lock:
+            if self._cls is None:
+                self._cls = getattr(importlib.import_module(self.module), self.__name__)
+            return self._cls
+
+    def __call__(self, config: dict):
+        platform = self.load()(config)
+        platform.max_parallel_requests = self.max_parallel_requests
+        return platform
+
+    def __repr__(self):
+        return f'PlatformEntry({self.name!r}, {self.module!r}, {self.__name__!r})'
+
+
+platform_entries = [
+    PlatformEntry('gvg', 'wohnungssucher_platforms.ws_gvg', 'WSGVG', max_parallel_requests=2),
+    PlatformEntry(
+        'mietwohnungsboerse', 'wohnungssucher_platforms.ws_mietwohnungsboerse', 'WSMietwohnungsboerse',
+        max_parallel_requests=4
+    )
+]
+
+
+def get_platforms(config: dict | None = None) -> list[tuple[str, PlatformEntry]]:
+    """
+    :param config: user configuration providing the setting 'platforms_enabled' or None to return all platforms
+    :return: list of tuples of the short name and the entry point of each enabled platform (see run_platforms)
+    """
+    if config is None or config['platforms_enabled'] is None:
+        return [(x.name, x) for x in platform_entries]
+
+    names = [x.name for x in platform_entries]
+    for name in config['platforms_enabled']:
+        if name not in names:
+            raise ValueError(f'Unknown platform "{name}" in platforms_enabled, available platforms: {names}')
+    return [(x.name, x) for x in platform_entries if x.name in config['platforms_enabled']]
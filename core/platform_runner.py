@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core.apartment import Apartment
+from core.duplicate_matcher import DuplicateMatcher, matcher_fields
+from core.utils import send_error_mail
+from core.wohnungssucher_base import WohnungssucherBase
+
+
+class PlatformRun:
+    """
+    Result of one run of a single apartment platform for one profile
+    """
+    # Short name of the platform, e.g., 'gvg'
+    name: str
+
+    # Name of the profile or None if only a single profile is used
+    profile: str | None
+
+    # New apartments providing all properties defined in default_0 of the platform
+    new_apartments_0: list[Apartment]
+
+    # Further new apartments providing all properties defined in the user defaults
+    new_apartments_1: list[Apartment]
+
+    # Wall clock time in seconds the run took
+    duration: float
+
+    # Traceback of the critical error that aborted the run or None if the run succeeded
+    error: str | None
+
+    def __init__(self, name: str, profile: str | None = None):
+        self.name = name
+        self.profile = profile
+        self.new_apartments_0 = []
+        self.new_apartments_1 = []
+        self.duration = 0.0
+        self.error = None
+
+    def __str__(self):
+        name = self.name if self.profile is None else f'{self.name} ({self.profile})'
+        if self.error is not None:
+            return f'{name}: failed after {self.duration:.1f}s'
+        return (f'{name}: {len(self.new_apartments_0)} new apartments, '
+                f'{len(self.new_apartments_1)} further apartments ({self.duration:.1f}s)')
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def create_duplicate_matcher(
+        platforms: list[tuple[str, type]],
+        profile: str,
+        config: dict,
+        instances: dict[str, dict[str, WohnungssucherBase]]
+) -> DuplicateMatcher:
+    """
+    Creates a duplicate matcher containing all stored apartments of all platforms
+    :param platforms: list of tuples of the short name and the class of each platform
+    :param profile: name of the profile
+    :param config: user configuration of the profile
+    :param instances: instances per platform name and profile name (see run_platforms). Missing instances are
+        created and added, hence the following runs use the same instances.
+    :return: duplicate matcher
+    """
+    duplicate_matcher = DuplicateMatcher()
+    for name, cls in platforms:
+        try:
+            instances_platform = instances.setdefault(name, {})
+            if profile not in instances_platform:
+                instances_platform[profile] = cls(config)
+            platform = instances_platform[profile]
+            store = platform.apartment_store
+            for category in (0, 1):
+                duplicate_matcher.add(platform.platform_name, store.iter_dicts(category, matcher_fields))
+            store.close()
+        except:
+            # errors are reported by the run of the platform
+            print(f'Could not load apartments of {name} for the detection of duplicates', file=sys.stderr)
+    return duplicate_matcher
+
+
+def _report_error(
+        run: PlatformRun,
+        cls: type,
+        config: dict,
+        platform: WohnungssucherBase | None,
+        is_mailed: bool = True
+):
+    """
+    Reports the critical error currently handled by mail and stores it in the error log of the platform
+    :param is_mailed: False if the error has already been mailed to the recipient of this profile
+    """
+    msg = traceback.format_exc()
+    run.error = msg
+    if is_mailed:
+        send_error_mail(
+            config['email_from_address'],
+            config['email_to_address'],
+            msg,
+            cls.__name__,
+            config['email_send_status']
+        )
+    if platform is None:
+        print(msg, file=sys.stderr)
+    else:
+        platform.log_error(msg, critical=True)
+        platform.save_errors()
+
+
+def run_platform(
+        name: str,
+        cls: type,
+        profiles: dict[str, dict],
+        duplicate_matchers: dict[str, DuplicateMatcher] | None = None,
+        instances: dict[str, WohnungssucherBase] | None = None
+) -> list[PlatformRun]:
+    """
+    Runs a single platform for all profiles and isolates all errors occurring during the run.
+    The platform is requested only once, the apartments are processed separately for each profile.
+    A critical error is reported by mail and stored in the error log of the platform of each affected profile.
+    A critical error of the shared request is only stored in the error log of the requesting profile and mailed once
+    per recipient.
+    :param name: short name of the platform
+    :param cls: class of the platform (subclass of WohnungssucherBase)
+    :param profiles: user configuration per profile name
+    :param duplicate_matchers: matcher per profile name shared by all platforms to detect apartments listed on
+        multiple platforms
+    :param instances: instances of the platform per profile name kept between runs, e.g., by the daemon.
+        Missing instances are created and added. None to create new instances for this run only.
+    :return: result of the run for each profile in the same order as profiles
+    """
+    if duplicate_matchers is None:
+        duplicate_matchers = {}
+    if instances is None:
+        instances = {}
+    profile_names = list(profiles) if len(profiles) > 1 else [None]
+    runs = [PlatformRun(name, x) for x in profile_names]
+    start = time.monotonic()
+
+    platforms = {}
+    for run, (profile, config) in zip(runs, profiles.items()):
+        try:
+            if profile not in instances:
+                instances[profile] = cls(config)
+            platform = instances[profile]
+            platform.duplicate_matcher = duplicate_matchers.get(profile)
+            platforms[profile] = platform
+        except:
+            _report_error(run, cls, config, None)
+
+    try:
+        if platforms:
+            WohnungssucherBase.crawl_for_profiles(list(platforms.values()))
+    except:
+        # the error is logged by the requesting instance only (see crawl_for_profiles)
+        profile_requester = next(iter(platforms))
+        recipients = set()
+        for run, (profile, config) in zip(runs, profiles.items()):
+            if profile not in platforms:
+                continue
+            is_mailed = config['email_to_address'] not in recipients
+            recipients.add(config['email_to_address'])
+            _report_error(run, cls, config, platforms[profile] if profile == profile_requester else None, is_mailed)
+    else:
+        is_saved = True
+        for run, (profile, config) in zip(runs, profiles.items()):
+            if profile not in platforms:
+                continue
+            try:
+                run.new_apartments_0, run.new_apartments_1 = platforms[profile]._finish_run()
+            except:
+                _report_error(run, cls, config, platforms[profile])
+                is_saved = False
+            run.duration = time.monotonic() - start
+
+        # the crawl journal is kept until the apartments of all profiles have been saved
+        if is_saved and platforms:
+            profile = next(iter(platforms))
+            try:
+                platforms[profile]._end_crawl()
+            except:
+                _report_error(runs[list(profiles).index(profile)], cls, profiles[profile], platforms[profile])
+    finally:
+        for platform in platforms.values():
+            platform.apartment_store.close()
+
+    for run in runs:
+        if run.error is not None:
+            run.duration = time.monotonic() - start
+    return runs
+
+
+def create_duplicate_matchers(
+        platforms: list[tuple[str, type]],
+        profiles: dict[str, dict],
+        instances: dict[str, dict[str, WohnungssucherBase]]
+) -> dict[str, DuplicateMatcher]:
+    """
+    Creates a duplicate matcher for each profile enabling 'detect_duplicates_across_platforms'
+    :param platforms: list of tuples of the short name and the class of each platform
+    :param profiles: user configuration per profile name
+    :param instances: instances per platform name and profile name to be reused by the runs (see run_platforms)
+    :return: duplicate matcher per profile name
+    """
+    duplicate_matchers = {}
+    for profile, config in profiles.items():
+        if config['detect_duplicates_across_platforms'] and len(platforms) > 1:
+            duplicate_matchers[profile] = create_duplicate_matcher(platforms, profile, config, instances)
+    return duplicate_matchers
+
+
+def run_platforms(
+        platforms: list[tuple[str, type]],
+        profiles: dict[str, dict],
+        duplicate_matchers: dict[str, DuplicateMatcher] | None = None,
+        instances: dict[str, dict[str, WohnungssucherBase]] | None = None
+) -> list[PlatformRun]:
+    """
+    Runs all platforms in parallel threads. A failing platform does not affect the other platforms.
+    The number of parallel threads is limited by the setting 'max_parallel_platforms' (the same for all profiles).
+    If the setting 'detect_duplicates_across_platforms' is enabled, apartments already found on other platforms
+    are only referenced briefly in the notification.
+    :param platforms: list of tuples of the short name and the class of each platform
+    :param profiles: user configuration per profile name (see load_profiles)
+    :param duplicate_matchers: duplicate matcher per profile name kept between runs or None to create them
+    :param instances: instances per platform name and profile name kept between runs (see run_platform)
+    :return: results of all runs in the same order as platforms and profiles
+    """
+    if not platforms:
+        return []
+
+    # the setting applies to all profiles (see settings_run)
+    max_workers = next(iter(profiles.values()))['max_parallel_platforms']
+    if max_workers is None:
+        max_workers = len(platforms)
+
+    if instances is None:
+        instances = {}
+    if duplicate_matchers is None:
+        duplicate_matchers = create_duplicate_matchers(platforms, profiles, instances)
+
+    runs = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='platform') as executor:
+        futures = {
+            executor.submit(
+                run_platform, name, cls, profiles, duplicate_matchers, instances.setdefault(name, {})
+            ): name for name, cls in platforms
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                runs[name] = future.result()
+            except:
+                # errors raised while reporting a critical error, e.g., mail server not reachable
+                run = PlatformRun(name)
+                run.error = traceback.format_exc()
+                print(run.error, file=sys.stderr)
+                runs[name] = [run]
+
+    return [run for name, _ in platforms for run in runs[name]]
+
+
+def print_run_summary(runs: list[PlatformRun], duration_total: float):
+    """
+    Prints the result and the runtime of each platform run
+    :param runs: results of all platform runs
+    :param duration_total: wall clock time in seconds of all runs together
+    """
+    print('\nSummary')
+    for run in runs:
+        print(f'  {run}')
+    print(f'  Total runtime: {duration_total:.1f}s (sum of all platforms: {sum(x.duration for x in runs):.1f}s)')
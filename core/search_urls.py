@@ -0,0 +1,38 @@
+"""
+Helpers for platforms building their search urls from the requirements of the user, so that the platform only returns
+candidate apartments. The requirements are still checked for every apartment afterward (see ApartmentFilter).
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+
+def get_zip_prefixes(zips: Iterable[int], max_prefixes: int) -> list[str]:
+    """
+    Finds the longest zip code prefixes covering all given zip codes using at most max_prefixes prefixes,
+    e.g., [80331, 80333, 81369] and max_prefixes=2 result in ['8033', '8136']
+    :param zips: zip codes
+    :param max_prefixes: maximum number of prefixes, at least 10 prefixes of length 1 are possible
+    :return: sorted prefixes of equal length
+    """
+    zips = {f'{x:05d}' for x in zips}
+    for length in range(5, 1, -1):
+        prefixes = sorted({x[:length] for x in zips})
+        if len(prefixes) <= max_prefixes:
+            return prefixes
+    return sorted({x[:1] for x in zips})
+
+
+def merge_listings(listings: list[list[str]]) -> list[str]:
+    """
+    Merges the apartment urls found by multiple searches. The urls are interleaved to keep the newest apartments of
+    each search at the top. Urls found by multiple searches are only kept once.
+    :param listings: urls of the apartments found by each search in the order of the search results
+    :return: merged urls
+    """
+    urls = {}
+    for i in range(max((len(x) for x in listings), default=0)):
+        for listing in listings:
+            if i < len(listing):
+                urls.setdefault(listing[i])
+    return list(urls)
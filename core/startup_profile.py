@@ -0,0 +1,132 @@
+"""
+Startup profile of main.py: the time from starting the interpreter until the first HTTP request can be sent,
+split into the steps of a run, and the import time of each module (see python -X importtime).
+
+The profile is measured in a new interpreter, hence all modules are imported cold:
+python main.py --profile-startup
+"""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# maximum time in seconds from starting the interpreter until the first request can be sent
+# (checked by benchmarks/benchmark_startup.py).
+# Can be overridden by the environment variable WOHNUNGSSUCHER_STARTUP_BUDGET, e.g., on slow machines.
+startup_budget = float(os.environ.get('WOHNUNGSSUCHER_STARTUP_BUDGET', 1.0))
+
+# factor of startup_budget tolerated by the benchmark since single measurements vary with the load of the machine
+startup_budget_margin = 1.5
+
+path_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare_first_request(path_files: str | None = None) -> list[tuple[str, float]]:
+    """
+    Executes all steps of a run of main.py up to the first HTTP request without sending it
+    :param path_files: directory of the data files replacing path_files of the configuration
+    :return: name and duration in seconds of each step
+    """
+    steps = []
+    start = time.perf_counter()
+
+    def add_step(name: str):
+        nonlocal start
+        now = time.perf_counter()
+        steps.append((name, now - start))
+        start = now
+
+    import main
+    add_step('import main')
+
+    from core.config_loader import load_profiles
+    from core.platform_registry import get_platforms
+    config = next(iter(load_profiles().values()))
+    if path_files is not None:
+        config = dict(config, path_files=path_files)
+    add_step('load configuration')
+
+    name, entry = get_platforms()[0]
+    entry.load()
+    add_step(f'import platform {name}')
+
+    platform = entry(config)
+    add_step(f'create platform {name}')
+
+    platform.session
+    add_step('create HTTP session')
+
+    platform.apartment_store.close()
+    return steps
+
+
+def measure_startup(path_files: str | None = None, importtime: bool = False) -> tuple[float, list, str]:
+    """
+    Measures the startup in a new interpreter
+    :param path_files: directory of the data files replacing path_files of the configuration
+    :param importtime: whether the interpreter reports the import time of each module
+    :return: time in seconds until the first request can be sent, duration of each step (see prepare_first_request)
+        and the output of -X importtime
+    """
+    args = [sys.executable]
+    if importtime:
+        args += ['-X', 'importtime']
+    args += ['-m', 'core.startup_profile', str(time.time())]
+    if path_files is not None:
+        args.append(path_files)
+
+    result = subprocess.run(args, cwd=path_root, capture_output=True, text=True, check=True)
+    measurement = json.loads(result.stdout.splitlines()[-1])
+    return measurement['duration'], measurement['steps'], result.stderr
+
+
+def parse_importtime(output: str) -> list[tuple[str, int, int, int]]:
+    """
+    :param output: output of python -X importtime
+    :return: name, import time in µs without and with its own imports and nesting level of each imported module
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|', 2)
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            # header
+            continue
+        # indented by two spaces per nesting level starting at level 1
+        name = parts[2][1:]
+        level = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(parts[0]), int(parts[1]), level))
+    return modules
+
+
+def print_startup_profile(num_modules: int = 25):
+    """
+    Prints the duration of each step until the first request and the modules with the highest import time.
+    The data files are created in a temporary directory to keep the files of the configuration untouched.
+    """
+    with tempfile.TemporaryDirectory() as path_files:
+        duration, steps, output = measure_startup(path_files, importtime=True)
+    modules = parse_importtime(output)
+
+    print(f'Startup until the first request: {duration * 1000:.1f} ms (budget {startup_budget * 1000:.0f} ms, '
+          f'measured with -X importtime)\n')
+    print(f'{"Step":<40}{"Duration [ms]":>15}')
+    for name, duration_step in steps:
+        print(f'{name:<40}{duration_step * 1000:>15.1f}')
+
+    print(f'\n{len(modules)} modules imported in {sum(x[1] for x in modules) / 1000:.1f} ms\n')
+    print(f'{"Module":<50}{"Self [ms]":>12}{"Cumulative [ms]":>18}')
+    for name, time_self, time_cumulative, level in sorted(modules, key=lambda x: -x[2])[:num_modules]:
+        print(f'{"  " * (level - 1) + name:<50}{time_self / 1000:>12.1f}{time_cumulative / 1000:>18.1f}')
+
+
+if __name__ == '__main__':
+    # executed by measure_startup: startup timestamp of the measuring process and optionally path_files
+    timestamp_start = float(sys.argv[1])
+    steps = prepare_first_request(sys.argv[2] if len(sys.argv) > 2 else None)
+    print(json.dumps({'duration': time.time() - timestamp_start, 'steps': steps}))
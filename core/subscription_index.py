@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, Hashable
+
+from core.apartment import Apartment
+
+# attributes checked against a range [min, max] and the names of the requirements and the default
+interval_fields = [
+    ('rent_cold', 'rent_cold_min', 'rent_cold_max', 'rent_cold'),
+    ('rent_warm', 'rent_warm_min', 'rent_warm_max', 'rent_warm'),
+    ('rooms', 'rooms_min', 'rooms_max', 'room'),
+    ('apartment_size', 'apartment_size_min', 'apartment_size_max', 'apartment_size'),
+    ('year_of_construction', 'year_of_construction_min', 'year_of_construction_max', 'year_of_construction')
+]
+
+# attributes checked against a list of included and a list of excluded values (see Apartment._check_inexcluded)
+inexcluded_fields = [
+    ('zip', 'zips_included', 'zips_excluded', 'zip'),
+    ('place', 'places_included', 'places_excluded', 'place')
+]
+
+# attributes checked against a list of allowed values (see Apartment._check_in_list)
+in_list_fields = [
+    ('floor', 'floors', 'floor'),
+    ('energy_efficiency_class', 'energy_efficiency_classes', 'energy_efficiency_class')
+]
+
+
+class IntervalIndex:
+    """
+    Finds all subscriptions whose range [min, max] contains a value.
+    The sorted bounds of all ranges split the number line into segments: every bound itself and the open interval
+    between two neighbouring bounds. All values within a segment are contained in the same ranges, hence the
+    subscriptions of each segment are precomputed as bitset and a value is looked up by bisection.
+    """
+    # sorted distinct bounds of all ranges
+    bounds: list[int | float]
+
+    # bitset of the subscriptions per segment. Segment 2i + 1 is bounds[i], segment 2i the interval before it.
+    segments: list[int]
+
+    def __init__(self, ranges: list[tuple[int | float, int | float]]):
+        """
+        :param ranges: min and max of each subscription in the order of the bits
+        """
+        starts = {}
+        ends = {}
+        for i, (value_min, value_max) in enumerate(ranges):
+            if value_min > value_max:
+                continue
+            starts[value_min] = starts.get(value_min, 0) | 1 << i
+            ends[value_max] = ends.get(value_max, 0) | 1 << i
+
+        self.bounds = sorted(set(starts) | set(ends))
+        self.segments = []
+        active = 0
+        for bound in self.bounds:
+            self.segments.append(active)
+            active |= starts.get(bound, 0)
+            self.segments.append(active)
+            active &= ~ends.get(bound, 0)
+        self.segments.append(active)
+
+    def find(self, value: int | float) -> int:
+        """
+        :return: bitset of all subscriptions whose range contains value
+        """
+        i = bisect_left(self.bounds, value)
+        if i < len(self.bounds) and self.bounds[i] == value:
+            return self.segments[2 * i + 1]
+        return self.segments[2 * i]
+
+
+class SubscriptionIndex:
+    """
+    Reverse index finding all subscriptions (saved searches) matching an apartment.
+    Every subscription consists of the requirements understood by WohnungssucherBase.set_configurations and both
+    default sets. The subscriptions matching each possible value of an attribute are stored as bitset (int):
+    interval indexes for ranges and inverted indexes for lists of values. Matching an apartment combines one bitset
+    per attribute, hence it only needs a few operations on bitsets instead of checking every subscription.
+    The results are identical to WohnungssucherBase._check_apartment of each subscription.
+    """
+    # key of each subscription in the order of the bits
+    keys: list[Hashable]
+
+    # requirements and defaults of each subscription until the index is built
+    subscriptions: list[tuple[Any, dict, dict]]
+
+    # whether the indexes are up-to-date with subscriptions
+    is_built: bool
+
+    # bitset of all subscriptions
+    all: int
+
+    # per attribute: index, bitset of subscriptions accepting None using defaults_0 and defaults_1
+    intervals: list[tuple[str, IntervalIndex, int, int]]
+
+    # per attribute: subscriptions including and excluding each value, subscriptions without included values,
+    # subscriptions accepting None using defaults_0 and defaults_1
+    inexcluded: list[tuple[str, dict[Any, int], dict[Any, int], int, int, int]]
+
+    # per attribute: subscriptions allowing each value, subscriptions allowing all values,
+    # subscriptions accepting None using defaults_0 and defaults_1
+    in_list: list[tuple[str, dict[Any, int], int, int, int]]
+
+    # subscriptions accepting exchange apartments, non exchange apartments and None using defaults_0 and defaults_1
+    exchange_apartment: tuple[int, int, int, int]
+
+    def __init__(self):
+        self.keys = []
+        self.subscriptions = []
+        self.is_built = False
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, key: Hashable, requirements: Any, defaults_0: dict, defaults_1: dict):
+        """
+        Adds a subscription. The indexes are rebuilt on the next call of match.
+        :param key: key returned by match if an apartment matches this subscription
+        :param requirements: object providing the normalized requirements as attributes, e.g., WohnungssucherBase
+        :param defaults_0: result of each check for missing values of apartments of group 0
+        :param defaults_1: result of each check for missing values of apartments of group 1
+        """
+        self.keys.append(key)
+        self.subscriptions.append((requirements, defaults_0, defaults_1))
+        self.is_built = False
+
+    def _get_bitset_defaults(self, key_default: str) -> tuple[int, int]:
+        bits_0 = 0
+        bits_1 = 0
+        for i, (_, defaults_0, defaults_1) in enumerate(self.subscriptions):
+            if defaults_0[key_default]:
+                bits_0 |= 1 << i
+            if defaults_1[key_default]:
+                bits_1 |= 1 << i
+        return bits_0, bits_1
+
+    def _build(self):
+        self.all = (1 << len(self.subscriptions)) - 1
+
+        self.intervals = []
+        for attribute, name_min, name_max, key_default in interval_fields:
+            ranges = [(getattr(r, name_min), getattr(r, name_max)) for r, _, _ in self.subscriptions]
+            self.intervals.append((attribute, IntervalIndex(ranges), *self._get_bitset_defaults(key_default)))
+
+        self.inexcluded = []
+        for attribute, name_included, name_excluded, key_default in inexcluded_fields:
+            included = {}
+            excluded = {}
+            unrestricted = 0
+            for i, (r, _, _) in enumerate(self.subscriptions):
+                values_included = getattr(r, name_included)
+                if values_included is None:
+                    unrestricted |= 1 << i
+                else:
+                    for value in values_included:
+                        included[value] = included.get(value, 0) | 1 << i
+                for value in getattr(r, name_excluded):
+                    excluded[value] = excluded.get(value, 0) | 1 << i
+            none_0, none_1 = self._get_bitset_defaults(key_default)
+            self.inexcluded.append((attribute, included, excluded, unrestricted, none_0 | unrestricted,
+                                    none_1 | unrestricted))
+
+        self.in_list = []
+        for attribute, name_allowed, key_default in in_list_fields:
+            allowed = {}
+            unrestricted = 0
+            for i, (r, _, _) in enumerate(self.subscriptions):
+                values_allowed = getattr(r, name_allowed)
+                if values_allowed is None:
+                    unrestricted |= 1 << i
+                else:
+                    for value in values_allowed:
+                        allowed[value] = allowed.get(value, 0) | 1 << i
+            none_0, none_1 = self._get_bitset_defaults(key_default)
+            self.in_list.append((attribute, allowed, unrestricted, none_0 | unrestricted, none_1 | unrestricted))
+
+        accepted_true = 0
+        accepted_false = 0
+        for i, (r, _, _) in enumerate(self.subscriptions):
+            # see Apartment.check_exchange_apartment
+            if True == r.exchange_apartment:
+                accepted_true |= 1 << i
+            if False == r.exchange_apartment:
+                accepted_false |= 1 << i
+        self.exchange_apartment = (accepted_true, accepted_false, *self._get_bitset_defaults('exchange_apartment'))
+
+        self.is_built = True
+
+    def match_bitsets(self, apartment: Apartment) -> tuple[int, int]:
+        """
+        :return: bitset of the subscriptions matching the apartment using defaults_0 and bitset of the
+            subscriptions matching using defaults_1
+        """
+        if not self.is_built:
+            self._build()
+
+        is_0 = self.all
+        is_1 = self.all
+
+        for attribute, index, none_0, none_1 in self.intervals:
+            value = getattr(apartment, attribute)
+            if value is None:
+                is_0 &= none_0
+                is_1 &= none_1
+            else:
+                matches = index.find(value)
+                is_0 &= matches
+                is_1 &= matches
+            if not is_0 and not is_1:
+                return 0, 0
+
+        for attribute, included, excluded, unrestricted, none_0, none_1 in self.inexcluded:
+            value = getattr(apartment, attribute)
+            if value is None:
+                is_0 &= none_0
+                is_1 &= none_1
+            else:
+                matches = (included.get(value, 0) | unrestricted) & ~excluded.get(value, 0)
+                is_0 &= matches
+                is_1 &= matches
+
+        for attribute, allowed, unrestricted, none_0, none_1 in self.in_list:
+            value = getattr(apartment, attribute)
+            if value is None:
+                is_0 &= none_0
+                is_1 &= none_1
+            else:
+                matches = allowed.get(value, 0) | unrestricted
+                is_0 &= matches
+                is_1 &= matches
+
+        accepted_true, accepted_false, none_0, none_1 = self.exchange_apartment
+        if apartment.exchange_apartment is None:
+            is_0 &= none_0
+            is_1 &= none_1
+        else:
+            matches = accepted_true if apartment.exchange_apartment else accepted_false
+            is_0 &= matches
+            is_1 &= matches
+
+        return is_0, is_1
+
+    def match(self, apartment: Apartment) -> dict[Hashable, int]:
+        """
+        Finds all subscriptions matching the apartment
+        :param apartment: apartment to be matched
+        :return: category per key of all matching subscriptions: 0 if the apartment matches using defaults_0,
+            1 if it only matches using defaults_1
+        """
+        is_0, is_1 = self.match_bitsets(apartment)
+
+        matches = {}
+        for category, bits in ((0, is_0), (1, is_1 & ~is_0)):
+            while bits:
+                lowest = bits & -bits
+                matches[self.keys[lowest.bit_length() - 1]] = category
+                bits ^= lowest
+        return matches
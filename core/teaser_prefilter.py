@@ -0,0 +1,127 @@
+"""
+Prefilter skipping apartment pages whose teaser on the listing page already shows that the apartment cannot match
+the requirements. The prefilter is conservative: only values with an unambiguous label (e.g., "Kaltmiete: 850 €")
+are extracted from the teaser and an apartment is only skipped if one of these values violates the requirements of
+every profile. Missing, ambiguous or unparsable values never skip an apartment.
+"""
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+from core.apartment import Apartment
+
+if TYPE_CHECKING:
+    from core.wohnungssucher_base import WohnungssucherBase
+
+pattern_tag = re.compile('<[^>]*>')
+pattern_whitespace = re.compile('(\\s|&nbsp;)+')
+
+# patterns of the labeled values per attribute, the value is the first group of each pattern
+teaser_patterns = {
+    'rent_cold': [re.compile('(?:Nettokaltmiete|Kaltmiete)\\s*:?\\s*([\\d.,]+)\\s*(?:€|EUR)')],
+    'rent_warm': [re.compile('Warmmiete\\s*:?\\s*([\\d.,]+)\\s*(?:€|EUR)')],
+    'rooms': [re.compile('(?:Zimmeranzahl|Zimmer)\\s*:\\s*([\\d.,]+)'), re.compile('([\\d.,]+)\\s*Zimmer\\b')],
+    'apartment_size': [re.compile('Wohnfläche\\s*:?\\s*(?:ca\\.\\s*)?([\\d.,]+\\s*m)'),
+                       re.compile('([\\d.,]+\\s*m²)\\s*Wohnfläche')]
+}
+
+# type of the parsed value per attribute
+teaser_types = {'rent_cold': int, 'rent_warm': int, 'rooms': float, 'apartment_size': float}
+
+pattern_number = re.compile('\\d[\\d.,]*')
+pattern_thousands = re.compile('\\d{1,3}(\\.\\d{3})+')
+
+
+def extract_teaser(html: str) -> dict[str, str]:
+    """
+    :param html: inner html of the teaser of an apartment on the listing page
+    :return: raw value per attribute of all values found exactly once
+    """
+    text = pattern_whitespace.sub(' ', pattern_tag.sub(' ', html))
+    values = {}
+    for field, patterns in teaser_patterns.items():
+        matches = {x.strip() for pattern in patterns for x in pattern.findall(text)}
+        if len(matches) == 1:
+            values[field] = matches.pop()
+    return values
+
+
+def parse_teaser_number(value: str) -> float | None:
+    """
+    Parses the first number of a raw teaser value. Numbers are usually written in German format (e.g., "1.250,50"),
+    but some listings use a decimal point (e.g., "850.50"). Unlike the field parsers of the apartment pages, numbers
+    which can be read in both ways (e.g., "1.200") are not guessed.
+    :param value: raw value extracted from a teaser, e.g., "1.250,50" or "60,5 m"
+    :return: parsed number or None if the number is ambiguous or cannot be parsed
+    """
+    match = pattern_number.search(value)
+    if match is None:
+        return None
+    number = match.group()
+
+    if ',' in number and '.' in number:
+        if number.rfind(',') < number.rfind('.'):
+            # e.g., "1,250.50"
+            return None
+        number = number.replace('.', '').replace(',', '.')
+    elif ',' in number:
+        if number.count(',') > 1:
+            return None
+        number = number.replace(',', '.')
+    elif '.' in number:
+        if pattern_thousands.fullmatch(number) or number.count('.') > 1:
+            # thousands separator or decimal point
+            return None
+
+    try:
+        return float(number)
+    except ValueError:
+        return None
+
+
+def create_teaser_apartment(url: str, values: dict[str, str]) -> Apartment:
+    """
+    :param url: url of the apartment page
+    :param values: raw values extracted from the teaser
+    :return: apartment providing the parsed teaser values, all other attributes and the values that cannot be parsed
+        unambiguously are None
+    """
+    parsed = {}
+    for field, value in values.items():
+        number = parse_teaser_number(value)
+        if number is not None:
+            parsed[field] = teaser_types[field](number)
+    return Apartment(
+        id=None,
+        description=None,
+        url=url,
+        zip=None,
+        place=None,
+        street=None,
+        house_number=None,
+        rent_cold=parsed.get('rent_cold'),
+        rent_warm=parsed.get('rent_warm'),
+        rooms=parsed.get('rooms'),
+        apartment_size=parsed.get('apartment_size'),
+        floor=None,
+        year_of_construction=None,
+        heating_type=None,
+        energy_efficiency_class=None,
+        exchange_apartment=None,
+        released=0
+    )
+
+
+def is_candidate(apartment: Apartment, profiles: list[WohnungssucherBase]) -> bool:
+    """
+    :param apartment: apartment created from a teaser
+    :param profiles: instances of the platform providing the requirements of each profile
+    :return: False if the apartment certainly does not match the requirements of any profile
+    """
+    for profile in profiles:
+        # missing values never discard the apartment
+        defaults = dict.fromkeys(profile.defaults_1, True)
+        if profile._check_apartment(apartment, defaults):
+            return True
+    return False
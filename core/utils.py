@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from typing import Literal
 
 def send_mail(from_addr: str, to_addr: str, subject: str, msg_plain: str = '', msg_html: str = ''):
+    # imported on first use, most runs do not send emails
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
     msg = MIMEMultipart()
     msg['Subject'] = subject
     msg['From'] = from_addr
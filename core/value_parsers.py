@@ -0,0 +1,122 @@
+"""
+Parsers converting the raw values of apartment attributes provided by the platforms to the expected data types.
+
+Platforms repeat the same strings for many apartments (e.g., "EG", "3 Zimmer", "1.250,00 €"). Hence, all regular
+expressions are compiled once and the results of each field parser are cached (see FieldParser).
+"""
+from __future__ import annotations
+
+import re
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
+
+# maximum number of distinct raw values cached per field
+cache_size = 1024
+
+pattern_euro_removed = re.compile('[€ .]')
+pattern_number = re.compile('\\d[\\d.,]*')
+pattern_integer = re.compile('\\d+')
+
+floors_ground = frozenset(['EG', 'Erdgeschoss'])
+
+
+def parse_int(number: str | int) -> int:
+    return int(number)
+
+
+def parse_int_from_euro(number: str | int) -> int:
+    if isinstance(number, int):
+        return number
+    try:
+        number = pattern_euro_removed.sub('', number)
+        return int(float(number.replace(',', '.')))
+    except:
+        raise TypeError
+
+
+def parse_float_from_rooms(rooms: str | float) -> float:
+    if isinstance(rooms, (int, float)):
+        return float(rooms)
+    if not isinstance(rooms, str):
+        raise TypeError
+    return float(rooms.replace(',', '.'))
+
+
+def parse_float_from_apt_size(apt_size: str | float) -> float:
+    if isinstance(apt_size, float):
+        return apt_size
+    try:
+        apt_size_float = pattern_number.findall(apt_size)[0]
+        return float(apt_size_float.replace(',', '.'))
+    except:
+        raise TypeError
+
+
+def parse_int_from_floor(floor: str | int) -> int:
+    if isinstance(floor, int):
+        return floor
+    if floor.strip() in floors_ground:
+        return 0
+    try:
+        return int(pattern_integer.findall(floor)[0])
+    except:
+        raise TypeError
+
+
+class FieldParser:
+    """
+    Parser of a single attribute of an apartment with a bounded cache of the parsed values
+    """
+    # name of the attribute
+    field: str
+
+    # description of the attribute used in error messages
+    description: str
+
+    # parse function raising ValueError or TypeError if the value cannot be parsed
+    parse: Callable[[Any], Any]
+
+    # cached parse function returning None if the value cannot be parsed
+    parse_cached: Callable[[Any], Any]
+
+    def __init__(self, field: str, description: str, parse: Callable[[Any], Any]):
+        self.field = field
+        self.description = description
+        self.parse = parse
+
+        @lru_cache(maxsize=cache_size, typed=True)
+        def parse_cached(value):
+            try:
+                return parse(value)
+            except (ValueError, TypeError):
+                return None
+
+        self.parse_cached = parse_cached
+
+    def __call__(self, value: Any) -> Any:
+        """
+        :param value: raw value (not None)
+        :return: parsed value or None if the value cannot be parsed
+        """
+        try:
+            return self.parse_cached(value)
+        except TypeError:
+            # value is not hashable and cannot be cached
+            try:
+                return self.parse(value)
+            except (ValueError, TypeError):
+                return None
+
+
+# parsers of all attributes that are not provided as expected data type by the platforms
+field_parsers = [
+    FieldParser('zip', 'zip code', parse_int),
+    FieldParser('house_number', 'house_number', parse_int),
+    FieldParser('rent_cold', 'rent_cold', parse_int_from_euro),
+    FieldParser('rent_warm', 'rent_warm', parse_int_from_euro),
+    FieldParser('rooms', 'number of rooms', parse_float_from_rooms),
+    FieldParser('apartment_size', 'apartment_size', parse_float_from_apt_size),
+    FieldParser('floor', 'floor', parse_int_from_floor),
+    FieldParser('year_of_construction', 'year_of_construction', parse_int)
+]
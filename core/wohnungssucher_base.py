@@ -1,15 +1,36 @@
+from __future__ import annotations
+
 import json
 import os.path
 import re
 import sys
+import traceback
 from abc import abstractmethod
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime, time
+from time import monotonic
+from typing import TYPE_CHECKING, Any
 
-import requests
-
-from core.HtmlDecoder import HtmlDocument
 from core.apartment import Apartment
-from core.utils import BoolPlus, send_mail
+from core.apartment_filter import ApartmentFilter
+from core.apartment_history import ApartmentHistory, get_price_drop
+from core.apartment_store import ApartmentStore, create_apartment_store
+from core.checkpoint import CrawlJournal, MailOutbox
+from core.duplicate_matcher import DuplicateMatcher
+from core.error_log import ErrorLog
+from core.known_id_index import KnownIdIndex
+from core.subscription_index import SubscriptionIndex
+from core import teaser_prefilter
+from core import value_parsers
+from core.value_parsers import field_parsers
+from core.utils import BoolPlus
+
+if TYPE_CHECKING:
+    import requests
+
+    from core.HtmlDecoder import HtmlDocument
 
 
 class WohnungssucherBase:
@@ -26,7 +47,25 @@ class WohnungssucherBase:
     path_savefile_1: str
 
     # Path to the logfile storing errors that occurred during a run.
+    # The errors are stored in an append-only log with the same name (see ErrorLog).
     path_logfile: str
+    error_log: ErrorLog
+
+    # Storage backend of the apartments of both groups, selected by the user setting storage_backend
+    apartment_store: ApartmentStore
+
+    # Index of the ids of all stored apartments
+    known_id_index: KnownIdIndex
+
+    # Snapshots of the attributes of all stored apartments to detect changes of known listings
+    apartment_history: ApartmentHistory
+
+    # Finds new apartments that have already been found on other platforms. Set by the platform runner.
+    # None to disable the detection of duplicates.
+    duplicate_matcher: DuplicateMatcher | None
+
+    # Requirements and both default sets compiled to a single predicate
+    apartment_filter: ApartmentFilter
 
     # Defines which properties must be provided for an apartment to be considered in group 0.
     # Group 0 usually contains all apartments for that all properties are provided by the platform.
@@ -67,13 +106,76 @@ class WohnungssucherBase:
     email_to_addr: str | None
 
     notify_on_new_apartments_only: bool
+    notify_on_price_drop: bool
 
     # all expected keys in raw apartment dictionary which is returned by request_all_apartments_raw
     exp_keys_apts_raw: list[str]
 
+    # HTTP session reusing connections for all requests of this instance, created on the first request
+    _session: requests.Session | None
+
+    # maximum number of apartment pages requested in parallel by request_apartments (see platform_registry)
+    max_parallel_requests: int
+
+    # seconds each run may take to request apartments or None if not limited
+    time_budget: float | None
+
+    # number of new apartments sending an email during the run or None to send a single email at the end of the run
+    notify_early_batch_size: int | None
+
+    # seconds after which new apartments are sent during the run even if notify_early_batch_size is not reached
+    notify_early_interval: float | None
+
+    # file storing the urls of the apartment pages skipped since the time budget was exhausted
+    path_pending_pages: str
+
+    # apartment pages requested by the current run, reused by the next run if this run is aborted
+    crawl_journal: CrawlJournal
+
+    # emails composed but not sent yet
+    mail_outbox: MailOutbox
+
     # list all occurred errors which are not critical
     occurred_errors: list[dict]
 
+    # number of apartments per attribute description and raw value that could not be parsed, see _parse_apartments
+    parse_failures: dict[tuple[str, str], int]
+
+    # state of the current run: ids seen during this run and new apartments
+    seen_ids: set
+    new_apts_0: list[Apartment]
+    new_apts_1: list[Apartment]
+    price_drops: list[tuple[Apartment, dict]]
+
+    # state of the current run: time (see time.monotonic) the time budget is exhausted or None if not limited,
+    # pages skipped by the previous run and pages skipped by this run
+    deadline: float | None
+    pending_pages_previous: set[str]
+    pending_pages: list[str]
+
+    # raw apartment per url of the pages requested by an aborted previous run, see crawl_journal
+    journal_pages: dict[str, dict]
+
+    # zip codes the platform is searched for (all profiles) or None to search all zip codes, e.g., if a profile accepts
+    # apartments without zip code, see get_search_urls
+    zips_searched: list[int] | None
+
+    # instances of all profiles whose apartments are requested by this instance, see prefilter_listing
+    profile_instances: list[WohnungssucherBase]
+
+    # number of apartment pages not requested since their teaser did not match any profile
+    num_pages_prefiltered: int
+
+    # state of the current run: number of new apartments of group 0 and group 1 already saved and sent,
+    # new apartments sent that are not listed on other platforms, time (see time.monotonic) the oldest new apartment
+    # not sent yet has been found and whether an email has been sent during the run
+    num_sent_0: int
+    num_sent_1: int
+    sent_apts_0: list[Apartment]
+    sent_apts_1: list[Apartment]
+    time_first_unsent: float | None
+    is_notified_early: bool
+
     def __init__(
             self,
             config_user: dict,
@@ -83,7 +185,9 @@ class WohnungssucherBase:
             path_savefile_0: str,
             path_savefile_1: str,
             path_logfile: str,
-            exp_keys_apts_raw: list[str]
+            exp_keys_apts_raw: list[str],
+            path_id_index: str | None = None,
+            path_history: str | None = None
     ):
         self.set_configurations(config=config_user)
 
@@ -92,47 +196,323 @@ class WohnungssucherBase:
         self.path_savefile_0 = path_savefile_0
         self.path_savefile_1 = path_savefile_1
         self.path_logfile = path_logfile
+        self.error_log = ErrorLog(path_logfile, config_user['error_log_retention'])
+
+        if path_id_index is None:
+            path_id_index = f'{os.path.splitext(path_savefile_0)[0]}_known_ids.txt'
+        self.known_id_index = KnownIdIndex(path_id_index)
+
+        if path_history is None:
+            path_history = f'{os.path.splitext(path_savefile_0)[0]}_history.jsonl'
+        self.apartment_history = ApartmentHistory(path_history)
+
+        self.path_pending_pages = f'{os.path.splitext(path_savefile_0)[0]}_pending_pages.json'
+        self.crawl_journal = CrawlJournal(f'{os.path.splitext(path_savefile_0)[0]}_journal.jsonl')
+        self.mail_outbox = MailOutbox(f'{os.path.splitext(path_savefile_0)[0]}_outbox.json')
 
         self.defaults_0 = defaults_ws
         self.defaults_1 = config_user['defaults_user']
 
+        self.apartment_filter = ApartmentFilter(
+            self, self.defaults_0, self.defaults_1, reorder=config_user['reorder_filter_checks']
+        )
+
         self.exp_keys_apts_raw = exp_keys_apts_raw
 
         os.makedirs(os.path.dirname(self.path_savefile_0), exist_ok=True)
         os.makedirs(os.path.dirname(self.path_savefile_1), exist_ok=True)
         os.makedirs(os.path.dirname(self.path_logfile), exist_ok=True)
 
+        self.apartment_store = create_apartment_store(config_user, path_savefile_0, path_savefile_1)
+
+        self._session = None
+        self.max_parallel_requests = 1
+        self.time_budget = config_user['platform_time_budget']
+        self.notify_early_batch_size = config_user['notify_early_batch_size']
+        self.notify_early_interval = config_user['notify_early_interval']
         self.occurred_errors = []
+        self.parse_failures = {}
+        self.duplicate_matcher = None
 
 
     def __call__(self, *args, **kwargs):
-        apartments = self.request_all_apartments_raw()
-        self._add_missing_keys(apartments)
-        apartments = self.map_apt_keys(apartments)
-        apartments = self._parse_apartments(apartments)
+        try:
+            self.crawl_for_profiles([self])
+            apartments = self._finish_run()
+            self._end_crawl()
+            return apartments
+        finally:
+            self.apartment_store.close()
+
+    @staticmethod
+    def crawl_for_profiles(platforms: list[WohnungssucherBase]):
+        """
+        Requests all apartments once and processes each apartment for all given instances of the same platform,
+        e.g., created with the configurations of different users. The apartments are requested by the first
+        instance, hence errors occurring while requesting and parsing apartments are logged by this instance.
+        Call _finish_run of each instance afterward to save and send the new apartments and _end_crawl of the first
+        instance once all instances have been finished.
+        For multiple instances, the requirements of all instances are matched at once using a SubscriptionIndex.
+        :param platforms: instances of the same platform
+        """
+        for platform in platforms:
+            platform._begin_run()
+
+        # the apartments of all profiles are requested by the first instance
+        platforms[0].profile_instances = platforms
+        if any(x.zips_included is None or x.defaults_0['zip'] or x.defaults_1['zip'] for x in platforms):
+            # apartments without zip code are only found by searching all zip codes
+            platforms[0].zips_searched = None
+        else:
+            platforms[0].zips_searched = sorted({zip_code for x in platforms for zip_code in x.zips_included})
+
+        if len(platforms) == 1:
+            for apartment in platforms[0].request_all_apartments():
+                platforms[0]._process_apartment(apartment)
+                platforms[0]._notify_early_if_due()
+            return
+
+        subscription_index = SubscriptionIndex()
+        for i, platform in enumerate(platforms):
+            subscription_index.add(i, platform, platform.defaults_0, platform.defaults_1)
+
+        for apartment in platforms[0].request_all_apartments():
+            for i, category in subscription_index.match(apartment).items():
+                platforms[i]._add_apartment(apartment, category)
+            for platform in platforms:
+                platform._notify_early_if_due()
+
+    def _begin_run(self):
+        """
+        Loads the ids of all known apartments, completes and sends the emails left by an aborted run and resets the
+        state of the current run
+        """
+        if not self.known_id_index.exists():
+            # create index from the stored apartments once
+            self.known_id_index.rebuild(self.apartment_store.iter_ids())
+        self.known_id_index.load()
+
+        # before the crawl journal is replayed, otherwise the apartments of the pending emails are new again
+        self._save_outbox_apartments()
+        try:
+            num_sent = self.mail_outbox.send()
+            if num_sent:
+                print(f'Sent {num_sent} pending emails of {self.platform_name}')
+        except:
+            # sent again by the next run
+            self.log_error(f'Could not send pending emails:\n{traceback.format_exc()}')
+
+        self.seen_ids = set()
+        self.new_apts_0 = []
+        self.new_apts_1 = []
+        self.price_drops = []
+
+        self.deadline = None
+        if self.time_budget is not None:
+            self.deadline = monotonic() + self.time_budget
+        self.pending_pages_previous = set(self._load_pending_pages())
+        self.pending_pages = []
+        self.journal_pages = self.crawl_journal.load()
+        self.zips_searched = self.zips_included
+        self.profile_instances = [self]
+        self.num_pages_prefiltered = 0
+
+        self.num_sent_0 = 0
+        self.num_sent_1 = 0
+        self.sent_apts_0 = []
+        self.sent_apts_1 = []
+        self.time_first_unsent = None
+        self.is_notified_early = False
+
+    def _save_outbox_apartments(self):
+        """
+        Saves the apartments of the emails in the outbox that have not been saved since the run composing the email
+        has been aborted. Apartments already known have been saved and are not replaced by their outdated version.
+        """
+        for entry in self.mail_outbox.load():
+            for category, apt_dicts in enumerate(entry['apartments']):
+                apts = [Apartment.from_dict(x) for x in apt_dicts if x['id'] not in self.known_id_index]
+                if apts:
+                    self.apartment_store.add_apartments(category, apts)
+                    self.known_id_index.add(x.id for x in apts)
+
+    def _process_apartment(self, apartment: Apartment):
+        """
+        Filters a single apartment and keeps it as new apartment if it matches the requirements and is not known yet.
+        Apartments matching defaults_0 are assigned to group 0, all other apartments matching defaults_1 to group 1.
+        Changes of known apartments are recorded in the apartment history.
+        """
+        if apartment.id in self.seen_ids:
+            return
 
-        apts_0 = self._filter_apartments(apartments, self.defaults_0)
-        apts_1 = self._filter_apartments(apartments, self.defaults_1)
-        apts_1 = self._remove_known_apartments(apts_0, apts_1)
+        category = self.apartment_filter.categorize(apartment)
+        if category is not None:
+            self._add_apartment(apartment, category)
 
-        known_apts_0 = self.load_apartments(self.path_savefile_0)
-        known_apts_1 = self.load_apartments(self.path_savefile_1)
+    def _add_apartment(self, apartment: Apartment, category: int):
+        """
+        Keeps an apartment matching the requirements as new apartment if it is not known yet
+        :param apartment: apartment matching the requirements
+        :param category: 0 if the apartment matches using defaults_0, 1 if it only matches using defaults_1
+        """
+        if apartment.id in self.seen_ids:
+            return
 
-        new_apts_0 = self._remove_known_apartments(known_apts_0 + known_apts_1, apts_0)
-        new_apts_1 = self._remove_known_apartments(known_apts_0 + known_apts_1, apts_1)
+        if category == 0:
+            new_apts = self.new_apts_0
+        else:
+            new_apts = self.new_apts_1
+
+        self.seen_ids.add(apartment.id)
+        changes = self.apartment_history.update(apartment)
+        if apartment.id not in self.known_id_index:
+            new_apts.append(apartment)
+            if self.time_first_unsent is None:
+                self.time_first_unsent = monotonic()
+        elif changes and self.notify_on_price_drop:
+            price_drop = get_price_drop(changes)
+            if price_drop:
+                self.price_drops.append((apartment, price_drop))
+
+    def _notify_early_if_due(self):
+        """
+        Saves and sends the new apartments found so far during the run if at least notify_early_batch_size
+        new apartments have not been sent yet or the oldest of them has been found notify_early_interval seconds ago
+        """
+        if self.notify_early_batch_size is None or self.time_first_unsent is None:
+            return
 
-        known_apts_keep_0 = self._remove_old_apartments(known_apts_0)
-        known_apts_keep_1 = self._remove_old_apartments(known_apts_1)
+        num_unsent = len(self.new_apts_0) - self.num_sent_0 + len(self.new_apts_1) - self.num_sent_1
+        is_due = num_unsent >= self.notify_early_batch_size
+        if self.notify_early_interval is not None:
+            is_due = is_due or monotonic() - self.time_first_unsent >= self.notify_early_interval
+        if is_due:
+            self._save_and_send(is_final=False)
+            self.is_notified_early = True
 
-        self.save_apartments(self.path_savefile_0, known_apts_keep_0 + new_apts_0)
-        self.save_apartments(self.path_savefile_1, known_apts_keep_1 + new_apts_1)
+    def _save_and_send(self, is_final: bool):
+        """
+        Saves and sends all new apartments found since the last call. The email and the apartments are added to the
+        outbox before the apartments are saved and only removed from the outbox once the email has been sent. If the
+        run is aborted, the next run saves the apartments from the outbox (see _save_outbox_apartments) and sends the
+        email, hence the apartments are not found as new apartments again.
+        :param is_final: whether the run is complete. Only the final call sends the price drops, removes old apartments
+            and saves the state of the run. Errors while sending are only raised by the final call.
+        """
+        new_apts_0 = self.new_apts_0[self.num_sent_0:]
+        new_apts_1 = self.new_apts_1[self.num_sent_1:]
+        self.num_sent_0 = len(self.new_apts_0)
+        self.num_sent_1 = len(self.new_apts_1)
+        self.time_first_unsent = None
+
+        apts_unique_0 = new_apts_0
+        apts_unique_1 = new_apts_1
+        duplicates = []
+        if self.duplicate_matcher is not None:
+            apts_unique_0, duplicates_0 = self._split_duplicates(new_apts_0)
+            apts_unique_1, duplicates_1 = self._split_duplicates(new_apts_1)
+            duplicates = duplicates_0 + duplicates_1
+        self.sent_apts_0 += apts_unique_0
+        self.sent_apts_1 += apts_unique_1
+
+        price_drops = self.price_drops if is_final else []
+        if new_apts_0 or new_apts_1 or price_drops or not self.is_notified_early:
+            mail = self._compose_mail(apts_unique_0, apts_unique_1, duplicates, price_drops)
+            if mail is not None:
+                self.mail_outbox.add(mail, [[x.to_dict() for x in new_apts_0], [x.to_dict() for x in new_apts_1]])
+
+        is_removed = False
+        if is_final and self.max_apartment_age is not None:
+            is_removed = self.apartment_store.remove_apartments_released_before(self._get_timestamp_max_age())
+        self.apartment_store.add_apartments(0, new_apts_0)
+        self.apartment_store.add_apartments(1, new_apts_1)
+
+        if is_removed:
+            self.known_id_index.rebuild(self.apartment_store.iter_ids())
+            self.apartment_history.retain(self.known_id_index.load())
+        else:
+            self.known_id_index.add(x.id for x in new_apts_0 + new_apts_1)
 
-        self._send_mail(new_apts_0, new_apts_1)
+        if is_final:
+            self.apartment_history.save()
+            self.mail_outbox.send()
+            return
+
+        try:
+            self.mail_outbox.send()
+        except:
+            # the email is kept in the outbox and sent by the final call or the next run
+            self.log_error(f'Could not send email:\n{traceback.format_exc()}')
+
+    def _finish_run(self) -> tuple[list[Apartment], list[Apartment]]:
+        """
+        Saves and sends all new apartments of the current run not sent yet, see _save_and_send
+        :return: new apartments of group 0 and group 1 that are not listed on other platforms
+        """
+        self._save_and_send(is_final=True)
         self.save_errors()
 
         print('\n' + self.platform_name)
-        print(f'New apartments: {new_apts_0}')
-        print(f'Further apartments: {new_apts_1}\n')
+        print(f'New apartments: {self.sent_apts_0}')
+        print(f'Further apartments: {self.sent_apts_1}')
+        if self.price_drops:
+            print(f'Reduced prices: {[apt for apt, _ in self.price_drops]}')
+        if self.pending_pages:
+            print(f'Skipped apartment pages (time budget exhausted): {len(self.pending_pages)}')
+        if self.num_pages_prefiltered:
+            print(f'Requests saved by the listing prefilter: {self.num_pages_prefiltered}')
+        print()
+
+        return self.sent_apts_0, self.sent_apts_1
+
+    def _end_crawl(self):
+        """
+        Saves the apartment pages skipped by the crawl and removes the crawl journal. Must only be called for the
+        instance that requested the apartments after the apartments of all profiles have been saved, since the
+        journal replaces the requests of the crawl for all profiles if the run is aborted before.
+        """
+        self._save_pending_pages()
+        self.crawl_journal.remove()
+
+    def _load_pending_pages(self) -> list[str]:
+        """
+        :return: urls of the apartment pages skipped by the previous run
+        """
+        if not os.path.exists(self.path_pending_pages):
+            return []
+        with open(self.path_pending_pages, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def _save_pending_pages(self):
+        """
+        Saves the urls of the apartment pages skipped by this run, they are requested first by the next run
+        """
+        if not self.pending_pages and not os.path.exists(self.path_pending_pages):
+            return
+        with open(self.path_pending_pages, 'w', encoding='utf-8') as file:
+            json.dump(self.pending_pages, file)
+
+    def _split_duplicates(
+            self,
+            apartments: list[Apartment]
+    ) -> tuple[list[Apartment], list[tuple[Apartment, list[dict]]]]:
+        """
+        Separates the apartments that have already been found on other platforms
+        :param apartments: new apartments of this platform
+        :return: apartments only found on this platform,
+            other apartments together with their listings on other platforms
+        """
+        apartments_unique = []
+        duplicates = []
+        for apt in apartments:
+            listings = self.duplicate_matcher.find_and_add(self.platform_name, apt)
+            if listings:
+                print(f'Apartment {apt.id} of {self.platform_name} is also listed on '
+                      f'{", ".join(x["platform"] for x in listings)}')
+                duplicates.append((apt, listings))
+            else:
+                apartments_unique.append(apt)
+        return apartments_unique, duplicates
 
     def set_configurations(self, config: dict):
         self.zips_included = config['zips_included']
@@ -209,31 +589,44 @@ class WohnungssucherBase:
         self.email_from_addr = config['email_from_address']
         self.email_to_addr = config['email_to_address']
         self.notify_on_new_apartments_only = config['notify_on_new_apartments_only']
+        self.notify_on_price_drop = config['notify_on_price_drop']
 
 
     @abstractmethod
-    def request_all_apartments_raw(self) -> list[dict]:
+    def request_all_apartments_raw(self) -> Iterable[dict]:
         """
         Requests all apartments from the platform, extracts them and return them as dictionary.
         The key-value pairs of the dictionary describe the properties of the apartment.
         The name of the keys can differ from the attribute names of the apartment class.
         Also, not all properties must be given.
-        :return: list of all apartments
+        Implement this method as generator to process each apartment as soon as it has been requested.
+        :return: list or generator of all apartments
         """
         pass
 
     @abstractmethod
-    def map_apt_keys(self, apts_raw: list[dict]) -> list[dict]:
+    def map_apt_keys(self, apts_raw: Iterable[dict]) -> Iterable[dict]:
         """
         Maps the values in apts_raw to the keys used in the apartment class.
         The keys in the resulting dictionaries must be equal to the attributes names of the class apartment.
         However, the datatypes can be arbitrary.
         :param apts_raw: list of dictionaries where each dictionary represents one apartment
-        :return: list of dictionaries where each dictionary represents one apartment.
+        :return: list or generator of dictionaries where each dictionary represents one apartment.
             The keys in the dictionary must be equal to the attributes names of the class apartment.
         """
         pass
 
+    def request_all_apartments(self) -> Iterator[Apartment]:
+        """
+        Requests all apartments from the platform and yields each apartment as soon as its raw data is available.
+        Each apartment is passed separately through _add_missing_keys, map_apt_keys and _parse_apartments.
+        :return: generator of all parsed apartments
+        """
+        for apt_raw in self.request_all_apartments_raw():
+            self._add_missing_keys([apt_raw])
+            for apt_dict in self.map_apt_keys([apt_raw]):
+                yield from self._parse_apartments([apt_dict])
+
     def _add_missing_keys(self, apts_raw: list[dict]):
         """
         Checks if each apartment of apts_raw contains all expected keys and add all missing keys with the value None
@@ -255,73 +648,20 @@ class WohnungssucherBase:
     def _parse_apartments(self, apts_dicts: list[dict]) -> list[Apartment]:
         """
         Parse the value of all keys in apt_attr_raw to the expected data type.
-        If the value cannot be parsed it will be set to None
+        If the value cannot be parsed it will be set to None. Such values are collected in parse_failures
+        and logged at once when the errors are saved.
         """
         apts = []
         for apt_dict in apts_dicts:
-            try:
-                if apt_dict['zip'] is not None:
-                    apt_dict['zip'] = int(apt_dict['zip'])
-            except (ValueError, TypeError):
-                apt_dict['zip'] = None
-                value = apt_dict['zip']
-                self.log_error(f'Error: Cannot parse zip code "{value}"')
-
-            try:
-                if apt_dict['house_number'] is not None:
-                    apt_dict['house_number'] = int(apt_dict['house_number'])
-            except (ValueError, TypeError):
-                apt_dict['house_number'] = None
-                value = apt_dict['house_number']
-                self.log_error(f'Error: Cannot parse house_number "{value}"')
-
-            try:
-                if apt_dict['rent_cold'] is not None:
-                    apt_dict['rent_cold'] = self.parse_int_from_euro(apt_dict['rent_cold'])
-            except (ValueError, TypeError):
-                apt_dict['rent_cold'] = None
-                value = apt_dict['rent_cold']
-                self.log_error(f'Error: Cannot parse rent_cold "{value}"')
-
-            try:
-                if apt_dict['rent_warm'] is not None:
-                    apt_dict['rent_warm'] = self.parse_int_from_euro(apt_dict['rent_warm'])
-            except (ValueError, TypeError):
-                apt_dict['rent_warm'] = None
-                value = apt_dict['rent_warm']
-                self.log_error(f'Error: Cannot parse rent_warm "{value}"')
-
-            try:
-                if apt_dict['rooms'] is not None:
-                    apt_dict['rooms'] = float(apt_dict['rooms'].replace(',', '.'))
-            except (ValueError, TypeError):
-                apt_dict['rooms'] = None
-                value = apt_dict['rooms']
-                self.log_error(f'Error: Cannot parse number of rooms "{value}"')
-
-            try:
-                if apt_dict['apartment_size'] is not None:
-                    apt_dict['apartment_size'] = self.parse_float_from_apt_size(apt_dict['apartment_size'])
-            except (ValueError, TypeError):
-                apt_dict['apartment_size'] = None
-                value = apt_dict['apartment_size']
-                self.log_error(f'Error: Cannot parse apartment_size "{value}"')
-
-            try:
-                if apt_dict['floor'] is not None:
-                    apt_dict['floor'] = self.parse_int_from_floor(apt_dict['floor'])
-            except (ValueError, TypeError):
-                apt_dict['floor'] = None
-                value = apt_dict['floor']
-                self.log_error(f'Error: Cannot parse floor "{value}"')
-
-            try:
-                if apt_dict['year_of_construction'] is not None:
-                    apt_dict['year_of_construction'] = int(apt_dict['year_of_construction'])
-            except (ValueError, TypeError):
-                apt_dict['year_of_construction'] = None
-                value = apt_dict['year_of_construction']
-                self.log_error(f'Error: Cannot parse year_of_construction "{value}"')
+            for field_parser in field_parsers:
+                value = apt_dict[field_parser.field]
+                if value is None:
+                    continue
+                value_parsed = field_parser(value)
+                if value_parsed is None:
+                    key = (field_parser.description, str(value))
+                    self.parse_failures[key] = self.parse_failures.get(key, 0) + 1
+                apt_dict[field_parser.field] = value_parsed
 
             # TODO parse exchange_apartment
 
@@ -329,115 +669,82 @@ class WohnungssucherBase:
 
         return apts
 
-
-    def _filter_apartments(self, apartments: list[Apartment], defaults: dict) -> list[Apartment]:
+    def _log_parse_failures(self):
+        """
+        Logs one error per value that could not be parsed since the last call
+        """
+        for (description, value), count in self.parse_failures.items():
+            msg = f'Error: Cannot parse {description} "{value}"'
+            if count > 1:
+                msg += f' ({count} apartments)'
+            self.log_error(msg)
+        self.parse_failures = {}
+
+    def _check_apartment(self, apartment: Apartment, defaults: dict) -> bool:
         """
-        Removes all apartment that do not match the defined requirements.
+        Checks whether a single apartment matches the defined requirements.
         If a value is set to None the corresponding default value decides whether the apartment is kept or not
         (True: keep, False: discard)
-        :param apartments:
-        :param defaults:
-        :return:
         """
-        apartments_filtered = []
+        if not apartment.check_zip(self.zips_included, self.zips_excluded, defaults['zip']):
+            return False
+        if not apartment.check_place(self.places_included, self.places_excluded, defaults['place']):
+            return False
 
-        for apartment in apartments:
-            if not apartment.check_zip(self.zips_included, self.zips_excluded, defaults['zip']):
-                continue
-            if not apartment.check_place(self.places_included, self.places_excluded, defaults['place']):
-                continue
-
-            if not apartment.check_rent_cold(self.rent_cold_min, self.rent_cold_max, defaults['rent_cold']):
-                continue
-            if not apartment.check_rent_warm(self.rent_warm_min, self.rent_warm_max, defaults['rent_warm']):
-                continue
-
-            if not apartment.check_rooms(self.rooms_min, self.rooms_max, defaults['room']):
-                continue
+        if not apartment.check_rent_cold(self.rent_cold_min, self.rent_cold_max, defaults['rent_cold']):
+            return False
+        if not apartment.check_rent_warm(self.rent_warm_min, self.rent_warm_max, defaults['rent_warm']):
+            return False
 
-            if not apartment.check_apartment_size(
-                    self.apartment_size_min, self.apartment_size_max, defaults['apartment_size']
-            ):
-                continue
+        if not apartment.check_rooms(self.rooms_min, self.rooms_max, defaults['room']):
+            return False
 
-            if not apartment.check_floor(self.floors, defaults['floor']):
-                continue
+        if not apartment.check_apartment_size(
+                self.apartment_size_min, self.apartment_size_max, defaults['apartment_size']
+        ):
+            return False
 
-            if not apartment.check_energy_efficiency_class(
-                    self.energy_efficiency_classes, defaults['energy_efficiency_class']
-            ):
-                continue
+        if not apartment.check_floor(self.floors, defaults['floor']):
+            return False
 
-            if not apartment.check_year_of_construction(
-                    self.year_of_construction_min, self.year_of_construction_max, defaults['year_of_construction']
-            ):
-                continue
+        if not apartment.check_energy_efficiency_class(
+                self.energy_efficiency_classes, defaults['energy_efficiency_class']
+        ):
+            return False
 
-            if not apartment.check_exchange_apartment(self.exchange_apartment, defaults['exchange_apartment']):
-                continue
+        if not apartment.check_year_of_construction(
+                self.year_of_construction_min, self.year_of_construction_max, defaults['year_of_construction']
+        ):
+            return False
 
-            apartments_filtered.append(apartment)
+        if not apartment.check_exchange_apartment(self.exchange_apartment, defaults['exchange_apartment']):
+            return False
 
-        return apartments_filtered
+        return True
 
-    @staticmethod
-    def load_apartments(filename: str) -> list[Apartment]:
-        """
-        Loads saved apartments from a json file
-        :param filename: path to the json file to be loaded
-        :return: list of loaded apartments
-        """
-        if not os.path.exists(filename):
-            return []
-
-        with open(filename, 'r') as file:
-            apts_json = json.load(file)
-
-        apartments = []
-        for apt in apts_json:
-            apartments.append(Apartment.from_dict(apt))
-
-        return apartments
-
-    @staticmethod
-    def save_apartments(filename: str, apartments: list[Apartment]):
-        """
-        Saves all given apartments to a file. The apartments are stored in json format.
-        :param filename: path to the json file
-        :param apartments: list of all apartments to be saved
-        """
-        apts_json = []
-        for apt in apartments:
-            apts_json.append(apt.to_dict())
-
-        with open(filename, 'w') as f:
-            json.dump(apts_json, f)
-
-    @staticmethod
-    def _remove_known_apartments(known_apartments: list[Apartment], all_apartments: list[Apartment]) -> list[Apartment]:
-        """
-        Removes all known apartments from the list of all_apartments to keep only unknown apartments
-        :param known_apartments: list of known apartments
-        :param all_apartments: list of all found apartments
-        :return: All apartments that are not listed in "known_apartments"
-        """
-        new_apts = [x for x in all_apartments if x.id not in {y.id for y in known_apartments}]
-        return new_apts
-
-    def _send_mail(self, apartments_0: list[Apartment], apartments_1: list[Apartment]):
+    def _compose_mail(
+            self,
+            apartments_0: list[Apartment],
+            apartments_1: list[Apartment],
+            duplicates: list[tuple[Apartment, list[dict]]] | None = None,
+            price_drops: list[tuple[Apartment, dict]] | None = None
+    ) -> dict | None:
         """
-        Sends an email with all given apartments
+        Composes an email with all given apartments
         :param apartments_0:
         :param apartments_1:
-        :return:
+        :param duplicates: new apartments of this platform that have already been found on other platforms
+            together with the listings on the other platforms. These apartments are only referenced briefly.
+        :param price_drops: known apartments whose price has been reduced together with the old and new prices
+        :return: arguments of send_mail or None if no email is to be sent
         """
         if self.email_to_addr is None:
-            return
+            return None
 
         # if no new apartments
         is_new_apts = apartments_0 or apartments_1
-        if not is_new_apts and self.notify_on_new_apartments_only:
-            return
+        if not is_new_apts and not price_drops and self.notify_on_new_apartments_only:
+            return None
 
         if len(apartments_0) == 0:
             headline_0 = ''
@@ -455,70 +762,251 @@ class WohnungssucherBase:
             email_content += '\n\t<div>\n\t\t<h1>Weitere Angebote</h1>\n\t</div>\n'
             for apt_1 in apartments_1:
                 email_content += apt_1.to_html()[1]
+
+        if duplicates:
+            email_content += '\n\t<div>\n\t\t<h1>Bereits auf anderen Portalen gefunden</h1>\n\t</div>\n'
+            for apt, listings in duplicates:
+                email_content += apt.to_html_reference([(x['platform'], x['url']) for x in listings])
+
+        if price_drops:
+            email_content += '\n\t<div>\n\t\t<h1>Preissenkungen</h1>\n\t</div>\n'
+            for apt, price_drop in price_drops:
+                email_content += apt.to_html_price_drop(price_drop)
         email_content += '</body>\n</html>'
 
         if is_new_apts:
             subject = f'Neue Wohnungen bei {self.platform_name}'
+        elif price_drops:
+            subject = f'Preissenkungen bei {self.platform_name}'
         else:
             subject = f'Keine neuen Wohnungen bei {self.platform_name}'
 
-        send_mail(self.email_from_addr, self.email_to_addr, subject, msg_html=email_content)
+        return {
+            'from_addr': self.email_from_addr,
+            'to_addr': self.email_to_addr,
+            'subject': subject,
+            'msg_html': email_content
+        }
 
-    def load_errors(self) -> list[dict]:
+    def search_stored_apartments(self, timestamp: float | None = None) -> tuple[list[dict], list[dict]]:
         """
-        Loads saved errors from a json file
-        :return: list of errors
+        Searches all stored apartments of both categories for the current requirements, e.g., after they have been
+        changed. If NumPy is installed, all apartments are checked at once by a BatchFilter (see
+        core.apartment_batch), otherwise each apartment is checked by the apartment filter.
+        :param timestamp: timestamp of the oldest release date to be searched or None to search all apartments
+        :return: stored apartments as dictionaries (see Apartment.to_dict) matching using defaults_0 and further
+            apartments only matching using defaults_1
         """
-        if not os.path.exists(self.path_logfile):
-            return []
-
-        with open(self.path_logfile, 'r') as file:
-            errors = json.load(file)
+        # imported on first use to keep the startup fast
+        from core import apartment_batch
 
-        return errors
+        records = [x for category in (0, 1) for x in self.apartment_store.iter_dicts(category, timestamp=timestamp)]
+        if apartment_batch.np is not None:
+            batch = apartment_batch.ApartmentBatch(records)
+            categories = apartment_batch.BatchFilter(self, self.defaults_0, self.defaults_1).categorize(batch).tolist()
+        else:
+            categories = [self.apartment_filter.categorize(Apartment.from_dict(x)) for x in records]
 
-    def save_errors(self):
-        errors_all = self.load_errors()
-        errors_all += self.occurred_errors
+        matches = ([], [])
+        for record, category in zip(records, categories):
+            if category in (0, 1):
+                matches[category].append(record)
+        return matches
 
-        with open(self.path_logfile, 'w') as f:
-            json.dump(errors_all, f)
+    def load_errors(self, timestamp_min: float | None = None) -> list[dict]:
+        """
+        Loads saved errors from the error log
+        :param timestamp_min: only errors that occurred at or after this timestamp are loaded. None to load all errors
+        :return: list of errors
+        """
+        return self.error_log.read(timestamp_min)
 
-    def _remove_old_apartments(self, apartments: list[Apartment]) -> list[Apartment]:
+    def save_errors(self):
         """
-        Removes all apartments where the release date is older than self.max_apartment_age dqys
-        :param apartments: list of apartments to be considered
-        :return: list of apartments where their release date is younger.
+        Appends all errors occurred since the last call to the error log
         """
-        if self.max_apartment_age is None:
-            return apartments
+        self._log_parse_failures()
+        self.error_log.append(self.occurred_errors)
+        self.occurred_errors = []
 
+    def _get_timestamp_max_age(self) -> float:
+        """
+        :return: timestamp of the oldest release date an apartment may have to be kept (see max_apartment_age)
+        """
         current_day = datetime.now().date()
         timestamp_today = datetime.combine(current_day, time(0, 0)).timestamp()
-        timestamp_max_age = timestamp_today - 86400 * self.max_apartment_age
-
-        apartments_keep = []
-        for apt in apartments:
-            if apt.released >= timestamp_max_age:
-                apartments_keep.append(apt)
+        return timestamp_today - 86400 * self.max_apartment_age
 
-        return apartments_keep
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            # imported on first use to keep the startup fast
+            import requests
+            self._session = requests.Session()
+        return self._session
 
-    @staticmethod
-    def request_url(url) -> HtmlDocument | None:
+    def request_url(self, url) -> HtmlDocument | None:
         """
-        Sends an HTTP GET request and convert the response to an HtmlDocument object
+        Sends an HTTP GET request and convert the response to an HtmlDocument object.
+        The connection is kept open and reused by following requests to the same host.
         :param url: url to send an HTTP GET request
         :return: HTMLDocument object containing the pages content
         """
-        response = requests.get(url)
+        response = self.session.get(url)
         if response.status_code != 200:
             print(f"Request to {url} returned status code {response.status_code}", file=sys.stderr)
             return None
         content = response.text
+        from core.HtmlDecoder import HtmlDocument
         html_document = HtmlDocument(content)
         return html_document
 
+    def _get_time_remaining(self) -> float | None:
+        """
+        :return: seconds until the time budget of the current run is exhausted or None if the run is not limited
+        """
+        if self.deadline is None:
+            return None
+        return self.deadline - monotonic()
+
+    def _is_time_budget_exhausted(self) -> bool:
+        time_remaining = self._get_time_remaining()
+        return time_remaining is not None and time_remaining <= 0
+
+    def _skip_pages(self, urls: list[str]):
+        """
+        Records the apartment pages that could not be requested within the time budget
+        """
+        self.pending_pages.extend(urls)
+        self.log_error(f'Time budget of {self.time_budget} s exhausted. Skipped {len(urls)} apartment pages, '
+                       f'they are requested first by the next run.')
+
+    def request_urls(self, urls: list[str]) -> list[HtmlDocument | None]:
+        """
+        Requests multiple pages, e.g., the results of multiple searches (see get_search_urls).
+        Up to max_parallel_requests pages are requested in parallel.
+        :param urls: urls of the pages
+        :return: HtmlDocument of each page in the order of urls, None if a page could not be loaded
+        """
+        if self.max_parallel_requests <= 1 or len(urls) <= 1:
+            return [self.request_url(x) for x in urls]
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel_requests) as executor:
+            return list(executor.map(self.request_url, urls))
+
+    def get_search_urls(self) -> list[str]:
+        """
+        Override if the platform can be searched for the requirements of the user, e.g., for zip codes
+        (see zips_searched and core.search_urls). All requirements are still checked for each apartment afterward.
+        :return: urls of the searches returning all candidate apartments
+        """
+        return [self.url_platform]
+
+    def prefilter_listing(self, urls: list[str], teasers: list[str]) -> list[str]:
+        """
+        Skips apartments whose teaser on the listing page shows that they certainly do not match the requirements of
+        any profile (see core.teaser_prefilter). Apartments with missing or uncertain teaser values are kept.
+        :param urls: urls of the apartment pages
+        :param teasers: inner html of the teaser of each apartment on the listing page
+        :return: urls of the apartments to be requested
+        """
+        urls_candidates = []
+        for url, teaser in zip(urls, teasers):
+            values = teaser_prefilter.extract_teaser(teaser)
+            if values:
+                apartment = teaser_prefilter.create_teaser_apartment(url, values)
+                if not teaser_prefilter.is_candidate(apartment, self.profile_instances):
+                    continue
+            urls_candidates.append(url)
+        self.num_pages_prefiltered += len(urls) - len(urls_candidates)
+        return urls_candidates
+
+    def get_apartment_id_from_url(self, url: str) -> Any | None:
+        """
+        Override if the id of an apartment can be derived from the url of its page without requesting the page.
+        Allows requesting the pages of new apartments first.
+        :return: id of the apartment or None if the id is unknown
+        """
+        return None
+
+    def _prioritize_pages(self, urls: list[str]) -> list[str]:
+        """
+        Orders apartment pages by the likelihood of containing new apartments: pages skipped by the previous run,
+        pages of apartments that are not known (or whose id is unknown) and pages of known apartments.
+        The order of the listing is kept within each group since platforms list the newest apartments at the top.
+        """
+        urls_pending = []
+        urls_unknown = []
+        urls_known = []
+        for url in urls:
+            if url in self.pending_pages_previous:
+                urls_pending.append(url)
+                continue
+            apt_id = self.get_apartment_id_from_url(url)
+            if apt_id is not None and apt_id in self.known_id_index:
+                urls_known.append(url)
+            else:
+                urls_unknown.append(url)
+        return urls_pending + urls_unknown + urls_known
+
+    def request_apartments(self, urls: list[str]) -> Iterator[dict]:
+        """
+        Requests the pages of multiple apartments using request_apartment of the platform.
+        Up to max_parallel_requests pages are requested in parallel, pages likely containing new apartments first
+        (see _prioritize_pages). Once the time budget is exhausted, outstanding requests are abandoned and the
+        remaining pages are skipped, the apartments requested so far are processed as usual.
+        Pages requested by an aborted previous run are taken from the crawl journal, all other requested pages are
+        added to it.
+        :param urls: urls of the apartment pages
+        :return: generator of the raw apartments, apartments that could not be loaded are skipped
+        """
+        for url in urls:
+            if url in self.journal_pages:
+                yield self.journal_pages[url]
+        urls = self._prioritize_pages([x for x in urls if x not in self.journal_pages])
+        if urls and self._is_time_budget_exhausted():
+            # e.g., while requesting the search results
+            self._skip_pages(urls)
+            return
+
+        if self.deadline is None and (self.max_parallel_requests <= 1 or len(urls) <= 1):
+            for url in urls:
+                apt_raw = self.request_apartment(url)
+                if apt_raw is not None:
+                    self.crawl_journal.add(url, apt_raw)
+                    yield apt_raw
+            return
+
+        # with a time budget, even single requests are run by the executor since a started request cannot be
+        # interrupted
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_parallel_requests, len(urls))))
+        futures = [executor.submit(self.request_apartment, url) for url in urls]
+        try:
+            for i, future in enumerate(futures):
+                try:
+                    apt_raw = future.result(timeout=self._get_time_remaining())
+                except FuturesTimeoutError:
+                    if future.done():
+                        # raised by the request itself
+                        raise
+                    # pages loaded in parallel to the timed out request are kept
+                    urls_skipped = []
+                    for url, future_each in zip(urls[i:], futures[i:]):
+                        if future_each.done() and not future_each.cancelled() and future_each.exception() is None:
+                            if future_each.result() is not None:
+                                self.crawl_journal.add(url, future_each.result())
+                                yield future_each.result()
+                        else:
+                            urls_skipped.append(url)
+                    self._skip_pages(urls_skipped)
+                    return
+                if apt_raw is not None:
+                    self.crawl_journal.add(urls[i], apt_raw)
+                    yield apt_raw
+        finally:
+            # does not wait for started requests, they are abandoned and finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+
     def parse_url(self, url_current: str, href: str) -> str | None:
         """
         Parses the url of an href element
@@ -543,37 +1031,15 @@ class WohnungssucherBase:
 
     @staticmethod
     def parse_int_from_euro(number: str | int) -> int:
-        if isinstance(number, int):
-            return number
-        try:
-            number = re.sub('[€ .]', '', number)
-            number = re.sub('[,]', '.', number)
-            return int(float(number))
-        except:
-            raise TypeError
+        return value_parsers.parse_int_from_euro(number)
 
     @staticmethod
     def parse_float_from_apt_size(apt_size: str | float) -> float:
-        if isinstance(apt_size, float):
-            return apt_size
-        try:
-            apt_size_float = re.findall('\d[\d.,]*', apt_size)[0]
-            apt_size_float = float(apt_size_float.replace(',', '.'))
-            return apt_size_float
-        except:
-            raise TypeError
+        return value_parsers.parse_float_from_apt_size(apt_size)
 
     @staticmethod
     def parse_int_from_floor(floor: str | int) -> int:
-        if isinstance(floor, int):
-            return floor
-        if floor.strip() in ['EG', 'Erdgeschoss']:
-            return 0
-        try:
-            floor_int = int(re.findall('\d+', floor)[0])
-            return floor_int
-        except:
-            raise TypeError
+        return value_parsers.parse_int_from_floor(floor)
 
     def compute_warm_rent_from_additional_costs(self, rent_cold: int | str, additional_costs: int | str):
         if isinstance(rent_cold, str):
@@ -1,31 +1,34 @@
+import argparse
 import copy
 import json
 import sys
 import traceback
+from collections.abc import Iterable
 from datetime import datetime, time
 
-from core.apartment import Apartment
-from core.config_loader import load_configuration
+from core.config_loader import load_profiles
+from core.platform_registry import get_platforms
+from core.platform_runner import print_run_summary, run_platforms
 from core.utils import send_mail, send_error_mail
-from wohnungssucher_platforms.ws_mietwohnungsboerse import WSMietwohnungsboerse
-from wohnungssucher_platforms.ws_gvg import WSGVG
 
 
-def filter_new_apts(apts: list[Apartment]) -> list[Apartment]:
+def get_timestamp_last_week() -> float:
     current_day = datetime.now().date()
     timestamp_today = datetime.combine(current_day, time(0, 0)).timestamp()
-    timestamp_max_age = timestamp_today - 604800  # one week 7*24*60*60s
+    return timestamp_today - 604800  # one week 7*24*60*60s
+
+
+def filter_new_apts(apts: Iterable[dict]) -> list[dict]:
+    timestamp_max_age = get_timestamp_last_week()
 
     apts_new = []
     for apt in apts:
-        if apt.released > timestamp_max_age:
+        if apt['released'] > timestamp_max_age:
             apts_new.append(apt)
     return apts_new
 
 def filter_new_errors(errors: list[dict]) -> list[dict]:
-    current_day = datetime.now().date()
-    timestamp_today = datetime.combine(current_day, time(0, 0)).timestamp()
-    timestamp_max_age = timestamp_today - 604800  # one week 7*24*60*60s
+    timestamp_max_age = get_timestamp_last_week()
 
     errors_new = []
     for err in errors:
@@ -34,94 +37,145 @@ def filter_new_errors(errors: list[dict]) -> list[dict]:
     return errors_new
 
 
-if __name__ == '__main__':
-    platforms = [
-        ('gvg', WSGVG),
-        ('mietwohnungsboerse', WSMietwohnungsboerse)
-    ]
-    config = load_configuration()
-
-    try:
-        # send weekly status report if monday
-        if config['email_send_status'] and datetime.now().weekday() == 0:
-            config_dict = copy.deepcopy(config)
-            config_dict['exchange_apartment'] = str(config['exchange_apartment'])
-
-            report = {
-                'Status': 'running',
-                'User Settings': config_dict,
-                'Apartment Portals': [x[0] for x in platforms]
-            }
-
-            num_apts_new_tot_0 = 0
-            num_apts_new_tot_1 = 0
-            num_critical_errors = 0
-            num_noncritical_errors = 0
-
-            for desc, func in platforms:
-                platform = func(config)
-                apts_0 = filter_new_apts(platform.load_apartments(platform.path_savefile_0))
-                apts_1 = filter_new_apts(platform.load_apartments(platform.path_savefile_1))
-                errors = filter_new_errors(platform.load_errors())
-                errors_critical = [x for x in errors if x['type'] == 'CRITICAL']
-                errors_noncritical = [x for x in errors if x['type'] == 'ERROR']
-
-                num_apts_new_tot_0 += len(apts_0)
-                num_apts_new_tot_1 += len(apts_1)
-                num_critical_errors += len(errors_critical)
-                num_noncritical_errors += len(errors_noncritical)
-
-                report_apt = {
-                    'New apartments': {
-                        'Counts': {
-                            'Total': len(apts_0) + len(apts_1),
-                            'Category 0': len(apts_0),
-                            'Category 1': len(apts_1),
-                        },
-                        'Details': {
-                            'Category 0': [x.to_dict() for x in apts_0],
-                            'Category 1': [x.to_dict() for x in apts_1]
-                        }
-                    },
-                    'Errors': {
-                        'Counts': {
-                            'Total': len(errors),
-                            'Critical': len(errors_critical),
-                            'Non-Critical': len(errors_noncritical),
-                        },
-                        'Details': {
-                            'Critical': errors_critical,
-                            'Non-Critical': errors_noncritical,
-                        }
-                    }
+def send_status_report(platforms: list[tuple[str, type]], config: dict):
+    """
+    Sends a report of all apartments found and errors occurred during the last week
+    :param platforms: list of tuples of the short name and the class of each platform
+    :param config: user configuration of a profile
+    """
+    config_dict = copy.deepcopy(config)
+    config_dict['exchange_apartment'] = str(config['exchange_apartment'])
+
+    report = {
+        'Status': 'running',
+        'User Settings': config_dict,
+        'Apartment Portals': [x[0] for x in platforms]
+    }
+
+    num_apts_new_tot_0 = 0
+    num_apts_new_tot_1 = 0
+    num_critical_errors = 0
+    num_noncritical_errors = 0
+
+    for desc, func in platforms:
+        platform = func(config)
+        timestamp_last_week = get_timestamp_last_week()
+        store = platform.apartment_store
+        apts_0 = filter_new_apts(store.iter_dicts(0, timestamp=timestamp_last_week))
+        apts_1 = filter_new_apts(store.iter_dicts(1, timestamp=timestamp_last_week))
+        store.close()
+        errors = filter_new_errors(platform.load_errors(timestamp_last_week))
+        errors_critical = [x for x in errors if x['type'] == 'CRITICAL']
+        errors_noncritical = [x for x in errors if x['type'] == 'ERROR']
+
+        num_apts_new_tot_0 += len(apts_0)
+        num_apts_new_tot_1 += len(apts_1)
+        num_critical_errors += len(errors_critical)
+        num_noncritical_errors += len(errors_noncritical)
+
+        report_apt = {
+            'New apartments': {
+                'Counts': {
+                    'Total': len(apts_0) + len(apts_1),
+                    'Category 0': len(apts_0),
+                    'Category 1': len(apts_1),
+                },
+                'Details': {
+                    'Category 0': apts_0,
+                    'Category 1': apts_1
                 }
-                report[desc] = report_apt
-
-            msg = f'Total number of new apartments: {num_apts_new_tot_0}\n'
-            msg += f'Total number of further apartments (with missing properties): {num_apts_new_tot_1}\n'
-            msg += f'Total number of errors: {num_critical_errors} critical errors, {num_noncritical_errors} non-critical errors\n\n'
-            msg += json.dumps(report, indent=2)
+            },
+            'Errors': {
+                'Counts': {
+                    'Total': len(errors),
+                    'Critical': len(errors_critical),
+                    'Non-Critical': len(errors_noncritical),
+                },
+                'Details': {
+                    'Critical': errors_critical,
+                    'Non-Critical': errors_noncritical,
+                }
+            }
+        }
+        report[desc] = report_apt
+
+    msg = f'Total number of new apartments: {num_apts_new_tot_0}\n'
+    msg += f'Total number of further apartments (with missing properties): {num_apts_new_tot_1}\n'
+    msg += f'Total number of errors: {num_critical_errors} critical errors, {num_noncritical_errors} non-critical errors\n\n'
+    msg += json.dumps(report, indent=2)
+
+    subject = 'Status report Wohnungssucher'
+    send_mail(config['email_from_address'], config['email_to_address'], subject, msg_plain=msg)
+
+
+def send_status_reports(platforms: list[tuple[str, type]], profiles: dict[str, dict]):
+    """
+    Sends the weekly status report of each profile if today is monday
+    """
+    if datetime.now().weekday() != 0:
+        return
+    for config_profile in profiles.values():
+        if config_profile['email_send_status']:
+            send_status_report(platforms, config_profile)
+
+
+def print_stored_matches(platforms: list[tuple[str, type]], profiles: dict[str, dict]):
+    """
+    Prints the stored apartments of all platforms matching the requirements of each profile, e.g., to search the
+    history of apartments after changing the requirements
+    """
+    for profile, config in profiles.items():
+        if len(profiles) > 1:
+            print(f'\nProfile {profile}')
+        for name, cls in platforms:
+            platform = cls(config)
+            apts_0, apts_1 = platform.search_stored_apartments()
+            platform.apartment_store.close()
+            print(f'\n{name}: {len(apts_0)} apartments, {len(apts_1)} further apartments (with missing properties)')
+            for apt in apts_0 + apts_1:
+                print(f'  {apt["description"]}: {apt["url"]}')
 
-            subject = 'Status report Wohnungssucher'
-            send_mail(config['email_from_address'], config['email_to_address'], subject, msg_plain=msg)
 
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Searches apartment platforms for new apartments')
+    parser.add_argument(
+        '--daemon', action='store_true',
+        help='keep running and search each platform repeatedly (see daemon_interval in user_configuration.py)'
+    )
+    parser.add_argument(
+        '--profile-startup', action='store_true',
+        help='measure the time until the first request and the import time of each module without searching'
+    )
+    parser.add_argument(
+        '--search-stored', action='store_true',
+        help='list the stored apartments matching the current requirements without searching the platforms'
+    )
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        from core.startup_profile import print_startup_profile
+        print_startup_profile()
+        sys.exit(0)
+
+    profiles = load_profiles()
+    config = next(iter(profiles.values()))
 
-        # look for new apartments
-        for desc, cls in platforms:
-            platform = cls(config)
-            try:
-                platform()
-            except:
-                msg = traceback.format_exc()
-                send_error_mail(
-                    config['email_from_address'],
-                    config['email_to_address'],
-                    msg,
-                    cls.__name__,
-                    config['email_send_status']
-                )
-                platform.log_error(msg, critical=True)
-                platform.save_errors()
+    try:
+        # platform modules are imported when the platforms are run
+        platforms = get_platforms(config)
+
+        if args.search_stored:
+            print_stored_matches(platforms, profiles)
+        elif args.daemon:
+            from core.daemon import Daemon
+            Daemon(platforms, on_new_day=send_status_reports).run()
+        else:
+            send_status_reports(platforms, profiles)
+
+            # look for new apartments
+            start = datetime.now()
+            runs = run_platforms(platforms, profiles)
+            print_run_summary(runs, (datetime.now() - start).total_seconds())
 
     except:
         msg = traceback.format_exc()
@@ -129,7 +183,3 @@ if __name__ == '__main__':
             config['email_from_address'], config['email_to_address'], msg, 'main', config['email_send_status']
         )
         print(msg, file=sys.stderr)
-
-
-
-
@@ -14,6 +14,7 @@ fi
 USERNAME="wsuser"
 SERVICE_SERVICE="wohnungssucher.service"
 SERVICE_TIMER="wohnungssucher.timer"
+SERVICE_DAEMON="wohnungssucher-daemon.service"
 SERVICE_DIR="/etc/systemd/system"
 PROGRAM_DIR="/opt/wohnungssucher"
 
@@ -26,8 +27,8 @@ else
 fi
 
 # Copy service files
-echo "Copying $SERVICE_SERVICE and $SERVICE_SERVICE_TIMER to $SERVICE_DIR"
-for SERVICE_FILE in "$SERVICE_SERVICE" "$SERVICE_TIMER"; do
+echo "Copying $SERVICE_SERVICE, $SERVICE_TIMER and $SERVICE_DAEMON to $SERVICE_DIR"
+for SERVICE_FILE in "$SERVICE_SERVICE" "$SERVICE_TIMER" "$SERVICE_DAEMON"; do
     if [ ! -f "$SERVICE_DIR/$SERVICE_FILE" ] || [ "$owrite" = true ]; then
         sudo cp "$SERVICE_FILE" "$SERVICE_DIR/"
     else
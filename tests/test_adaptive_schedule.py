@@ -0,0 +1,110 @@
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stderr
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.adaptive_schedule import PollingSchedule, allocate_runs, estimate_arrival_rates, minutes_per_day
+
+day = 86400
+
+
+class TestAllocateRuns(unittest.TestCase):
+
+    def test_square_root(self):
+        runs = allocate_runs({'a': 4.0, 'b': 1.0}, 30, 0, 100)
+        self.assertAlmostEqual(20, runs['a'])
+        self.assertAlmostEqual(10, runs['b'])
+
+    def test_minimum(self):
+        runs = allocate_runs({'a': 4.0, 'b': 1.0, 'c': 0.0}, 36, 2, 100)
+        self.assertEqual(2, runs['c'])
+        self.assertAlmostEqual(36, sum(runs.values()))
+        self.assertAlmostEqual(2 * (runs['b'] - 2), runs['a'] - 2)
+
+    def test_budget_below_minimum(self):
+        self.assertEqual({'a': 10, 'b': 10}, allocate_runs({'a': 4.0, 'b': 1.0}, 5, 10, 100))
+
+    def test_maximum_redistributed(self):
+        runs = allocate_runs({'a': 100.0, 'b': 1.0, 'c': 1.0}, 100, 0, 60)
+        self.assertEqual(60, runs['a'])
+        self.assertAlmostEqual(20, runs['b'])
+        self.assertAlmostEqual(20, runs['c'])
+
+    def test_all_capped(self):
+        self.assertEqual({'a': 60, 'b': 60}, allocate_runs({'a': 100.0, 'b': 1.0}, 1000, 10, 60))
+
+    def test_without_arrivals(self):
+        self.assertEqual({'a': 10, 'b': 10}, allocate_runs({'a': 0.0, 'b': 0.0}, 100, 10, 60))
+
+
+class TestEstimateArrivalRates(unittest.TestCase):
+
+    def test_rates_per_weekday(self):
+        now = datetime(2024, 3, 4, 12).timestamp()
+        # 4 weeks of 2 apartments every monday and 1 every tuesday, an apartment older than the lookback
+        released = [now - week * 7 * day for week in range(4) for _ in range(2)]
+        released += [now - week * 7 * day - 6 * day for week in range(4)]
+        released.append(now - 100 * 7 * day)
+        rates = estimate_arrival_rates(released, now)
+        # the apartments are observed for 3 weeks and 6 days
+        weeks = (3 * 7 + 6) / 7
+        self.assertAlmostEqual(8 / weeks, rates[0])
+        self.assertAlmostEqual(4 / weeks, rates[1])
+        self.assertEqual([0] * 5, rates[2:])
+
+    def test_at_least_one_week(self):
+        now = datetime(2024, 3, 4, 12).timestamp()
+        self.assertEqual([3, 0, 0, 0, 0, 0, 0], estimate_arrival_rates([now - 60] * 3, now))
+        self.assertEqual([0] * 7, estimate_arrival_rates([], now))
+
+
+class TestPollingSchedule(unittest.TestCase):
+
+    def test_intervals(self):
+        rates = {'a': [16.0] * 5 + [0.0] * 2, 'b': [1.0] * 7}
+        schedule = PollingSchedule(rates, target_latency=10, budget=100, interval_max=120)
+
+        for weekday in range(7):
+            intervals = [schedule.get_interval(x, weekday) for x in rates]
+            for interval in intervals:
+                # between the target latency and interval_max
+                self.assertGreaterEqual(interval, 2 * 10 - 1e-9)
+                self.assertLessEqual(interval, 120 + 1e-9)
+            self.assertLessEqual(sum(minutes_per_day / x for x in intervals), 100 + 1e-9)
+            self.assertAlmostEqual(intervals[0] / 2, schedule.get_expected_latency('a', weekday))
+
+        # the platform with more arrivals is polled more often on weekdays
+        self.assertLess(schedule.get_interval('a', 0), schedule.get_interval('b', 0))
+        self.assertEqual(120, schedule.get_interval('a', 6))
+        self.assertIsNone(schedule.get_interval('unknown', 0))
+        self.assertIn('runs per day', str(schedule))
+
+    def test_target_latency_reached(self):
+        schedule = PollingSchedule({'a': [1.0] * 7}, target_latency=15, budget=1000, interval_max=120)
+        self.assertEqual([30] * 7, [round(x, 6) for x in schedule.intervals['a']])
+
+    def test_target_latency_above_interval_max(self):
+        # the platform is still polled every interval_max minutes
+        schedule = PollingSchedule({'a': [1.0] * 7}, target_latency=120, budget=1000, interval_max=60)
+        self.assertEqual([60] * 7, [round(x, 6) for x in schedule.intervals['a']])
+
+    def test_budget_below_interval_max(self):
+        # 3 platforms polled every 60 minutes require 72 runs per day
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            schedule = PollingSchedule({x: [1.0] * 7 for x in 'abc'}, target_latency=10, budget=48, interval_max=60)
+        self.assertIn('exceeds the polling budget of 48', stderr.getvalue())
+        self.assertEqual([60] * 7, [round(x, 6) for x in schedule.intervals['a']])
+
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            PollingSchedule({x: [1.0] * 7 for x in 'ab'}, target_latency=10, budget=48, interval_max=60)
+        self.assertEqual('', stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
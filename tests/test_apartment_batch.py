@@ -0,0 +1,146 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.apartment import Apartment
+from core.apartment_batch import ApartmentBatch, BatchFilter, np
+from core.apartment_filter import ApartmentFilter
+from core.utils import BoolPlus
+from core.wohnungssucher_base import WohnungssucherBase
+
+default_keys = ['zip', 'place', 'rent_cold', 'rent_warm', 'room', 'apartment_size', 'floor',
+                'energy_efficiency_class', 'year_of_construction', 'exchange_apartment']
+
+
+class Requirements:
+    """
+    Requirements normalized by WohnungssucherBase.set_configurations without creating a platform
+    """
+    def __init__(self, config: dict):
+        WohnungssucherBase.set_configurations(self, config)
+
+    def check_apartment(self, apartment: Apartment, defaults: dict) -> bool:
+        return WohnungssucherBase._check_apartment(self, apartment, defaults)
+
+
+def create_config(rng: random.Random) -> dict:
+    return {
+        'zips_included': rng.choice([None, [80331, 80333], [80331, 80333, 80335]]),
+        'zips_excluded': rng.choice([None, [], [80333]]),
+        'places_included': rng.choice([None, ['München'], ['München', 'Augsburg']]),
+        'places_excluded': rng.choice([None, [], ['Augsburg']]),
+        'rent_cold_min': rng.choice([None, 400, 500]),
+        'rent_cold_max': rng.choice([None, 900, 1300]),
+        'rent_warm_min': rng.choice([None, 600]),
+        'rent_warm_max': rng.choice([None, 1500]),
+        'rooms_min': rng.choice([None, 2, 2.5]),
+        'rooms_max': rng.choice([None, 4]),
+        'apartment_size_min': rng.choice([None, 50]),
+        'apartment_size_max': rng.choice([None, 90.5]),
+        'floors': rng.choice([None, [0, 1], [2, 3, 4]]),
+        'energy_efficiency_classes': rng.choice([None, ['A+', 'A', 'B']]),
+        'year_of_construction_min': rng.choice([None, 1950]),
+        'year_of_construction_max': rng.choice([None, 2000]),
+        'exchange_apartment': rng.choice([None, BoolPlus.true(), BoolPlus.false(), BoolPlus.maybe()]),
+        'max_apartment_age': None,
+        'email_from_address': '',
+        'email_to_address': None,
+        'notify_on_new_apartments_only': True,
+        'notify_on_price_drop': False
+    }
+
+
+def create_apartment(rng: random.Random, i: int) -> Apartment:
+    def maybe(value):
+        return None if rng.random() < 0.2 else value
+
+    return Apartment(
+        id=i,
+        description='Wohnung',
+        url=f'https://www.example.com/{i}',
+        zip=maybe(rng.choice([80331, 80333, 80335, 86150])),
+        place=maybe(rng.choice(['München', 'Augsburg', 'Nürnberg'])),
+        street=None,
+        house_number=None,
+        rent_cold=maybe(rng.choice([399, 400, 500, 900, 901, 1300, 1500])),
+        rent_warm=maybe(rng.choice([500, 600, 1500, 1501])),
+        rooms=maybe(rng.choice([1.0, 2.0, 2.5, 4.0, 4.5])),
+        apartment_size=maybe(rng.choice([30.0, 50.0, 90.5, 90.51])),
+        floor=maybe(rng.choice([-1, 0, 1, 3, 7])),
+        year_of_construction=maybe(rng.choice([1900, 1950, 2000, 2001])),
+        heating_type=None,
+        energy_efficiency_class=maybe(rng.choice(['A+', 'A', 'C', 'H'])),
+        exchange_apartment=maybe(rng.choice([True, False])),
+        released=0.0
+    )
+
+
+def get_expected_category(requirements: Requirements, apartment: Apartment, defaults_0: dict,
+                          defaults_1: dict) -> int:
+    if requirements.check_apartment(apartment, defaults_0):
+        return 0
+    if requirements.check_apartment(apartment, defaults_1):
+        return 1
+    return -1
+
+
+class TestApartmentFilter(unittest.TestCase):
+
+    def test_categorize_matches_check_apartment(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            requirements = Requirements(create_config(rng))
+            defaults_0 = {x: rng.choice([True, False]) for x in default_keys}
+            defaults_1 = {x: rng.choice([True, False]) for x in default_keys}
+            apartment_filter = ApartmentFilter(requirements, defaults_0, defaults_1, reorder=rng.choice([True, False]))
+
+            for i in range(300):
+                apartment = create_apartment(rng, i)
+                category = apartment_filter.categorize(apartment)
+                expected = get_expected_category(requirements, apartment, defaults_0, defaults_1)
+                self.assertEqual(expected, -1 if category is None else category)
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class TestBatchFilter(unittest.TestCase):
+
+    def test_categorize_matches_check_apartment(self):
+        rng = random.Random(1)
+        for _ in range(200):
+            requirements = Requirements(create_config(rng))
+            defaults_0 = {x: rng.choice([True, False]) for x in default_keys}
+            defaults_1 = {x: rng.choice([True, False]) for x in default_keys}
+            apartments = [create_apartment(rng, i) for i in range(300)]
+
+            categories = BatchFilter(requirements, defaults_0, defaults_1).categorize(
+                ApartmentBatch.from_apartments(apartments)
+            )
+            expected = [get_expected_category(requirements, x, defaults_0, defaults_1) for x in apartments]
+            self.assertEqual(expected, categories.tolist())
+
+    def test_filter_matches_check_apartment(self):
+        rng = random.Random(2)
+        for _ in range(100):
+            requirements = Requirements(create_config(rng))
+            defaults_0 = {x: rng.choice([True, False]) for x in default_keys}
+            defaults_1 = {x: rng.choice([True, False]) for x in default_keys}
+            apartments = [create_apartment(rng, i) for i in range(300)]
+            batch = ApartmentBatch.from_apartments(apartments)
+            batch_filter = BatchFilter(requirements, defaults_0, defaults_1)
+
+            for index, defaults in enumerate([defaults_0, defaults_1]):
+                expected = [x.id for x in apartments if requirements.check_apartment(x, defaults)]
+                self.assertEqual(expected, batch_filter.filter(batch, index))
+
+    def test_empty_batch(self):
+        requirements = Requirements(create_config(random.Random(3)))
+        defaults = {x: False for x in default_keys}
+        batch = ApartmentBatch([])
+        self.assertEqual(0, len(BatchFilter(requirements, defaults, defaults).categorize(batch)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.apartment import Apartment
+from core.apartment_codec import (
+    decode_apartments, decode_records, encode_apartments, encode_records, find_first_released, is_sorted
+)
+
+
+def create_apartment(rng: random.Random, i: int) -> Apartment:
+    def maybe(value):
+        return None if rng.random() < 0.3 else value
+
+    return Apartment(
+        id=rng.choice([i, f'id-{i}', -i]),
+        description=maybe(rng.choice(['Wohnung', 'Schöne 3-Zimmer-Wohnung 🏠', ''])),
+        url=f'https://www.example.com/{i}',
+        zip=maybe(rng.choice([1067, 80331, 86150])),
+        place=maybe(rng.choice(['München', 'Augsburg'])),
+        street=maybe(rng.choice(['Marienplatz', 'Straße des 17. Juni'])),
+        house_number=maybe(rng.randint(1, 200)),
+        rent_cold=maybe(rng.randint(300, 3000)),
+        rent_warm=maybe(rng.randint(400, 3500)),
+        rooms=maybe(rng.choice([1.0, 2.5, 4.0])),
+        apartment_size=maybe(rng.choice([30.0, 61.37, 120.5])),
+        floor=maybe(rng.randint(-1, 12)),
+        year_of_construction=maybe(rng.randint(1850, 2025)),
+        heating_type=maybe(rng.choice(['Gas', 'Fernwärme'])),
+        energy_efficiency_class=maybe(rng.choice(['A+', 'B', 'H'])),
+        exchange_apartment=maybe(rng.choice([True, False])),
+        released=rng.choice([0.0, 1700000000.0, 1700086400.5])
+    )
+
+
+class TestApartmentCodec(unittest.TestCase):
+
+    def test_round_trip(self):
+        rng = random.Random(0)
+        apartments = [create_apartment(rng, i) for i in range(500)]
+        decoded = decode_apartments(encode_apartments(apartments))
+        self.assertEqual([x.to_dict() for x in apartments], [x.to_dict() for x in decoded])
+
+    def test_types_preserved(self):
+        rng = random.Random(1)
+        apartments = [create_apartment(rng, i) for i in range(100)]
+        for apt, decoded in zip(apartments, decode_apartments(encode_apartments(apartments))):
+            for name in Apartment.__slots__:
+                self.assertIs(type(getattr(apt, name)), type(getattr(decoded, name)), name)
+
+    def test_strings_shared(self):
+        rng = random.Random(2)
+        decoded = decode_apartments(encode_apartments([create_apartment(rng, i) for i in range(50)]))
+        places = {id(x.place) for x in decoded if x.place == 'München'}
+        self.assertEqual(1, len(places))
+
+    def test_decode_records(self):
+        rng = random.Random(3)
+        apartments = [create_apartment(rng, i) for i in range(100)]
+        data = encode_apartments(apartments)
+
+        names = ['released', 'id', 'place', 'exchange_apartment']
+        expected = [tuple(getattr(x, name) for name in names) for x in apartments]
+        self.assertEqual(expected, decode_records(data, 0, names))
+        self.assertEqual(expected[40:], decode_records(data, 40, names))
+        self.assertEqual(data, encode_records(decode_records(data)))
+
+    def test_find_first_released(self):
+        rng = random.Random(5)
+        apartments = sorted((create_apartment(rng, i) for i in range(100)), key=lambda x: x.released)
+        data = encode_apartments(apartments)
+        self.assertTrue(is_sorted(data))
+        for timestamp in [-1.0, 0.0, 1.0, 1700000000.0, 1700086400.5, 1800000000.0]:
+            expected = sum(1 for x in apartments if x.released < timestamp)
+            self.assertEqual(expected, find_first_released(data, timestamp))
+
+    def test_unsorted(self):
+        rng = random.Random(6)
+        apartments = [create_apartment(rng, i) for i in range(100)]
+        apartments.sort(key=lambda x: -x.released)
+        data = encode_apartments(apartments)
+        self.assertFalse(is_sorted(data))
+        self.assertEqual(data[:4], b'WSA1')
+        with self.assertRaises(ValueError):
+            find_first_released(data, 1.0)
+        self.assertEqual([x.to_dict() for x in apartments], [x.to_dict() for x in decode_apartments(data)])
+
+    def test_empty(self):
+        self.assertEqual([], decode_apartments(encode_apartments([])))
+        self.assertEqual([], decode_apartments(b''))
+
+    def test_invalid_data(self):
+        with self.assertRaises(ValueError):
+            decode_apartments(b'[{"id": 1, "url": "x"}]')
+
+    def test_invalid_id(self):
+        apartment = create_apartment(random.Random(4), 1)
+        apartment.id = 1.5
+        with self.assertRaises(TypeError):
+            encode_apartments([apartment])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import apartment_filter
+from core.apartment_filter import ApartmentFilter
+from core.utils import BoolPlus
+from tests.test_apartment_batch import Requirements, create_apartment, create_config, default_keys
+
+
+class TestApartmentFilter(unittest.TestCase):
+
+    def assertEquivalent(self, config: dict, defaults_0: dict, defaults_1: dict, apartments: list):
+        requirements = Requirements(config)
+        for reorder in (False, True):
+            filter_apartments = ApartmentFilter(requirements, defaults_0, defaults_1, reorder=reorder)
+            for apartment in apartments:
+                if requirements.check_apartment(apartment, defaults_0):
+                    expected = 0
+                elif requirements.check_apartment(apartment, defaults_1):
+                    expected = 1
+                else:
+                    expected = None
+                self.assertEqual(expected, filter_apartments.categorize(apartment), apartment.to_dict())
+
+    def test_boundaries(self):
+        rng = random.Random(0)
+        config = create_config(rng)
+        config.update({'rent_cold_min': 400, 'rent_cold_max': 900, 'rooms_min': 2.5, 'rooms_max': 4,
+                       'apartment_size_min': 50, 'apartment_size_max': 90.5})
+        defaults = {x: True for x in default_keys}
+        apartments = []
+        for rent_cold in (399, 400, 900, 901):
+            for rooms in (2.0, 2.5, 4.0, 4.5):
+                apartment = create_apartment(rng, len(apartments))
+                apartment.rent_cold = rent_cold
+                apartment.rooms = rooms
+                apartments.append(apartment)
+        self.assertEquivalent(config, defaults, defaults, apartments)
+
+    def test_missing_values(self):
+        rng = random.Random(1)
+        apartments = [create_apartment(rng, i) for i in range(200)]
+        for key in default_keys:
+            defaults_0 = {x: True for x in default_keys}
+            defaults_0[key] = False
+            defaults_1 = {x: True for x in default_keys}
+            self.assertEquivalent(create_config(rng), defaults_0, defaults_1, apartments)
+            self.assertEquivalent(create_config(rng), defaults_1, defaults_0, apartments)
+
+    def test_zips_included_and_excluded(self):
+        rng = random.Random(2)
+        config = create_config(rng)
+        config.update({'zips_included': [80331, 80333], 'zips_excluded': [80333]})
+        defaults = {x: rng.choice([True, False]) for x in default_keys}
+        self.assertEquivalent(config, defaults, defaults, [create_apartment(rng, i) for i in range(200)])
+
+    def test_exchange_apartment(self):
+        rng = random.Random(3)
+        apartments = [create_apartment(rng, i) for i in range(100)]
+        for exchange_apartment in (None, BoolPlus.true(), BoolPlus.false(), BoolPlus.maybe()):
+            config = create_config(rng)
+            config['exchange_apartment'] = exchange_apartment
+            defaults = {x: rng.choice([True, False]) for x in default_keys}
+            self.assertEquivalent(config, defaults, defaults, apartments)
+
+    def test_checks_accepting_everything_omitted(self):
+        config = create_config(random.Random(4))
+        config.update({
+            'zips_included': None, 'zips_excluded': None, 'places_included': None, 'places_excluded': [],
+            'floors': None, 'energy_efficiency_classes': None
+        })
+        defaults = {x: True for x in default_keys}
+        attributes = [x.attribute for x in ApartmentFilter(Requirements(config), defaults, defaults).checks]
+        for attribute in ('zip', 'place', 'floor', 'energy_efficiency_class'):
+            self.assertNotIn(attribute, attributes)
+
+    def test_reorder(self):
+        rng = random.Random(5)
+        config = create_config(rng)
+        config.update({
+            'zips_included': [80331, 80333, 80335, 86150], 'zips_excluded': [], 'places_included': None,
+            'places_excluded': [], 'rent_cold_min': 400, 'rent_cold_max': 900
+        })
+        defaults = {x: True for x in default_keys}
+        filter_apartments = ApartmentFilter(Requirements(config), defaults, defaults, reorder=True)
+        self.assertNotEqual('rent_cold', filter_apartments.checks[0].attribute)
+
+        for i in range(apartment_filter.reorder_interval + 1):
+            apartment = create_apartment(rng, i)
+            apartment.rent_cold = 2000
+            self.assertIsNone(filter_apartments.categorize(apartment))
+        self.assertEqual('rent_cold', filter_apartments.checks[0].attribute)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.apartment import Apartment
+from core.apartment_history import ApartmentHistory, get_price_drop
+
+
+def create_apartment(i: int, rent_cold: int | None = 800, rent_warm: int | None = 1000,
+                     description: str = 'Wohnung') -> Apartment:
+    return Apartment(
+        id=i,
+        description=description,
+        url=f'https://www.example.com/{i}',
+        zip=80331,
+        place='München',
+        street='Marienplatz',
+        house_number=1,
+        rent_cold=rent_cold,
+        rent_warm=rent_warm,
+        rooms=2.0,
+        apartment_size=60.0,
+        floor=1,
+        year_of_construction=None,
+        heating_type=None,
+        energy_efficiency_class=None,
+        exchange_apartment=False,
+        released=0
+    )
+
+
+class TestApartmentHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, 'test_history.jsonl')
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def read_snapshots(self) -> list[dict]:
+        with open(self.path, 'r') as file:
+            return [json.loads(x) for x in file]
+
+    def test_delta_snapshots(self):
+        history = ApartmentHistory(self.path)
+        self.assertIsNone(history.update(create_apartment(1)))
+        self.assertEqual({}, history.update(create_apartment(1)))
+        self.assertEqual({'rent_cold': (800, 750)}, history.update(create_apartment(1, rent_cold=750)))
+        history.save()
+
+        snapshots = self.read_snapshots()
+        self.assertEqual(2, len(snapshots))
+        self.assertEqual('Wohnung', snapshots[0]['changes']['description'])
+        self.assertEqual({'rent_cold': 750}, snapshots[1]['changes'])
+        self.assertEqual(snapshots, ApartmentHistory(self.path).get_snapshots(1))
+
+    def test_load_reconstructs_state(self):
+        history = ApartmentHistory(self.path)
+        history.update(create_apartment(1))
+        history.update(create_apartment(1, rent_cold=750, description='Neu'))
+        history.update(create_apartment(2))
+        history.save()
+
+        history = ApartmentHistory(self.path)
+        self.assertEqual(750, history.load()[1]['rent_cold'])
+        self.assertEqual('Neu', history.load()[1]['description'])
+        changes = history.update(create_apartment(1, rent_cold=700, description='Neu'))
+        self.assertEqual({'rent_cold': (750, 700)}, changes)
+
+    def test_retain(self):
+        history = ApartmentHistory(self.path)
+        for i in range(3):
+            history.update(create_apartment(i))
+        history.retain([0, 2])
+
+        self.assertEqual([0, 2], [x['id'] for x in self.read_snapshots()])
+        self.assertEqual([0, 2], sorted(ApartmentHistory(self.path).load()))
+        self.assertIsNone(history.update(create_apartment(1)))
+
+
+class TestGetPriceDrop(unittest.TestCase):
+
+    def test_price_drop(self):
+        self.assertEqual(
+            {'rent_cold': (800, 750), 'rent_warm': (1000, 990)},
+            get_price_drop({'rent_cold': (800, 750), 'rent_warm': (1000, 990), 'description': ('a', 'b')})
+        )
+
+    def test_no_price_drop(self):
+        self.assertEqual({}, get_price_drop({}))
+        self.assertEqual({}, get_price_drop({'rent_cold': (800, 850)}))
+        self.assertEqual({}, get_price_drop({'rooms': (3.0, 2.0), 'apartment_size': (60.0, 50.0)}))
+
+    def test_missing_prices(self):
+        # prices that are added or removed are not reported
+        self.assertEqual({}, get_price_drop({'rent_cold': (None, 750), 'rent_warm': (1000, None)}))
+
+    def test_history_price_drop(self):
+        with tempfile.TemporaryDirectory() as path_dir:
+            history = ApartmentHistory(os.path.join(path_dir, 'history.jsonl'))
+            history.update(create_apartment(1))
+            changes = history.update(create_apartment(1, rent_cold=700, rent_warm=1100))
+            self.assertEqual({'rent_cold': (800, 700)}, get_price_drop(changes))
+
+
+if __name__ == '__main__':
+    unittest.main()
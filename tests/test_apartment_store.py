@@ -0,0 +1,295 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.apartment import Apartment
+from core.apartment_codec import encode_apartments, is_sorted
+from core.apartment_store import (
+    BinaryApartmentStore, JsonApartmentStore, JsonlApartmentStore, SqliteApartmentStore
+)
+
+day = 86400
+
+
+def create_apartment(i: int, released: float, rent_cold: int | None = 800) -> Apartment:
+    return Apartment(
+        id=i,
+        description=f'Wohnung {i}',
+        url=f'https://www.example.com/{i}',
+        zip=80331,
+        place='München',
+        street='Marienplatz',
+        house_number=i,
+        rent_cold=rent_cold,
+        rent_warm=None,
+        rooms=2.5,
+        apartment_size=60.5,
+        floor=1,
+        year_of_construction=1990,
+        heating_type='Gas',
+        energy_efficiency_class='B',
+        exchange_apartment=i % 2 == 0,
+        released=released
+    )
+
+
+def save_apartments_json(filename: str, apartments: list[Apartment]):
+    """
+    Creates a json savefile like the versions before the storage backends were introduced
+    """
+    with open(filename, 'w') as file:
+        json.dump([x.to_dict() for x in apartments], file)
+
+
+class StoreTests:
+    """
+    Tests shared by all storage backends, each backend is tested by a subclass implementing create_store
+    """
+    path_dir: str
+    path_savefiles: tuple[str, str]
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path_dir = self.tempdir.name
+        self.path_savefiles = (os.path.join(self.path_dir, 'test_0.json'), os.path.join(self.path_dir, 'test_1.json'))
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        self.tempdir.cleanup()
+
+    def create_store(self):
+        raise NotImplementedError
+
+    def open_store(self):
+        store = self.create_store()
+        self.stores.append(store)
+        return store
+
+    def assertApartments(self, expected: list[Apartment], apartments: list[Apartment]):
+        self.assertEqual(
+            sorted((x.to_dict() for x in expected), key=lambda x: x['id']),
+            sorted((x.to_dict() for x in apartments), key=lambda x: x['id'])
+        )
+
+    def test_add_and_load(self):
+        apartments = [create_apartment(i, 10 * day - i * day) for i in range(5)]
+        store = self.open_store()
+        store.add_apartments(0, apartments)
+        store.add_apartments(1, [create_apartment(10, day)])
+
+        self.assertApartments(apartments, store.load_apartments(0))
+        self.assertApartments([create_apartment(10, day)], store.load_apartments(1))
+        self.assertApartments(apartments, self.open_store().load_apartments(0))
+
+    def test_add_replaces_stored_apartment(self):
+        store = self.open_store()
+        store.add_apartments(0, [create_apartment(1, day), create_apartment(2, day)])
+        store.add_apartments(0, [create_apartment(1, 3 * day, rent_cold=700)])
+
+        expected = [create_apartment(1, 3 * day, rent_cold=700), create_apartment(2, day)]
+        self.assertApartments(expected, store.load_apartments(0))
+        # the release date is replaced as well, hence the apartment is kept by the next removal
+        store.remove_apartments_released_before(2 * day)
+        self.assertApartments(expected[:1], self.open_store().load_apartments(0))
+
+    def test_load_apartments_released_since(self):
+        apartments = [create_apartment(i, (i * 7 % 10) * day) for i in range(10)]
+        store = self.open_store()
+        store.add_apartments(0, apartments)
+
+        loaded = store.load_apartments_released_since(0, 5 * day)
+        self.assertEqual([x.released for x in loaded], sorted(x.released for x in loaded))
+        self.assertApartments([x for x in apartments if x.released >= 5 * day], loaded)
+
+    def test_remove_apartments_released_before(self):
+        store = self.open_store()
+        store.add_apartments(0, [create_apartment(i, i * day) for i in range(4)])
+        store.add_apartments(1, [create_apartment(10, 3 * day)])
+
+        self.assertTrue(store.remove_apartments_released_before(2 * day))
+        self.assertFalse(store.remove_apartments_released_before(2 * day))
+        self.assertApartments([create_apartment(2, 2 * day), create_apartment(3, 3 * day)], store.load_apartments(0))
+        self.assertApartments([create_apartment(10, 3 * day)], store.load_apartments(1))
+
+    def test_iter_fields(self):
+        apartments = [create_apartment(i, (i * 7 % 10) * day) for i in range(10)]
+        store = self.open_store()
+        store.add_apartments(0, apartments)
+
+        fields = ['released', 'id', 'exchange_apartment', 'place']
+        expected = [tuple(getattr(x, name) for name in fields) for x in apartments]
+        self.assertEqual(sorted(expected), sorted(store.iter_fields(0, fields)))
+        self.assertEqual(
+            sorted(x for x in expected if x[0] >= 5 * day), sorted(store.iter_fields(0, fields, 5 * day))
+        )
+        self.assertEqual([], list(store.iter_fields(1, fields)))
+
+    def test_iter_fields_replaced_apartment(self):
+        store = self.open_store()
+        store.add_apartments(0, [create_apartment(1, day), create_apartment(2, day)])
+        store.add_apartments(0, [create_apartment(1, 2 * day, rent_cold=700)])
+
+        expected = [(1, 700, 2 * day), (2, 800, day)]
+        self.assertEqual(expected, sorted(store.iter_fields(0, ['id', 'rent_cold', 'released'])))
+        self.assertEqual(expected[:1], list(store.iter_fields(0, ['id', 'rent_cold', 'released'], 2 * day)))
+
+    def test_iter_dicts(self):
+        apartments = [create_apartment(i, i * day) for i in range(3)]
+        store = self.open_store()
+        store.add_apartments(0, apartments)
+        self.assertEqual([x.to_dict() for x in apartments], sorted(store.iter_dicts(0), key=lambda x: x['id']))
+        self.assertEqual([{'id': 2, 'zip': 80331}], list(store.iter_dicts(0, ['id', 'zip'], 2 * day)))
+
+    def test_iter_ids(self):
+        store = self.open_store()
+        store.add_apartments(0, [create_apartment(i, day) for i in range(3)])
+        store.add_apartments(1, [create_apartment(10, day)])
+        self.assertEqual({0, 1, 2, 10}, set(store.iter_ids()))
+
+
+class MigrationTests:
+    """
+    Tests of the backends importing existing json savefiles
+    """
+
+    def test_migrate_json(self):
+        apartments = [create_apartment(i, 10 * day - i * day) for i in range(5)]
+        save_apartments_json(self.path_savefiles[0], apartments)
+
+        store = self.open_store()
+        self.assertApartments(apartments, store.load_apartments(0))
+        self.assertEqual([], store.load_apartments(1))
+        self.assertFalse(os.path.exists(self.path_savefiles[0]))
+        self.assertTrue(os.path.exists(f'{self.path_savefiles[0]}.migrated'))
+
+        # the savefile is only imported once
+        self.assertApartments(apartments, self.open_store().load_apartments(0))
+
+
+class TestJsonApartmentStore(StoreTests, unittest.TestCase):
+
+    def create_store(self):
+        return JsonApartmentStore(*self.path_savefiles)
+
+    def test_unsorted_savefile(self):
+        # savefiles of older versions are in the order the apartments were found
+        apartments = [create_apartment(i, (i * 7 % 10) * day) for i in range(10)]
+        save_apartments_json(self.path_savefiles[0], apartments)
+
+        store = self.open_store()
+        self.assertEqual([5, 6, 7, 8, 9], [x[0] // day for x in store.iter_fields(0, ['released'], 5 * day)])
+        self.assertApartments(
+            [x for x in apartments if x.released >= 5 * day], store.load_apartments_released_since(0, 5 * day)
+        )
+
+
+class TestSqliteApartmentStore(StoreTests, MigrationTests, unittest.TestCase):
+
+    def create_store(self):
+        return SqliteApartmentStore(os.path.join(self.path_dir, 'apartments.sqlite3'), *self.path_savefiles)
+
+
+class TestJsonlApartmentStore(StoreTests, MigrationTests, unittest.TestCase):
+
+    def create_store(self):
+        return JsonlApartmentStore(*self.path_savefiles, compaction_threshold=0.5)
+
+    def get_segment_starts(self, store: JsonlApartmentStore) -> list[int]:
+        return [start for start, _ in store._get_segments(0)]
+
+    def count_records(self, store: JsonlApartmentStore) -> int:
+        num_records = 0
+        for _, path in store._get_segments(0):
+            with open(path, 'r') as file:
+                num_records += len(file.readlines())
+        return num_records
+
+    def test_segments(self):
+        store = self.open_store()
+        store.add_apartments(0, [create_apartment(i, i * day) for i in range(15)])
+        self.assertEqual([0, 7 * day, 14 * day], self.get_segment_starts(store))
+
+        # whole segments older than the timestamp are deleted, the watermark hides older records of the others
+        self.assertTrue(store.remove_apartments_released_before(9 * day))
+        self.assertEqual([7 * day, 14 * day], self.get_segment_starts(store))
+        self.assertEqual(list(range(9, 15)), sorted(store.iter_ids()))
+        self.assertEqual(list(range(9, 15)), sorted(self.open_store().iter_ids()))
+
+    def test_replaced_in_later_segment(self):
+        store = self.open_store()
+        store.add_apartments(0, [create_apartment(i, (10 - i) * day) for i in range(10)])
+        store.add_apartments(0, [create_apartment(9, 15 * day, rent_cold=700)])
+        store.add_apartments(0, [create_apartment(3, 15 * day, rent_cold=700)])
+        store.add_apartments(0, [create_apartment(3, 16 * day, rent_cold=600)])
+
+        # the latest record of each apartment is returned, sorted by release date across all segments
+        loaded = store.load_apartments(0)
+        self.assertEqual([8, 7, 6, 5, 4, 2, 1, 0, 9, 3], [x.id for x in loaded])
+        self.assertEqual([700, 600], [x.rent_cold for x in loaded[-2:]])
+        self.assertEqual({(9, 700), (3, 600)}, set(store.iter_fields(0, ['id', 'rent_cold'], 14 * day)))
+        self.assertEqual(10, len(list(store.iter_fields(0, ['id']))))
+
+    def test_compaction(self):
+        store = self.open_store()
+        store.add_apartments(0, [create_apartment(i, day) for i in range(4)])
+        store.add_apartments(0, [create_apartment(i, 2 * day, rent_cold=700) for i in range(4)])
+        store.add_apartments(0, [create_apartment(4, day / 2)])
+        self.assertEqual(9, self.count_records(store))
+
+        # 5 of 9 records are dead afterward: 4 replaced records and 1 removed record
+        store.remove_apartments_released_before(day)
+        store.close()
+        self.assertEqual(4, self.count_records(store))
+        expected = [create_apartment(i, 2 * day, rent_cold=700) for i in range(4)]
+        self.assertApartments(expected, store.load_apartments(0))
+
+    def test_no_compaction_below_threshold(self):
+        store = self.open_store()
+        store.add_apartments(0, [create_apartment(i, day) for i in range(4)])
+        store.add_apartments(0, [create_apartment(4, day / 2)])
+        store.remove_apartments_released_before(day)
+        store.close()
+        self.assertEqual(5, self.count_records(store))
+        self.assertEqual(list(range(4)), sorted(store.iter_ids()))
+
+    def test_migrate_log(self):
+        # log of older versions without segments
+        path_log = os.path.join(self.path_dir, 'test_0.jsonl')
+        with open(path_log, 'w') as file:
+            for i in range(3):
+                file.write(json.dumps(create_apartment(i, i * 7 * day).to_dict()) + '\n')
+
+        store = self.open_store()
+        self.assertFalse(os.path.exists(path_log))
+        self.assertEqual([0, 7 * day, 14 * day], self.get_segment_starts(store))
+        self.assertApartments([create_apartment(i, i * 7 * day) for i in range(3)], store.load_apartments(0))
+
+
+class TestBinaryApartmentStore(StoreTests, MigrationTests, unittest.TestCase):
+
+    def create_store(self):
+        return BinaryApartmentStore(*self.path_savefiles)
+
+    def test_sort_unsorted_file(self):
+        # files of older versions are not sorted by release date
+        apartments = [create_apartment(i, (i * 7 % 10) * day) for i in range(10)]
+        path = os.path.join(self.path_dir, 'test_0.bin')
+        with open(path, 'wb') as file:
+            file.write(encode_apartments(apartments))
+
+        store = self.open_store()
+        loaded = store.load_apartments_released_since(0, 5 * day)
+        self.assertApartments([x for x in apartments if x.released >= 5 * day], loaded)
+        self.assertEqual([5, 6, 7, 8, 9], [x['released'] // day for x in store.iter_dicts(0, ['released'], 5 * day)])
+        with open(path, 'rb') as file:
+            self.assertTrue(is_sorted(file.read()))
+
+
+if __name__ == '__main__':
+    unittest.main()
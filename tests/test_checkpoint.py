@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import checkpoint
+from core.checkpoint import CrawlJournal, MailOutbox
+
+
+def create_mail(i: int) -> dict:
+    return {'from_addr': 'from@example.com', 'to_addr': 'to@example.com', 'subject': f'Mail {i}', 'msg_html': ''}
+
+
+class TestCrawlJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.journal = CrawlJournal(os.path.join(self.tempdir.name, 'test_journal.jsonl'))
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_add_and_load(self):
+        self.assertEqual({}, self.journal.load())
+        self.journal.add('https://www.example.com/1', {'id': 1})
+        self.journal.add('https://www.example.com/2', {'id': 2})
+        self.assertEqual({'https://www.example.com/1': {'id': 1}, 'https://www.example.com/2': {'id': 2}},
+                         self.journal.load())
+
+    def test_incomplete_line(self):
+        # the run has been aborted while writing the last page
+        self.journal.add('https://www.example.com/1', {'id': 1})
+        with open(self.journal.path, 'a', encoding='utf-8') as file:
+            file.write('{"url": "https://www.example.com/2", "apartm')
+        self.assertEqual({'https://www.example.com/1': {'id': 1}}, self.journal.load())
+
+    def test_remove(self):
+        self.journal.add('https://www.example.com/1', {'id': 1})
+        self.journal.remove()
+        self.assertFalse(os.path.exists(self.journal.path))
+        self.assertEqual({}, self.journal.load())
+        self.journal.remove()
+
+
+class TestMailOutbox(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.outbox = MailOutbox(os.path.join(self.tempdir.name, 'test_outbox.json'))
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_add_and_load(self):
+        self.assertEqual([], self.outbox.load())
+        self.outbox.add(create_mail(1), [[{'id': 1}], []])
+        self.outbox.add(create_mail(2), [[], [{'id': 2}]])
+        self.assertEqual(
+            [{'mail': create_mail(1), 'apartments': [[{'id': 1}], []]},
+             {'mail': create_mail(2), 'apartments': [[], [{'id': 2}]]}],
+            self.outbox.load()
+        )
+        self.assertFalse(os.path.exists(f'{self.outbox.path}.tmp'))
+
+    def test_send(self):
+        for i in range(2):
+            self.outbox.add(create_mail(i), [[], []])
+        with mock.patch.object(checkpoint, 'send_mail') as send_mail:
+            self.assertEqual(2, self.outbox.send())
+        self.assertEqual([mock.call(**create_mail(0)), mock.call(**create_mail(1))], send_mail.call_args_list)
+        self.assertFalse(os.path.exists(self.outbox.path))
+
+        with mock.patch.object(checkpoint, 'send_mail') as send_mail:
+            self.assertEqual(0, self.outbox.send())
+        send_mail.assert_not_called()
+
+    def test_send_fails(self):
+        for i in range(3):
+            self.outbox.add(create_mail(i), [[], []])
+        with mock.patch.object(checkpoint, 'send_mail', side_effect=[None, ConnectionRefusedError]):
+            with self.assertRaises(ConnectionRefusedError):
+                self.outbox.send()
+        # the failed email and all following emails are kept
+        self.assertEqual(['Mail 1', 'Mail 2'], [x['mail']['subject'] for x in self.outbox.load()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import os
+import signal
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import user_configuration
+from core import daemon
+from core.config_loader import load_profiles, reload_configuration
+from core.daemon import Daemon
+from core.platform_registry import PlatformEntry
+
+platforms = [
+    ('stub', PlatformEntry('stub', 'tests.test_profiles', 'StubPlatform')),
+    ('other', PlatformEntry('other', 'tests.test_profiles', 'StubPlatform'))
+]
+
+
+class TestDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def create_settings(self, **settings) -> types.ModuleType:
+        """
+        :return: copy of user_configuration with the given settings as returned by reload_configuration
+        """
+        module = types.ModuleType('user_configuration')
+        vars(module).update({x: y for x, y in vars(user_configuration).items() if not x.startswith('__')})
+        vars(module).update({
+            'path_files': self.tempdir.name,
+            'profiles': None,
+            'platforms_enabled': None,
+            'adaptive_polling': False,
+            'detect_duplicates_across_platforms': False,
+            'email_send_status': False
+        })
+        vars(module).update(settings)
+        return module
+
+    def create_daemon(self, **settings) -> Daemon:
+        daemon_platforms = Daemon(list(platforms))
+        daemon_platforms.profiles = load_profiles(self.create_settings(**settings))
+        return daemon_platforms
+
+    def reload(self, daemon_platforms: Daemon, settings: types.ModuleType) -> mock.Mock:
+        with mock.patch.object(daemon, 'reload_configuration', return_value=settings), \
+                mock.patch.object(daemon, 'apply_configuration') as apply_configuration:
+            daemon_platforms._reload()
+        return apply_configuration
+
+    def test_reload(self):
+        daemon_platforms = self.create_daemon()
+        instances = daemon_platforms.instances
+        settings = self.create_settings(rent_cold_max=700)
+        apply_configuration = self.reload(daemon_platforms, settings)
+
+        apply_configuration.assert_called_once_with(settings)
+        self.assertEqual(700, daemon_platforms.profiles['default']['rent_cold_max'])
+        self.assertIsNot(instances, daemon_platforms.instances)
+        self.assertEqual(platforms, daemon_platforms.platforms)
+
+    def test_reload_invalid_configuration(self):
+        daemon_platforms = self.create_daemon(rent_cold_max=900)
+        profiles = daemon_platforms.profiles
+        settings = self.create_settings(rent_cold_max=700, profiles={'anna': {'rent_max': 700}})
+        apply_configuration = self.reload(daemon_platforms, settings)
+
+        apply_configuration.assert_not_called()
+        self.assertIs(profiles, daemon_platforms.profiles)
+        self.assertEqual(900, daemon_platforms.profiles['default']['rent_cold_max'])
+
+    def test_reload_platforms_enabled(self):
+        daemon_platforms = self.create_daemon()
+        daemon_platforms.next_runs = {'stub': 1.0, 'other': 2.0}
+        with mock.patch.object(daemon, 'get_platforms', return_value=platforms[1:]) as get_platforms:
+            self.reload(daemon_platforms, self.create_settings(platforms_enabled=['other']))
+        get_platforms.assert_called_once_with(daemon_platforms.profiles['default'])
+        self.assertEqual(platforms[1:], daemon_platforms.platforms)
+        self.assertEqual({'other': 2.0}, daemon_platforms.next_runs)
+
+    def test_reload_unknown_platform(self):
+        daemon_platforms = self.create_daemon()
+        apply_configuration = self.reload(daemon_platforms, self.create_settings(platforms_enabled=['unknown']))
+        apply_configuration.assert_not_called()
+        self.assertEqual(platforms, daemon_platforms.platforms)
+        self.assertIsNone(daemon_platforms.profiles['default']['platforms_enabled'])
+
+    def test_reload_platform_not_loadable(self):
+        daemon_platforms = self.create_daemon()
+        entry = PlatformEntry('unknown', 'wohnungssucher_platforms.ws_unknown', 'WSUnknown')
+        with mock.patch.object(daemon, 'get_platforms', return_value=[('unknown', entry)]):
+            apply_configuration = self.reload(daemon_platforms, self.create_settings(platforms_enabled=['unknown']))
+        apply_configuration.assert_not_called()
+        self.assertEqual(platforms, daemon_platforms.platforms)
+
+    def test_reload_configuration_not_applied(self):
+        settings = reload_configuration()
+        self.assertIsNot(user_configuration, settings)
+        self.assertIs(user_configuration, sys.modules['user_configuration'])
+        self.assertEqual(user_configuration.rent_cold_max, settings.rent_cold_max)
+
+    def test_no_platforms(self):
+        signals = [signal.SIGTERM, signal.SIGINT] + ([signal.SIGHUP] if hasattr(signal, 'SIGHUP') else [])
+        handlers = {x: signal.getsignal(x) for x in signals}
+        self.addCleanup(lambda: [signal.signal(x, y) for x, y in handlers.items()])
+        with self.assertRaisesRegex(ValueError, 'No platform enabled'):
+            Daemon([]).run()
+
+    @unittest.skipUnless(hasattr(signal, 'SIGHUP'), 'SIGHUP is not available')
+    def test_signals(self):
+        handlers = {x: signal.getsignal(x) for x in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP)}
+        self.addCleanup(lambda: [signal.signal(x, y) for x, y in handlers.items()])
+
+        settings = self.create_settings(platform_intervals={'stub': 0, 'other': 0})
+        settings_reloaded = self.create_settings(platform_intervals={'stub': 0, 'other': 0}, rent_cold_max=700)
+        runs = []
+
+        def run_platforms(platforms_due, profiles, duplicate_matchers, instances):
+            runs.append((list(dict(platforms_due)), profiles['default']['rent_cold_max']))
+            # the first run requests a reload, the second one stops the daemon
+            os.kill(os.getpid(), signal.SIGHUP if len(runs) == 1 else signal.SIGTERM)
+            return []
+
+        profiles = [load_profiles(settings), load_profiles(settings_reloaded)]
+        with mock.patch.object(daemon, 'load_profiles', side_effect=profiles), \
+                mock.patch.object(daemon, 'run_platforms', side_effect=run_platforms), \
+                mock.patch.object(daemon, 'print_run_summary'), \
+                mock.patch.object(daemon, 'reload_configuration', return_value=settings_reloaded), \
+                mock.patch.object(daemon, 'apply_configuration') as apply_configuration:
+            Daemon(list(platforms)).run()
+
+        apply_configuration.assert_called_once_with(settings_reloaded)
+        self.assertEqual(2, len(runs))
+        self.assertEqual(['stub', 'other'], runs[0][0])
+        self.assertEqual([settings.rent_cold_max, 700], [x[1] for x in runs])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.apartment import Apartment
+from core.apartment_store import JsonApartmentStore
+from core.duplicate_matcher import DuplicateMatcher
+from core.platform_runner import create_duplicate_matchers
+
+
+def create_apartment(
+        i: int,
+        street: str | None = 'Marienplatz',
+        house_number: int | None = 1,
+        rooms: float | None = 2.0,
+        apartment_size: float | None = 60.0,
+        rent_cold: int | None = 800,
+        zip: int | None = 80331
+) -> Apartment:
+    return Apartment(
+        id=i,
+        description='Wohnung',
+        url=f'https://www.example.com/{i}',
+        zip=zip,
+        place='München',
+        street=street,
+        house_number=house_number,
+        rent_cold=rent_cold,
+        rent_warm=None,
+        rooms=rooms,
+        apartment_size=apartment_size,
+        floor=None,
+        year_of_construction=None,
+        heating_type=None,
+        energy_efficiency_class=None,
+        exchange_apartment=None,
+        released=0
+    )
+
+
+class TestDuplicateMatcher(unittest.TestCase):
+
+    def assertDuplicate(self, is_duplicate: bool, apartment: Apartment, other: Apartment):
+        matcher = DuplicateMatcher()
+        matcher.add('a', [other.to_dict()])
+        duplicates = matcher.find_and_add('b', apartment)
+        self.assertEqual([other.url] if is_duplicate else [], [x['url'] for x in duplicates])
+
+    def test_same_apartment(self):
+        self.assertDuplicate(True, create_apartment(1), create_apartment(2))
+
+    def test_tolerances(self):
+        # neighbouring blocks are searched as well
+        self.assertDuplicate(True, create_apartment(1), create_apartment(2, apartment_size=60.9, rent_cold=809))
+        self.assertDuplicate(True, create_apartment(1), create_apartment(2, apartment_size=59.1, rent_cold=791))
+        self.assertDuplicate(False, create_apartment(1), create_apartment(2, apartment_size=61.1))
+        self.assertDuplicate(False, create_apartment(1), create_apartment(2, rent_cold=811))
+        self.assertDuplicate(False, create_apartment(1), create_apartment(2, zip=80333))
+
+    def test_address(self):
+        self.assertDuplicate(True, create_apartment(1, 'Hauptstraße'), create_apartment(2, 'Hauptstr.'))
+        self.assertDuplicate(True, create_apartment(1, 'Haupt-Strasse'), create_apartment(2, 'hauptstr'))
+        self.assertDuplicate(False, create_apartment(1, 'Hauptstraße'), create_apartment(2, 'Nebenstraße'))
+        self.assertDuplicate(False, create_apartment(1), create_apartment(2, house_number=2))
+        self.assertDuplicate(True, create_apartment(1), create_apartment(2, house_number=None))
+        self.assertDuplicate(False, create_apartment(1), create_apartment(2, rooms=3.0))
+        self.assertDuplicate(True, create_apartment(1), create_apartment(2, rooms=None))
+
+    def test_without_address(self):
+        # only exact matches are duplicates
+        self.assertDuplicate(True, create_apartment(1, None), create_apartment(2))
+        self.assertDuplicate(False, create_apartment(1, None), create_apartment(2, apartment_size=60.5))
+        self.assertDuplicate(False, create_apartment(1, None, rooms=None), create_apartment(2))
+
+    def test_missing_values(self):
+        self.assertDuplicate(False, create_apartment(1, zip=None), create_apartment(2, zip=None))
+        self.assertDuplicate(False, create_apartment(1, rent_cold=None), create_apartment(2, rent_cold=None))
+
+    def test_same_platform(self):
+        matcher = DuplicateMatcher()
+        matcher.add('a', [create_apartment(1).to_dict()])
+        self.assertEqual([], matcher.find_and_add('a', create_apartment(2)))
+
+    def test_find_and_add(self):
+        matcher = DuplicateMatcher()
+        self.assertEqual([], matcher.find_and_add('a', create_apartment(1)))
+        self.assertEqual(['a'], [x['platform'] for x in matcher.find_and_add('b', create_apartment(2))])
+        self.assertEqual(['a', 'b'], sorted(x['platform'] for x in matcher.find_and_add('c', create_apartment(3))))
+
+
+class Platform:
+    """
+    Platform providing only the stored apartments
+    """
+    num_created = 0
+
+    def __init__(self, config: dict, name: str):
+        Platform.num_created += 1
+        self.platform_name = name
+        self.apartment_store = JsonApartmentStore(
+            os.path.join(config['path_files'], f'{name}_0.json'), os.path.join(config['path_files'], f'{name}_1.json')
+        )
+
+
+class PlatformA(Platform):
+    def __init__(self, config: dict):
+        super().__init__(config, 'a')
+
+
+class PlatformB(Platform):
+    def __init__(self, config: dict):
+        super().__init__(config, 'b')
+
+
+class TestCreateDuplicateMatchers(unittest.TestCase):
+
+    def test_instances_reused(self):
+        with tempfile.TemporaryDirectory() as path_files:
+            JsonApartmentStore(os.path.join(path_files, 'a_0.json'), os.path.join(path_files, 'a_1.json')) \
+                .add_apartments(0, [create_apartment(1)])
+            profiles = {
+                'x': {'path_files': path_files, 'detect_duplicates_across_platforms': True},
+                'y': {'path_files': path_files, 'detect_duplicates_across_platforms': False}
+            }
+            platforms = [('a', PlatformA), ('b', PlatformB)]
+
+            Platform.num_created = 0
+            instances = {}
+            matchers = create_duplicate_matchers(platforms, profiles, instances)
+            self.assertEqual(['x'], list(matchers))
+            self.assertEqual(2, Platform.num_created)
+            self.assertEqual({'a': ['x'], 'b': ['x']}, {x: list(y) for x, y in instances.items()})
+            self.assertEqual(['a'], [x['platform'] for x in matchers['x'].find_and_add('b', create_apartment(2))])
+
+            # existing instances are not created again
+            create_duplicate_matchers(platforms, profiles, instances)
+            self.assertEqual(2, Platform.num_created)
+
+    def test_single_platform(self):
+        profiles = {'x': {'detect_duplicates_across_platforms': True}}
+        self.assertEqual({}, create_duplicate_matchers([('a', PlatformA)], profiles, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import error_log
+from core.error_log import ErrorLog
+
+day = 86400
+
+
+def create_error(timestamp: float, msg: str = 'Error') -> dict:
+    return {'timestamp': timestamp, 'msg': msg, 'critical': False}
+
+
+class TestErrorLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path_logfile = os.path.join(self.tempdir.name, 'test_log.json')
+        self.now = datetime.now().timestamp()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def get_files(self) -> list[str]:
+        return sorted(os.listdir(self.tempdir.name))
+
+    def load_index(self) -> list[dict]:
+        with open(os.path.join(self.tempdir.name, 'test_log.index.json'), 'r') as file:
+            return json.load(file)
+
+    def test_append_and_read(self):
+        log = ErrorLog(self.path_logfile)
+        errors = [create_error(self.now - 2, 'a'), create_error(self.now - 1, 'b')]
+        log.append(errors)
+        log.append([])
+        log.append([create_error(self.now, 'c')])
+
+        self.assertEqual(errors + [create_error(self.now, 'c')], ErrorLog(self.path_logfile).read())
+        self.assertEqual(['test_log.index.json', 'test_log.jsonl'], self.get_files())
+        self.assertEqual([{'file': 'test_log.jsonl', 'first': self.now - 2, 'last': self.now}], self.load_index())
+
+    def test_rotation_by_age(self):
+        log = ErrorLog(self.path_logfile)
+        first = self.now - 8 * day
+        log.append([create_error(first, 'a')])
+        log.append([create_error(self.now, 'b')])
+
+        self.assertEqual(
+            [{'file': f'test_log.{int(first)}.jsonl', 'first': first, 'last': first},
+             {'file': 'test_log.jsonl', 'first': self.now, 'last': self.now}],
+            self.load_index()
+        )
+        self.assertEqual([create_error(first, 'a'), create_error(self.now, 'b')], log.read())
+
+    def test_rotation_by_size(self):
+        log = ErrorLog(self.path_logfile)
+        with mock.patch.object(error_log, 'segment_max_size', 10):
+            log.append([create_error(self.now - 2, 'a')])
+            log.append([create_error(self.now - 1, 'b')])
+            log.append([create_error(self.now, 'c')])
+
+        self.assertEqual(3, len(self.load_index()))
+        self.assertEqual(['a', 'b', 'c'], [x['msg'] for x in log.read()])
+
+    def test_read_since(self):
+        log = ErrorLog(self.path_logfile)
+        log.append([create_error(self.now - 20 * day, 'a'), create_error(self.now - 19 * day, 'b')])
+        log.append([create_error(self.now - 10 * day, 'c')])
+        log.append([create_error(self.now, 'd')])
+        self.assertEqual(3, len(self.load_index()))
+
+        self.assertEqual(['b', 'c', 'd'], [x['msg'] for x in log.read(self.now - 19 * day)])
+        self.assertEqual(['d'], [x['msg'] for x in log.read(self.now)])
+        self.assertEqual([], log.read(self.now + 1))
+
+        # segments ending before the timestamp are not read
+        os.remove(os.path.join(self.tempdir.name, self.load_index()[0]['file']))
+        self.assertEqual(['c', 'd'], [x['msg'] for x in log.read(self.now - 15 * day)])
+
+    def test_errors_kept_without_retention(self):
+        log = ErrorLog(self.path_logfile)
+        log.append([create_error(self.now - 1000 * day, 'a')])
+        log.append([create_error(self.now, 'b')])
+        log.append([create_error(self.now, 'c')])
+        self.assertEqual(['a', 'b', 'c'], [x['msg'] for x in log.read()])
+
+    def test_retention(self):
+        log = ErrorLog(self.path_logfile, retention=30)
+        log.append([create_error(self.now - 40 * day, 'a')])
+        log.append([create_error(self.now - 20 * day, 'b')])
+        log.append([create_error(self.now, 'c')])
+        self.assertEqual(['b', 'c'], [x['msg'] for x in log.read()])
+        self.assertEqual(2, len(self.load_index()))
+
+    def test_migrate_legacy(self):
+        errors = [create_error(self.now - 1, 'b'), create_error(self.now - 2, 'a')]
+        with open(self.path_logfile, 'w') as file:
+            json.dump(errors, file)
+
+        log = ErrorLog(self.path_logfile)
+        self.assertEqual(['a', 'b'], [x['msg'] for x in log.read()])
+        self.assertIn('test_log.json.migrated', self.get_files())
+        log.append([create_error(self.now, 'c')])
+        self.assertEqual(['a', 'b', 'c'], [x['msg'] for x in ErrorLog(self.path_logfile).read()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.known_id_index import KnownIdIndex
+
+
+class TestKnownIdIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, 'test_known_ids.txt')
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_add(self):
+        index = KnownIdIndex(self.path)
+        self.assertFalse(index.exists())
+        index.add([1, 'a-2'])
+        index.add(['a-2', 3])
+        self.assertIn(1, index)
+        self.assertNotIn('1', index)
+        self.assertEqual(3, len(index))
+
+        # known ids are not appended again
+        with open(self.path, 'r') as file:
+            self.assertEqual(['1', '"a-2"', '3'], file.read().split())
+
+        # ids are persisted with their type
+        self.assertEqual({1, 'a-2', 3}, KnownIdIndex(self.path).load())
+
+    def test_reload(self):
+        index = KnownIdIndex(self.path)
+        index.add([1, 2])
+        index_other = KnownIdIndex(self.path)
+        self.assertEqual({1, 2}, index_other.load())
+
+        # ids are only read once
+        index.add([3])
+        self.assertNotIn(3, index_other)
+        self.assertIn(3, KnownIdIndex(self.path))
+
+    def test_rebuild(self):
+        index = KnownIdIndex(self.path)
+        index.add([1, 2, 3])
+        index.rebuild([2, 4])
+        self.assertEqual({2, 4}, index.load())
+        self.assertEqual({2, 4}, KnownIdIndex(self.path).load())
+        self.assertFalse(os.path.exists(f'{self.path}.tmp'))
+
+    def test_rebuild_atomic(self):
+        # an aborted rebuild keeps the previous index
+        index = KnownIdIndex(self.path)
+        index.add([1, 2])
+        with mock.patch('os.replace', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                KnownIdIndex(self.path).rebuild([3])
+        self.assertEqual({1, 2}, KnownIdIndex(self.path).load())
+
+    def test_empty_lines(self):
+        with open(self.path, 'w') as file:
+            file.write('1\n\n2\n')
+        self.assertEqual({1, 2}, KnownIdIndex(self.path).load())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.platform_registry import PlatformEntry, get_platforms, platform_entries
+from tests.test_profiles import StubPlatform, create_config
+
+
+class TestGetPlatforms(unittest.TestCase):
+
+    def test_all_platforms(self):
+        names = [x.name for x in platform_entries]
+        self.assertEqual(names, [x for x, _ in get_platforms()])
+        self.assertEqual(names, [x for x, _ in get_platforms({'platforms_enabled': None})])
+
+    def test_platforms_enabled(self):
+        # the order of the registry is kept
+        names = [x.name for x in platform_entries]
+        platforms = get_platforms({'platforms_enabled': list(reversed(names[:2]))})
+        self.assertEqual(names[:2], [x for x, _ in platforms])
+        self.assertEqual(platform_entries[:2], [x for _, x in platforms])
+        self.assertEqual([], get_platforms({'platforms_enabled': []}))
+
+    def test_unknown_platform(self):
+        with self.assertRaises(ValueError):
+            get_platforms({'platforms_enabled': [platform_entries[0].name, 'unknown']})
+
+
+class TestPlatformEntry(unittest.TestCase):
+
+    def test_entry_point(self):
+        entry = PlatformEntry('stub', 'tests.test_profiles', 'StubPlatform', default_interval=30,
+                              max_parallel_requests=3)
+        self.assertIsNone(entry._cls)
+        self.assertIs(StubPlatform, entry.load())
+        self.assertIs(StubPlatform, entry.load())
+
+        with tempfile.TemporaryDirectory() as path_files:
+            platform = entry(create_config(path_files))
+            self.assertIsInstance(platform, StubPlatform)
+            self.assertEqual(3, platform.max_parallel_requests)
+            platform.apartment_store.close()
+
+    def test_unknown_module(self):
+        entry = PlatformEntry('unknown', 'wohnungssucher_platforms.ws_unknown', 'WSUnknown')
+        with self.assertRaises(ImportError):
+            entry.load()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import platform_runner
+from core.apartment_store import JsonApartmentStore
+from core.platform_runner import run_platforms
+from tests.test_profiles import StubPlatform, create_apartment_raw, create_config, url_platform
+
+
+class FailingStubPlatform(StubPlatform):
+    name = 'failing'
+
+    def request_all_apartments_raw(self):
+        raise RuntimeError('Platform not reachable')
+
+
+class OtherStubPlatform(StubPlatform):
+    name = 'other'
+
+
+class SlowStubPlatform(StubPlatform):
+    """
+    Stub platform recording the number of platforms requested at the same time
+    """
+    name = 'slow'
+    lock = threading.Lock()
+    num_running = 0
+    num_running_max = 0
+
+    def request_all_apartments_raw(self):
+        with self.lock:
+            SlowStubPlatform.num_running += 1
+            SlowStubPlatform.num_running_max = max(SlowStubPlatform.num_running_max, SlowStubPlatform.num_running)
+        time.sleep(0.2)
+        with self.lock:
+            SlowStubPlatform.num_running -= 1
+        yield from super().request_all_apartments_raw()
+
+
+def create_slow_platform(name: str) -> type:
+    return type(f'SlowStubPlatform{name.capitalize()}', (SlowStubPlatform,), {'name': name})
+
+
+class TestRunPlatforms(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        StubPlatform.pages = {f'{url_platform}{i}': create_apartment_raw(i) for i in range(2)}
+        StubPlatform.requested = []
+        SlowStubPlatform.num_running = 0
+        SlowStubPlatform.num_running_max = 0
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def run_platforms(self, platforms: list[tuple[str, type]], **settings) -> tuple[list, mock.Mock]:
+        """
+        :return: runs and the mock of send_error_mail
+        """
+        profiles = {'default': create_config(self.tempdir.name, **settings)}
+        with mock.patch.object(platform_runner, 'send_error_mail') as send_error_mail, \
+                mock.patch('sys.stderr'):
+            return run_platforms(platforms, profiles), send_error_mail
+
+    def load_errors(self, cls: type) -> list[dict]:
+        platform = cls(create_config(self.tempdir.name))
+        errors = platform.load_errors()
+        platform.apartment_store.close()
+        return errors
+
+    def test_failure_isolated(self):
+        runs, send_error_mail = self.run_platforms([('failing', FailingStubPlatform), ('other', OtherStubPlatform)])
+
+        self.assertEqual(['failing', 'other'], [x.name for x in runs])
+        self.assertIn('Platform not reachable', runs[0].error)
+        send_error_mail.assert_called_once()
+        self.assertEqual('FailingStubPlatform', send_error_mail.call_args.args[3])
+
+        # the other platform saves and reports its apartments
+        self.assertIsNone(runs[1].error)
+        self.assertEqual([0, 1], [x.id for x in runs[1].new_apartments_0])
+        store = JsonApartmentStore(os.path.join(self.tempdir.name, 'other_0.json'),
+                                   os.path.join(self.tempdir.name, 'other_1.json'))
+        self.assertEqual([0, 1], sorted(x.id for x in store.load_apartments(0)))
+        self.assertTrue(any('Platform not reachable' in x['msg'] for x in self.load_errors(FailingStubPlatform)))
+
+    def test_max_parallel_platforms(self):
+        platforms = [(x, create_slow_platform(x)) for x in ('a', 'b', 'c')]
+        runs, _ = self.run_platforms(platforms, max_parallel_platforms=1)
+        self.assertEqual([None, None, None], [x.error for x in runs])
+        self.assertEqual(1, SlowStubPlatform.num_running_max)
+
+        SlowStubPlatform.num_running_max = 0
+        self.run_platforms(platforms, max_parallel_platforms=2)
+        self.assertEqual(2, SlowStubPlatform.num_running_max)
+
+    def test_all_platforms_parallel(self):
+        # without limit, all platforms are run at the same time
+        platforms = [(x, create_slow_platform(x)) for x in ('a', 'b', 'c')]
+        self.run_platforms(platforms, max_parallel_platforms=None)
+        self.assertEqual(3, SlowStubPlatform.num_running_max)
+
+    def test_durations(self):
+        runs, _ = self.run_platforms([('slow', SlowStubPlatform), ('failing', FailingStubPlatform)])
+        self.assertGreaterEqual(runs[0].duration, 0.2)
+        self.assertLess(runs[1].duration, runs[0].duration)
+        self.assertGreater(runs[1].duration, 0)
+
+    def test_no_platforms(self):
+        self.assertEqual([], self.run_platforms([])[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,216 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import user_configuration
+from core import platform_runner
+from core.config_loader import load_configuration, load_profiles
+from core.platform_runner import run_platform
+from core.wohnungssucher_base import WohnungssucherBase
+
+url_platform = 'https://www.example.com/'
+
+
+def create_apartment_raw(i: int, rent_cold: int = 800, zip: int = 80331) -> dict:
+    return {
+        'id': i,
+        'description': f'Wohnung {i}',
+        'url': f'{url_platform}{i}',
+        'zip': str(zip),
+        'place': 'München',
+        'street': 'Marienplatz',
+        'house_number': '1',
+        'rent_cold': f'{rent_cold} €',
+        'rent_warm': f'{rent_cold + 200} €',
+        'rooms': '2',
+        'apartment_size': '60 m²',
+        'floor': '1',
+        'year_of_construction': '1990',
+        'heating_type': 'Gas',
+        'energy_efficiency_class': 'B',
+        'exchange_apartment': False
+    }
+
+
+def create_config(path_files: str, **settings) -> dict:
+    config = load_configuration()
+    config.update({
+        'path_files': path_files,
+        'zips_included': None,
+        'zips_excluded': [],
+        'places_included': None,
+        'places_excluded': [],
+        'rent_cold_min': None,
+        'rent_cold_max': None,
+        'rent_warm_min': None,
+        'rent_warm_max': None,
+        'rooms_min': None,
+        'rooms_max': None,
+        'apartment_size_min': None,
+        'apartment_size_max': None,
+        'floors': None,
+        'energy_efficiency_classes': None,
+        'year_of_construction_min': None,
+        'year_of_construction_max': None,
+        'exchange_apartment': None,
+        'max_apartment_age': None,
+        'storage_backend': 'json',
+        'email_to_address': None,
+        'email_send_status': False,
+        'notify_early_batch_size': None,
+        'notify_early_interval': None,
+        'platform_time_budget': None,
+        'detect_duplicates_across_platforms': False
+    })
+    config.update(settings)
+    return config
+
+
+class StubPlatform(WohnungssucherBase):
+    """
+    Platform returning the raw apartments of the class attribute pages instead of requesting a webpage
+    """
+    # raw apartment per url of the apartment page or an exception raised when the page is requested
+    pages: dict[str, dict | Exception] = {}
+
+    # urls of all requested pages
+    requested: list[str] = []
+
+    # name of the platform and prefix of its data files, e.g., stub_0.json
+    name = 'stub'
+
+    def __init__(self, config: dict):
+        path_files = config['path_files']
+        super().__init__(
+            config,
+            {x: False for x in config['defaults_user']},
+            self.name.capitalize(),
+            url_platform,
+            os.path.join(path_files, f'{self.name}_0.json'),
+            os.path.join(path_files, f'{self.name}_1.json'),
+            os.path.join(path_files, f'{self.name}_errors.json'),
+            []
+        )
+
+    def request_apartment(self, url: str) -> dict | None:
+        StubPlatform.requested.append(url)
+        page = self.pages[url]
+        if isinstance(page, Exception):
+            raise page
+        return dict(page)
+
+    def request_all_apartments_raw(self):
+        yield from self.request_apartments(list(self.pages))
+
+    def map_apt_keys(self, apts_raw):
+        return apts_raw
+
+
+class TestLoadProfiles(unittest.TestCase):
+
+    def test_without_profiles(self):
+        with mock.patch.object(user_configuration, 'profiles', None):
+            self.assertEqual({'default': load_configuration()}, load_profiles())
+
+    def test_profiles(self):
+        profiles = {'anna': {'rent_cold_max': 900, 'defaults': {'zip': False}}, 'ben': {'rooms_min': 3}}
+        with mock.patch.object(user_configuration, 'profiles', profiles):
+            loaded = load_profiles()
+
+        self.assertEqual(['anna', 'ben'], list(loaded))
+        self.assertEqual(900, loaded['anna']['rent_cold_max'])
+        self.assertEqual({'zip': False}, loaded['anna']['defaults_user'])
+        self.assertEqual(user_configuration.rooms_min, loaded['anna']['rooms_min'])
+        self.assertEqual(3, loaded['ben']['rooms_min'])
+        self.assertEqual(user_configuration.rent_cold_max, loaded['ben']['rent_cold_max'])
+        self.assertEqual(os.path.join(user_configuration.path_files, 'ben'), loaded['ben']['path_files'])
+
+    def test_unknown_setting(self):
+        with mock.patch.object(user_configuration, 'profiles', {'anna': {'rent_max': 900}}):
+            with self.assertRaises(ValueError):
+                load_profiles()
+
+    def test_setting_of_run(self):
+        with mock.patch.object(user_configuration, 'profiles', {'anna': {'platform_time_budget': 60}}):
+            with self.assertRaises(ValueError):
+                load_profiles()
+
+
+class TestRunPlatform(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.profiles = {
+            'anna': create_config(os.path.join(self.tempdir.name, 'anna'), rent_cold_max=900),
+            'ben': create_config(os.path.join(self.tempdir.name, 'ben'), zips_included=[80333])
+        }
+        StubPlatform.pages = {
+            f'{url_platform}{i}': create_apartment_raw(i, rent_cold, zip)
+            for i, (rent_cold, zip) in enumerate([(800, 80331), (1000, 80333), (850, 80333), (1200, 80331)])
+        }
+        StubPlatform.requested = []
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def get_path_journal(self, profile: str) -> str:
+        return os.path.join(self.tempdir.name, profile, 'stub_0_journal.jsonl')
+
+    def test_routing(self):
+        runs = run_platform('stub', StubPlatform, self.profiles)
+
+        self.assertEqual(['anna', 'ben'], [x.profile for x in runs])
+        self.assertEqual([0, 2], [x.id for x in runs[0].new_apartments_0])
+        self.assertEqual([1, 2], [x.id for x in runs[1].new_apartments_0])
+        # the platform is requested once for all profiles
+        self.assertEqual(sorted(StubPlatform.pages), sorted(StubPlatform.requested))
+
+        runs = run_platform('stub', StubPlatform, self.profiles)
+        self.assertEqual([[], []], [x.new_apartments_0 for x in runs])
+
+    def test_journal_removed_after_all_profiles(self):
+        instances = {}
+        runs = run_platform('stub', StubPlatform, self.profiles, instances=instances)
+        self.assertEqual([None, None], [x.error for x in runs])
+        self.assertFalse(os.path.exists(self.get_path_journal('anna')))
+
+        # the second profile cannot save its apartments
+        StubPlatform.pages[f'{url_platform}4'] = create_apartment_raw(4, 700, 80333)
+        with mock.patch.object(instances['ben'].apartment_store, 'add_apartments', side_effect=OSError):
+            runs = run_platform('stub', StubPlatform, self.profiles, instances=instances)
+        self.assertIsNone(runs[0].error)
+        self.assertIsNotNone(runs[1].error)
+        self.assertTrue(os.path.exists(self.get_path_journal('anna')))
+
+        # the pages of the aborted run are taken from the journal
+        StubPlatform.requested = []
+        runs = run_platform('stub', StubPlatform, self.profiles, instances=instances)
+        self.assertEqual([[], [4]], [[x.id for x in run.new_apartments_0] for run in runs])
+        self.assertNotIn(f'{url_platform}4', StubPlatform.requested)
+        self.assertFalse(os.path.exists(self.get_path_journal('anna')))
+
+    def test_crawl_error_reported_once(self):
+        StubPlatform.pages[f'{url_platform}1'] = ConnectionError('platform not reachable')
+        for profile in self.profiles.values():
+            profile.update({'email_to_address': 'wohnung@example.com', 'email_send_status': True})
+
+        instances = {}
+        with mock.patch.object(platform_runner, 'send_error_mail') as send_error_mail:
+            runs = run_platform('stub', StubPlatform, self.profiles, instances=instances)
+        self.assertEqual(1, send_error_mail.call_count)
+        self.assertTrue(all(x.error is not None for x in runs))
+        self.assertEqual(['CRITICAL'], [x['type'] for x in instances['anna'].load_errors()])
+        self.assertEqual([], instances['ben'].load_errors())
+
+        self.profiles['ben']['email_to_address'] = 'ben@example.com'
+        with mock.patch.object(platform_runner, 'send_error_mail') as send_error_mail:
+            run_platform('stub', StubPlatform, self.profiles, instances=instances)
+        self.assertEqual(2, send_error_mail.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
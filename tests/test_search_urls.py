@@ -0,0 +1,99 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.search_urls import get_zip_prefixes, merge_listings
+from core.wohnungssucher_base import WohnungssucherBase
+from tests.test_profiles import create_config
+from wohnungssucher_platforms.ws_mietwohnungsboerse import WSMietwohnungsboerse, url, url_search
+
+
+class TestGetZipPrefixes(unittest.TestCase):
+
+    def test_full_zip_codes(self):
+        self.assertEqual(['80331', '80333'], get_zip_prefixes([80333, 80331, 80333], 2))
+
+    def test_shortened(self):
+        self.assertEqual(['8033', '8136'], get_zip_prefixes([80331, 80333, 81369], 2))
+        self.assertEqual(['80', '81'], get_zip_prefixes([80331, 80469, 81369], 2))
+
+    def test_leading_zero(self):
+        self.assertEqual(['01067', '01069'], get_zip_prefixes([1067, 1069], 8))
+        self.assertEqual(['010'], get_zip_prefixes([1067, 1099], 1))
+
+    def test_single_digit(self):
+        # prefixes of length 1 are returned even if they exceed max_prefixes
+        zips = [10115, 20095, 30159, 80331]
+        self.assertEqual(['1', '2', '3', '8'], get_zip_prefixes(zips, 3))
+
+    def test_no_zip_codes(self):
+        self.assertEqual([], get_zip_prefixes([], 8))
+
+
+class TestMergeListings(unittest.TestCase):
+
+    def test_interleaved(self):
+        self.assertEqual(['a1', 'b1', 'a2', 'b2', 'a3'], merge_listings([['a1', 'a2', 'a3'], ['b1', 'b2']]))
+
+    def test_duplicates(self):
+        # an url is kept at its first position
+        self.assertEqual(['a', 'b', 'c', 'd'], merge_listings([['a', 'c', 'b'], ['b', 'd', 'a']]))
+
+    def test_empty(self):
+        self.assertEqual([], merge_listings([]))
+        self.assertEqual(['a'], merge_listings([[], ['a'], []]))
+
+
+class TestGetSearchUrls(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def get_search_urls(self, *settings: dict) -> list[str]:
+        """
+        :param settings: settings of each profile
+        :return: search urls of the crawl for all profiles
+        """
+        platforms = []
+        for i, settings_each in enumerate(settings):
+            path_files = os.path.join(self.tempdir.name, str(i))
+            os.makedirs(path_files)
+            platforms.append(WSMietwohnungsboerse(create_config(path_files, **settings_each)))
+
+        urls = []
+        with mock.patch.object(WSMietwohnungsboerse, 'request_all_apartments_raw',
+                               side_effect=lambda: urls.extend(platforms[0].get_search_urls()) or []):
+            WohnungssucherBase.crawl_for_profiles(platforms)
+        for platform in platforms:
+            platform.apartment_store.close()
+        return urls
+
+    def test_zip_codes(self):
+        defaults = dict(create_config('')['defaults_user'], zip=False)
+        urls = self.get_search_urls({'zips_included': [80331], 'defaults_user': defaults},
+                                    {'zips_included': [81369], 'defaults_user': defaults})
+        self.assertEqual([url_search.format('80331'), url_search.format('81369')], urls)
+
+    def test_all_zip_codes(self):
+        defaults = dict(create_config('')['defaults_user'], zip=False)
+        urls = self.get_search_urls({'zips_included': [80331], 'defaults_user': defaults},
+                                    {'zips_included': None, 'defaults_user': defaults})
+        self.assertEqual([url], urls)
+
+    def test_missing_zip_accepted(self):
+        # apartments without zip code are only found by searching all zip codes
+        defaults = create_config('')['defaults_user']
+        urls = self.get_search_urls({'zips_included': [80331], 'defaults_user': dict(defaults, zip=False)},
+                                    {'zips_included': [81369], 'defaults_user': dict(defaults, zip=True)})
+        self.assertEqual([url], urls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import startup_profile
+from core.startup_profile import measure_startup, parse_importtime, path_root
+
+# modules only needed to send requests, parse responses or send emails
+modules_deferred = ['requests', 'smtplib', 'email.mime.multipart', 'email.mime.text', 'core.HtmlDecoder',
+                    'wohnungssucher_platforms.ws_gvg', 'wohnungssucher_platforms.ws_mietwohnungsboerse']
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_deferred_imports(self):
+        result = subprocess.run(
+            [sys.executable, '-c', 'import sys, main; print(" ".join(sys.modules))'],
+            cwd=path_root, capture_output=True, text=True, check=True
+        )
+        modules = result.stdout.split()
+        for module in modules_deferred:
+            self.assertNotIn(module, modules)
+
+    @unittest.skipUnless(importlib.util.find_spec('requests'), 'requests is not installed')
+    def test_measure_startup(self):
+        # the startup budget is checked by benchmarks/benchmark_startup.py since timings vary between machines
+        with tempfile.TemporaryDirectory() as path_files:
+            duration, steps, _ = measure_startup(path_files)
+        self.assertEqual(steps[0][0], 'import main')
+        self.assertGreater(duration, 0)
+
+    def test_print_startup_profile(self):
+        # the data files of the configuration are not touched
+        with mock.patch.object(startup_profile, 'measure_startup', return_value=(0.1, [], '')) as measure, \
+                mock.patch('builtins.print'):
+            startup_profile.print_startup_profile()
+        path_files = measure.call_args.args[0]
+        self.assertTrue(path_files.startswith(tempfile.gettempdir()))
+        self.assertFalse(os.path.exists(path_files))
+
+    def test_parse_importtime(self):
+        output = ('import time: self [us] | cumulative | imported package\n'
+                  'import time:       120 |        120 |     _io\n'
+                  'import time:       250 |        370 |   main\n')
+        self.assertEqual(parse_importtime(output), [('_io', 120, 120, 2), ('main', 250, 370, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
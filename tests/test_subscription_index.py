@@ -0,0 +1,120 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.subscription_index import IntervalIndex, SubscriptionIndex
+from core.utils import BoolPlus
+from tests.test_apartment_batch import Requirements, create_apartment, create_config, default_keys
+
+
+def create_defaults(rng: random.Random) -> dict:
+    return {x: rng.choice([True, False]) for x in default_keys}
+
+
+class TestIntervalIndex(unittest.TestCase):
+
+    def test_find(self):
+        index = IntervalIndex([(400, 900), (500, 1300), (900, 900), (1000, 500)])
+        self.assertEqual(0, index.find(399))
+        self.assertEqual(0b0001, index.find(400))
+        self.assertEqual(0b0001, index.find(450))
+        self.assertEqual(0b0011, index.find(500))
+        self.assertEqual(0b0111, index.find(900))
+        self.assertEqual(0b0010, index.find(901))
+        self.assertEqual(0b0010, index.find(1300))
+        self.assertEqual(0, index.find(1301))
+
+
+class TestSubscriptionIndex(unittest.TestCase):
+
+    def assertParity(self, subscriptions: list[tuple[dict, dict, dict]], apartments: list):
+        index = SubscriptionIndex()
+        requirements = []
+        for i, (config, defaults_0, defaults_1) in enumerate(subscriptions):
+            requirements.append(Requirements(config))
+            index.add(f'profile_{i}', requirements[-1], defaults_0, defaults_1)
+
+        for apartment in apartments:
+            expected = {}
+            for i, (_, defaults_0, defaults_1) in enumerate(subscriptions):
+                if requirements[i].check_apartment(apartment, defaults_0):
+                    expected[f'profile_{i}'] = 0
+                elif requirements[i].check_apartment(apartment, defaults_1):
+                    expected[f'profile_{i}'] = 1
+            self.assertEqual(expected, index.match(apartment), apartment.to_dict())
+
+    def test_random(self):
+        rng = random.Random(0)
+        subscriptions = [(create_config(rng), create_defaults(rng), create_defaults(rng)) for _ in range(40)]
+        self.assertParity(subscriptions, [create_apartment(rng, i) for i in range(500)])
+
+    def test_boundaries(self):
+        rng = random.Random(1)
+        subscriptions = []
+        for rent_cold_min, rent_cold_max in ((400, 900), (500, 500), (900, 400), (None, 900), (400, None)):
+            config = create_config(rng)
+            config.update({'rent_cold_min': rent_cold_min, 'rent_cold_max': rent_cold_max,
+                           'rooms_min': 2.5, 'rooms_max': 4})
+            defaults = {x: True for x in default_keys}
+            subscriptions.append((config, defaults, defaults))
+
+        apartments = []
+        for rent_cold in (None, 399, 400, 500, 900, 901):
+            for rooms in (None, 2.0, 2.5, 4.0, 4.5):
+                apartment = create_apartment(rng, len(apartments))
+                apartment.rent_cold = rent_cold
+                apartment.rooms = rooms
+                apartments.append(apartment)
+        self.assertParity(subscriptions, apartments)
+
+    def test_missing_values(self):
+        rng = random.Random(2)
+        apartments = [create_apartment(rng, i) for i in range(200)]
+        subscriptions = []
+        for key in default_keys:
+            defaults_0 = {x: True for x in default_keys}
+            defaults_0[key] = False
+            defaults_1 = {x: True for x in default_keys}
+            subscriptions.append((create_config(rng), defaults_0, defaults_1))
+            subscriptions.append((create_config(rng), defaults_1, defaults_0))
+        self.assertParity(subscriptions, apartments)
+
+    def test_exchange_apartment(self):
+        rng = random.Random(3)
+        subscriptions = []
+        for exchange_apartment in (None, BoolPlus.true(), BoolPlus.false(), BoolPlus.maybe()):
+            config = create_config(rng)
+            config['exchange_apartment'] = exchange_apartment
+            subscriptions.append((config, create_defaults(rng), create_defaults(rng)))
+        self.assertParity(subscriptions, [create_apartment(rng, i) for i in range(100)])
+
+    def test_rebuilt_after_add(self):
+        rng = random.Random(4)
+        config = create_config(rng)
+        config.update({
+            'zips_included': None, 'zips_excluded': None, 'places_included': None, 'places_excluded': None,
+            'rent_cold_min': None, 'rent_cold_max': 900, 'rent_warm_min': None, 'rent_warm_max': None,
+            'rooms_min': None, 'rooms_max': None, 'apartment_size_min': None, 'apartment_size_max': None,
+            'floors': None, 'energy_efficiency_classes': None, 'year_of_construction_min': None,
+            'year_of_construction_max': None, 'exchange_apartment': None
+        })
+        defaults = {x: True for x in default_keys}
+        apartment = create_apartment(rng, 0)
+        apartment.rent_cold = 1000
+
+        index = SubscriptionIndex()
+        self.assertEqual({}, index.match(apartment))
+        index.add('a', Requirements(config), defaults, defaults)
+        self.assertEqual({}, index.match(apartment))
+
+        config['rent_cold_max'] = None
+        index.add('b', Requirements(config), defaults, defaults)
+        self.assertEqual(2, len(index))
+        self.assertEqual({'b': 0}, index.match(apartment))
+
+
+if __name__ == '__main__':
+    unittest.main()
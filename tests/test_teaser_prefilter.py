@@ -0,0 +1,113 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.teaser_prefilter import create_teaser_apartment, extract_teaser, is_candidate, parse_teaser_number
+from tests.test_profiles import StubPlatform, create_config, url_platform
+
+
+class TestExtractTeaser(unittest.TestCase):
+
+    def test_labeled_values(self):
+        html = ('<div><span>Kaltmiete:</span>&nbsp;<b>850 €</b></div><div>Warmmiete 1.050,00 EUR</div>'
+                '<div>3 Zimmer</div><div>Wohnfläche: ca. 75,5 m²</div>')
+        self.assertEqual({'rent_cold': '850', 'rent_warm': '1.050,00', 'rooms': '3', 'apartment_size': '75,5 m'},
+                         extract_teaser(html))
+
+    def test_ambiguous_values(self):
+        # values found multiple times with different values are not extracted
+        html = '<div>2 Zimmer</div><div>Zimmer: 3</div><div>Kaltmiete: 850 €</div>'
+        self.assertEqual({'rent_cold': '850'}, extract_teaser(html))
+
+    def test_unlabeled_values(self):
+        self.assertEqual({}, extract_teaser('<div>850 €</div><div>75 m²</div>'))
+
+
+class TestParseTeaserNumber(unittest.TestCase):
+
+    def test_german_format(self):
+        self.assertEqual(1250.5, parse_teaser_number('1.250,50'))
+        self.assertEqual(1200, parse_teaser_number('1.200,-'))
+        self.assertEqual(60.5, parse_teaser_number('60,5 m'))
+        self.assertEqual(850, parse_teaser_number('850,-'))
+
+    def test_decimal_point(self):
+        self.assertEqual(850.5, parse_teaser_number('850.50'))
+        self.assertEqual(2.5, parse_teaser_number('2.5'))
+        self.assertEqual(75, parse_teaser_number('75 m'))
+
+    def test_ambiguous(self):
+        # thousands separator or decimal point
+        self.assertIsNone(parse_teaser_number('1.200'))
+        self.assertIsNone(parse_teaser_number('1.200 m'))
+        self.assertIsNone(parse_teaser_number('1.250.000'))
+        self.assertIsNone(parse_teaser_number('1,250.50'))
+        self.assertIsNone(parse_teaser_number('1,250,000'))
+
+    def test_invalid(self):
+        self.assertIsNone(parse_teaser_number(''))
+        self.assertIsNone(parse_teaser_number('auf Anfrage'))
+
+
+class TestIsCandidate(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.profiles = []
+
+    def tearDown(self):
+        for profile in self.profiles:
+            profile.apartment_store.close()
+        self.tempdir.cleanup()
+
+    def create_profile(self, **settings) -> StubPlatform:
+        path_files = os.path.join(self.tempdir.name, str(len(self.profiles)))
+        self.profiles.append(StubPlatform(create_config(path_files, **settings)))
+        return self.profiles[-1]
+
+    def assertCandidate(self, is_expected: bool, html: str, profiles: list[StubPlatform]):
+        apartment = create_teaser_apartment(f'{url_platform}1', extract_teaser(html))
+        self.assertEqual(is_expected, is_candidate(apartment, profiles), html)
+
+    def test_violated_requirement(self):
+        profiles = [self.create_profile(rent_cold_max=900, apartment_size_min=50)]
+        self.assertCandidate(False, 'Kaltmiete: 950 €', profiles)
+        self.assertCandidate(False, '<div>Wohnfläche: 45 m²</div>', profiles)
+        self.assertCandidate(True, 'Kaltmiete: 850,50 €', profiles)
+        self.assertCandidate(False, 'Kaltmiete: 1.250,00 €', profiles)
+
+    def test_any_profile(self):
+        profiles = [self.create_profile(rent_cold_max=900), self.create_profile(rent_cold_max=1000)]
+        self.assertCandidate(True, 'Kaltmiete: 950 €', profiles)
+        self.assertCandidate(False, 'Kaltmiete: 1050 €', profiles)
+
+    def test_missing_values(self):
+        # missing values never skip an apartment, even if the defaults of the profile reject them
+        profiles = [self.create_profile(rent_cold_max=900, rooms_min=2)]
+        self.assertCandidate(True, '<div>Neubau</div>', profiles)
+        self.assertCandidate(True, 'Kaltmiete: auf Anfrage', profiles)
+
+    def test_ambiguous_values(self):
+        profiles = [self.create_profile(rent_cold_max=900, apartment_size_max=100)]
+        # values found multiple times
+        self.assertCandidate(True, 'Kaltmiete: 950 € Kaltmiete: 850 €', profiles)
+        # thousands separator or decimal point
+        self.assertCandidate(True, 'Kaltmiete: 1.200 €', profiles)
+
+    def test_thousands_separator_in_size(self):
+        # "1.200 m²" is not read as 1.2 m² and does not skip the apartment
+        profiles = [self.create_profile(apartment_size_min=50)]
+        self.assertCandidate(True, 'Wohnfläche: 1.200 m²', profiles)
+        self.assertCandidate(False, 'Wohnfläche: 1,2 m²', profiles)
+
+    def test_decimal_point_in_rent(self):
+        # "850.50 €" is not read as 85050 € and does not skip the apartment
+        profiles = [self.create_profile(rent_cold_max=900)]
+        self.assertCandidate(True, 'Kaltmiete: 850.50 €', profiles)
+
+
+if __name__ == '__main__':
+    unittest.main()
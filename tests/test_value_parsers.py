@@ -0,0 +1,149 @@
+import os
+import re
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import value_parsers
+from core.value_parsers import FieldParser, field_parsers
+from core.wohnungssucher_base import WohnungssucherBase
+from tests.test_profiles import StubPlatform, create_apartment_raw, create_config
+
+
+# parsers of the previous version of WohnungssucherBase._parse_apartments, the expected behaviour
+def parse_int_from_euro(number):
+    if isinstance(number, int):
+        return number
+    try:
+        number = re.sub('[€ .]', '', number)
+        number = re.sub('[,]', '.', number)
+        return int(float(number))
+    except:
+        raise TypeError
+
+
+def parse_float_from_apt_size(apt_size):
+    if isinstance(apt_size, float):
+        return apt_size
+    try:
+        apt_size_float = re.findall('\\d[\\d.,]*', apt_size)[0]
+        return float(apt_size_float.replace(',', '.'))
+    except:
+        raise TypeError
+
+
+def parse_int_from_floor(floor):
+    if isinstance(floor, int):
+        return floor
+    if floor.strip() in ['EG', 'Erdgeschoss']:
+        return 0
+    try:
+        return int(re.findall('\\d+', floor)[0])
+    except:
+        raise TypeError
+
+
+parsers_previous = {
+    'zip': int,
+    'house_number': int,
+    'rent_cold': parse_int_from_euro,
+    'rent_warm': parse_int_from_euro,
+    'rooms': lambda x: float(x.replace(',', '.')),
+    'apartment_size': parse_float_from_apt_size,
+    'floor': parse_int_from_floor,
+    'year_of_construction': int
+}
+
+values_raw = {
+    'zip': ['80331', ' 80331', '8033a', '', 80331, 80331.0],
+    'house_number': ['1', '12', '12a', '1-3', 7],
+    'rent_cold': ['800', '800 €', '1.250,00 €', '1250.5', '850,50 €', 'auf Anfrage', '', 900, '1 250 €'],
+    'rent_warm': ['1.000 €', '999,99', '€', 1100],
+    'rooms': ['2', '2,5', '3.5', 'drei', ''],
+    'apartment_size': ['60 m²', '60,5 m²', 'ca. 75.25 m²', 'm²', 60.5],
+    'floor': ['EG', ' Erdgeschoss ', '1. OG', '3', 'DG', 2],
+    'year_of_construction': ['1990', '1990.0', 'unbekannt', 2001]
+}
+
+
+def parse_previous(field: str, value):
+    try:
+        return parsers_previous[field](value)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+class TestFieldParsers(unittest.TestCase):
+
+    def test_parity(self):
+        self.assertEqual(sorted(parsers_previous), sorted(x.field for x in field_parsers))
+        for field_parser in field_parsers:
+            for value in values_raw[field_parser.field]:
+                expected = parse_previous(field_parser.field, value)
+                if field_parser.field == 'rooms' and isinstance(value, (int, float)):
+                    # numeric values raised AttributeError before
+                    expected = float(value)
+                with self.subTest(field=field_parser.field, value=value):
+                    self.assertEqual(expected, field_parser(value))
+                    # cached result
+                    self.assertEqual(expected, field_parser(value))
+
+    def test_static_methods(self):
+        for value in values_raw['rent_cold']:
+            self.assertEqual(parse_previous('rent_cold', value), _parse(WohnungssucherBase.parse_int_from_euro, value))
+        for value in values_raw['apartment_size']:
+            self.assertEqual(parse_previous('apartment_size', value),
+                             _parse(WohnungssucherBase.parse_float_from_apt_size, value))
+        for value in values_raw['floor']:
+            self.assertEqual(parse_previous('floor', value), _parse(WohnungssucherBase.parse_int_from_floor, value))
+
+    def test_cache_typed(self):
+        calls = []
+
+        def parse(value):
+            calls.append(value)
+            return int(value)
+
+        field_parser = FieldParser('zip', 'zip code', parse)
+        self.assertEqual(1, field_parser(1))
+        self.assertEqual(1, field_parser(1.0))
+        self.assertEqual(1, field_parser(1))
+        self.assertEqual([1, 1.0], calls)
+
+    def test_unhashable_value(self):
+        field_parser = FieldParser('rooms', 'number of rooms', value_parsers.parse_float_from_rooms)
+        self.assertIsNone(field_parser(['2']))
+
+
+def _parse(parse, value):
+    try:
+        return parse(value)
+    except (ValueError, TypeError):
+        return None
+
+
+class TestParseApartments(unittest.TestCase):
+
+    def test_parse_failures_logged_once(self):
+        with tempfile.TemporaryDirectory() as path_files:
+            platform = StubPlatform(create_config(path_files))
+            apartments_raw = [create_apartment_raw(i) for i in range(3)]
+            for apartment_raw in apartments_raw[1:]:
+                apartment_raw['rent_cold'] = 'auf Anfrage'
+            apartments = platform._parse_apartments(apartments_raw)
+
+            self.assertEqual([800, None, None], [x.rent_cold for x in apartments])
+            self.assertEqual([60.0] * 3, [x.apartment_size for x in apartments])
+            self.assertEqual({('rent_cold', 'auf Anfrage'): 2}, platform.parse_failures)
+
+            platform._log_parse_failures()
+            self.assertEqual({}, platform.parse_failures)
+            self.assertEqual(['Error: Cannot parse rent_cold "auf Anfrage" (2 apartments)'],
+                             [x['msg'] for x in platform.occurred_errors])
+            platform.apartment_store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
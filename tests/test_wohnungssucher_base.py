@@ -0,0 +1,425 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import apartment_batch, checkpoint, wohnungssucher_base
+from core.apartment_history import ApartmentHistory
+from core.apartment_store import JsonApartmentStore
+from core.checkpoint import MailOutbox
+from core.known_id_index import KnownIdIndex
+from core.platform_runner import run_platform
+from tests.test_profiles import StubPlatform, create_apartment_raw, create_config, url_platform
+from wohnungssucher_platforms.ws_gvg import WSGVG
+from wohnungssucher_platforms.ws_mietwohnungsboerse import WSMietwohnungsboerse
+
+
+class SlowStubPlatform(StubPlatform):
+    """
+    Stub platform whose requests of the pages in slow_pages block until released is set
+    """
+    slow_pages: set[str] = set()
+    released = threading.Event()
+
+    def request_apartment(self, url: str) -> dict | None:
+        if url in self.slow_pages:
+            self.released.wait(10)
+        return super().request_apartment(url)
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        StubPlatform.pages = {f'{url_platform}{i}': create_apartment_raw(i) for i in range(3)}
+        StubPlatform.requested = []
+        self.platform = StubPlatform(create_config(self.tempdir.name))
+
+    def tearDown(self):
+        self.platform.apartment_store.close()
+        self.tempdir.cleanup()
+
+    def test_lazy(self):
+        self.platform._begin_run()
+        apartments = self.platform.request_all_apartments()
+        self.assertEqual([], StubPlatform.requested)
+        self.assertEqual(0, next(apartments).id)
+        # the following pages are only requested once the apartment has been processed
+        self.assertEqual([f'{url_platform}0'], StubPlatform.requested)
+        self.assertEqual([1, 2], [x.id for x in apartments])
+
+    def test_processed_while_requesting(self):
+        events = []
+        request_apartment = self.platform.request_apartment
+        process_apartment = self.platform._process_apartment
+        with mock.patch.object(self.platform, 'request_apartment',
+                               side_effect=lambda x: events.append(x) or request_apartment(x)), \
+                mock.patch.object(self.platform, '_process_apartment',
+                                  side_effect=lambda x: events.append(x.id) or process_apartment(x)):
+            self.platform.crawl_for_profiles([self.platform])
+        # each apartment is processed before the next page is requested
+        self.assertEqual([f'{url_platform}0', 0, f'{url_platform}1', 1, f'{url_platform}2', 2], events)
+
+    def test_parse_failure(self):
+        # an unparsable value of one page does not stop the stream
+        StubPlatform.pages[f'{url_platform}1']['rent_cold'] = 'auf Anfrage'
+        self.platform._begin_run()
+        apartments = list(self.platform.request_all_apartments())
+        self.assertEqual([0, 1, 2], [x.id for x in apartments])
+        self.assertEqual([800, None, 800], [x.rent_cold for x in apartments])
+        self.assertEqual(1, len(self.platform.parse_failures))
+
+
+class TestTimeBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.profiles = {'default': create_config(self.tempdir.name, platform_time_budget=0.3)}
+        StubPlatform.pages = {f'{url_platform}{i}': create_apartment_raw(i) for i in range(4)}
+        StubPlatform.requested = []
+        SlowStubPlatform.slow_pages = {f'{url_platform}1'}
+        SlowStubPlatform.released = threading.Event()
+
+    def tearDown(self):
+        SlowStubPlatform.released.set()
+        self.tempdir.cleanup()
+
+    def load_pending_pages(self) -> list[str]:
+        with open(os.path.join(self.tempdir.name, 'stub_0_pending_pages.json'), 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def assertBudgetKept(self, max_parallel_requests: int) -> list:
+        """
+        :return: ids of the new apartments of the run
+        """
+        instances = {}
+        platform = SlowStubPlatform(self.profiles['default'])
+        platform.max_parallel_requests = max_parallel_requests
+        instances['default'] = platform
+
+        start = time.monotonic()
+        runs = run_platform('stub', SlowStubPlatform, self.profiles, instances=instances)
+        # the run does not wait for the blocked request
+        self.assertLess(time.monotonic() - start, 3)
+
+        self.assertIsNone(runs[0].error)
+        self.assertIn(0, [x.id for x in runs[0].new_apartments_0])
+        self.assertNotIn(1, [x.id for x in runs[0].new_apartments_0])
+        self.assertIn(f'{url_platform}1', self.load_pending_pages())
+        self.assertIn(0, [x.id for x in platform.apartment_store.load_apartments(0)])
+        platform.apartment_store.close()
+        return [x.id for x in runs[0].new_apartments_0]
+
+    def test_sequential(self):
+        self.assertBudgetKept(1)
+
+    def test_parallel(self):
+        # the pages loaded in parallel to the blocked request are kept
+        self.assertEqual([0, 2, 3], sorted(self.assertBudgetKept(2)))
+        self.assertEqual([f'{url_platform}1'], self.load_pending_pages())
+
+    def test_pending_pages_requested_first(self):
+        self.assertBudgetKept(1)
+
+        SlowStubPlatform.released.set()
+        StubPlatform.requested = []
+        platform = SlowStubPlatform(self.profiles['default'])
+        runs = run_platform('stub', SlowStubPlatform, self.profiles, instances={'default': platform})
+        self.assertEqual(f'{url_platform}1', StubPlatform.requested[0])
+        self.assertIn(1, [x.id for x in runs[0].new_apartments_0])
+        self.assertEqual([], self.load_pending_pages())
+        platform.apartment_store.close()
+
+
+class ListingStubPlatform(StubPlatform):
+    """
+    Stub platform requesting two search result pages first, each advancing the clock by one second
+    (see TestTimeBudgetListing)
+    """
+    clock = 0.0
+
+    def __init__(self, config: dict):
+        super().__init__(config)
+        self._session = mock.Mock()
+        self._session.get.side_effect = self.get
+
+    @staticmethod
+    def get(url: str) -> mock.Mock:
+        ListingStubPlatform.clock += 1
+        return mock.Mock(status_code=200, text='<html></html>')
+
+    def request_all_apartments_raw(self):
+        self.request_urls([f'{url_platform}search?plz=80', f'{url_platform}search?plz=81'])
+        yield from super().request_all_apartments_raw()
+
+
+class TestTimeBudgetListing(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        StubPlatform.pages = {f'{url_platform}{i}': create_apartment_raw(i) for i in range(3)}
+        StubPlatform.requested = []
+        ListingStubPlatform.clock = 0.0
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_exhausted_by_listing(self):
+        # the budget is exhausted while requesting the second search result page
+        profiles = {'default': create_config(self.tempdir.name, platform_time_budget=1.5)}
+        with mock.patch.object(wohnungssucher_base, 'monotonic', side_effect=lambda: ListingStubPlatform.clock):
+            runs = run_platform('stub', ListingStubPlatform, profiles)
+
+        # the run ends normally without apartments, all pages are requested by the next run
+        self.assertIsNone(runs[0].error)
+        self.assertEqual([], runs[0].new_apartments_0)
+        self.assertEqual([], StubPlatform.requested)
+        with open(os.path.join(self.tempdir.name, 'stub_0_pending_pages.json'), 'r', encoding='utf-8') as file:
+            self.assertEqual(list(StubPlatform.pages), json.load(file))
+        self.assertTrue(any('Time budget of 1.5 s exhausted' in x['msg'] for x in _load_errors(self.tempdir.name)))
+
+
+class Crash(Exception):
+    """
+    Aborts a run like killing the process
+    """
+
+
+class TestSaveAndSend(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.profiles = {'default': create_config(self.tempdir.name, email_to_address='wohnung@example.com')}
+        StubPlatform.pages = {f'{url_platform}{i}': create_apartment_raw(i) for i in range(3)}
+        StubPlatform.requested = []
+        self.mails = []
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def run_platform(self, target: object | None = None, attribute: str | None = None) -> list:
+        """
+        Runs the stub platform and records the sent emails
+        :param target: object whose attribute raises Crash during the run or None to run without crash
+        """
+        with mock.patch.object(checkpoint, 'send_mail', side_effect=lambda **x: self.mails.append(x)):
+            if target is None:
+                return run_platform('stub', StubPlatform, self.profiles)
+            with mock.patch.object(target, attribute, side_effect=Crash):
+                return run_platform('stub', StubPlatform, self.profiles)
+
+    def assertCrashRecovered(self, target: object, attribute: str):
+        runs = self.run_platform(target, attribute)
+        self.assertIn('Crash', runs[0].error)
+
+        StubPlatform.requested = []
+        runs = self.run_platform()
+        self.assertIsNone(runs[0].error)
+        # the pages are taken from the crawl journal
+        self.assertEqual([], StubPlatform.requested)
+
+        # each apartment is sent exactly once
+        for i in range(3):
+            self.assertEqual(1, sum(f'{url_platform}{i}' in x['msg_html'] for x in self.mails), i)
+        store = JsonApartmentStore(os.path.join(self.tempdir.name, 'stub_0.json'),
+                                   os.path.join(self.tempdir.name, 'stub_1.json'))
+        self.assertEqual([0, 1, 2], sorted(x.id for x in store.load_apartments(0)))
+        self.assertEqual([], MailOutbox(os.path.join(self.tempdir.name, 'stub_0_outbox.json')).load())
+        self.assertFalse(os.path.exists(os.path.join(self.tempdir.name, 'stub_0_journal.jsonl')))
+
+    def test_crash_before_outbox(self):
+        self.assertCrashRecovered(MailOutbox, 'add')
+
+    def test_crash_before_saving_apartments(self):
+        self.assertCrashRecovered(JsonApartmentStore, 'add_apartments')
+
+    def test_crash_before_updating_known_ids(self):
+        self.assertCrashRecovered(KnownIdIndex, 'add')
+
+    def test_crash_before_saving_history(self):
+        self.assertCrashRecovered(ApartmentHistory, 'save')
+
+    def test_crash_while_sending(self):
+        self.assertCrashRecovered(checkpoint, 'send_mail')
+
+    def test_outdated_outbox_apartment_not_saved(self):
+        self.run_platform()
+        # the email of an apartment which has been saved already could not be sent
+        outbox = MailOutbox(os.path.join(self.tempdir.name, 'stub_0_outbox.json'))
+        apartment = dict(create_apartment_raw(0), rent_cold=700, rent_warm=900, rooms=2.0, apartment_size=60.0,
+                         zip=80331, house_number=1, floor=1, year_of_construction=1990, released=0.0)
+        outbox.add({'from_addr': '', 'to_addr': 'wohnung@example.com', 'subject': '', 'msg_html': ''},
+                   [[apartment], []])
+
+        self.run_platform()
+        store = JsonApartmentStore(os.path.join(self.tempdir.name, 'stub_0.json'),
+                                   os.path.join(self.tempdir.name, 'stub_1.json'))
+        self.assertEqual(800, {x.id: x for x in store.load_apartments(0)}[0].rent_cold)
+        self.assertEqual([], outbox.load())
+
+
+class ClockStubPlatform(StubPlatform):
+    """
+    Stub platform advancing the clock by one second per requested page (see TestNotifyEarly)
+    """
+    clock = 0.0
+
+    def request_apartment(self, url: str) -> dict | None:
+        ClockStubPlatform.clock += 1
+        return super().request_apartment(url)
+
+    def get_apartment_id_from_url(self, url: str):
+        return int(url[len(url_platform):])
+
+
+class TestNotifyEarly(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        StubPlatform.pages = {f'{url_platform}{i}': create_apartment_raw(i) for i in range(5)}
+        StubPlatform.requested = []
+        ClockStubPlatform.clock = 0.0
+        self.mails = []
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def run_platform(self, send_mail=None, **settings) -> list:
+        """
+        :return: ids of the apartments of each sent email
+        """
+        profiles = {'default': create_config(self.tempdir.name, email_to_address='wohnung@example.com', **settings)}
+
+        def record_mail(**mail):
+            if send_mail is not None:
+                send_mail()
+            self.mails.append([i for i in range(5) if f'{url_platform}{i}"' in mail['msg_html']])
+
+        with mock.patch.object(checkpoint, 'send_mail', side_effect=record_mail), \
+                mock.patch.object(wohnungssucher_base, 'monotonic', side_effect=lambda: ClockStubPlatform.clock):
+            return run_platform('stub', ClockStubPlatform, profiles)
+
+    def test_batch_size(self):
+        self.run_platform(notify_early_batch_size=2)
+        self.assertEqual([[0, 1], [2, 3], [4]], self.mails)
+
+    def test_interval(self):
+        self.run_platform(notify_early_batch_size=100, notify_early_interval=2.5)
+        # the first apartment is found after 1 s, the batch is sent once 4 s have passed
+        self.assertEqual([[0, 1, 2, 3], [4]], self.mails)
+
+    def test_early_send_fails(self):
+        errors = [ConnectionRefusedError]
+
+        def send_mail():
+            if errors:
+                raise errors.pop()
+
+        runs = self.run_platform(send_mail, notify_early_batch_size=2)
+        self.assertIsNone(runs[0].error)
+        # the failed email is kept in the outbox and sent with the next one
+        self.assertEqual([[0, 1], [2, 3], [4]], self.mails)
+        self.assertEqual([0, 1, 2, 3, 4], [x.id for x in runs[0].new_apartments_0])
+        self.assertTrue(any('Could not send email' in x['msg'] for x in _load_errors(self.tempdir.name)))
+
+    def test_final_send_fails(self):
+        def send_mail():
+            raise ConnectionRefusedError
+
+        runs = self.run_platform(send_mail, notify_early_batch_size=2)
+        self.assertIn('ConnectionRefusedError', runs[0].error)
+        self.assertEqual(3, len(MailOutbox(os.path.join(self.tempdir.name, 'stub_0_outbox.json')).load()))
+
+
+def _load_errors(path_files: str) -> list[dict]:
+    platform = StubPlatform(create_config(path_files))
+    errors = platform.load_errors()
+    platform.apartment_store.close()
+    return errors
+
+
+class TestPrioritizePages(unittest.TestCase):
+
+    def test_order(self):
+        with tempfile.TemporaryDirectory() as path_files:
+            platform = ClockStubPlatform(create_config(path_files))
+            platform.pending_pages_previous = {f'{url_platform}5', f'{url_platform}2'}
+            platform.known_id_index.add([1, 2, 4])
+            urls = [f'{url_platform}{i}' for i in range(6)] + [f'{url_platform}x']
+            with mock.patch.object(platform, 'get_apartment_id_from_url',
+                                   side_effect=lambda x: None if x.endswith('x') else int(x[len(url_platform):])):
+                prioritized = platform._prioritize_pages(urls)
+            platform.apartment_store.close()
+
+        # pending pages, unknown apartments and known apartments, each in the order of the listing
+        self.assertEqual([f'{url_platform}{x}' for x in ['2', '5', '0', '3', 'x', '1', '4']], prioritized)
+
+
+class TestSearchStoredApartments(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        StubPlatform.pages = {
+            f'{url_platform}{i}': create_apartment_raw(i, rent_cold) for i, rent_cold in enumerate([800, 1000, 850])
+        }
+        StubPlatform.pages[f'{url_platform}3'] = dict(create_apartment_raw(3), rent_cold=None)
+        StubPlatform.requested = []
+        run_platform('stub', StubPlatform, {'default': create_config(self.tempdir.name)})
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def search(self) -> tuple[list, list]:
+        platform = StubPlatform(create_config(self.tempdir.name, rent_cold_max=900))
+        apts_0, apts_1 = platform.search_stored_apartments()
+        platform.apartment_store.close()
+        return sorted(x['id'] for x in apts_0), sorted(x['id'] for x in apts_1)
+
+    def test_without_numpy(self):
+        with mock.patch.object(apartment_batch, 'np', None):
+            self.assertEqual(([0, 2], [3]), self.search())
+
+    @unittest.skipIf(apartment_batch.np is None, 'NumPy is not installed')
+    def test_batch_filter(self):
+        self.assertEqual(([0, 2], [3]), self.search())
+
+
+class TestGetApartmentIdFromUrl(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_gvg(self):
+        platform = WSGVG(create_config(self.tempdir.name))
+        url = 'https://www.gvgnet.de/mietobjekte/wohnung-123/'
+        self.assertEqual('wohnung-123', platform.get_apartment_id_from_url(url))
+        self.assertIsNone(platform.get_apartment_id_from_url('https://www.gvgnet.de/kontakt/'))
+
+        # pages of known apartments are requested last
+        platform.pending_pages_previous = set()
+        platform.known_id_index.add(['wohnung-1'])
+        urls = [f'https://www.gvgnet.de/mietobjekte/wohnung-{i}/' for i in range(3)]
+        self.assertEqual([urls[0], urls[2], urls[1]], platform._prioritize_pages(urls))
+        platform.apartment_store.close()
+
+    def test_mietwohnungsboerse(self):
+        # the id is only shown on the apartment page, the order of the listing is kept
+        platform = WSMietwohnungsboerse(create_config(self.tempdir.name))
+        urls = [f'https://www.mietwohnungsboerse.de/Immobilien/Wohnung-{i}.htm' for i in range(3)]
+        self.assertIsNone(platform.get_apartment_id_from_url(urls[0]))
+        platform.pending_pages_previous = set()
+        self.assertEqual(urls, platform._prioritize_pages(urls))
+        platform.apartment_store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,8 @@ Set any value to None to ignore it
 
 # All zip codes an apartments can be located (Postleitzahlen inklusive).
 # e.g., [80331, 85560]
+# Platforms supporting a search by zip code (e.g., Mietwohnungsboerse) are only searched for these zip codes,
+# unless defaults['zip'] accepts apartments without zip code.
 zips_included: list[int] | None = None
 
 # All zip codes an apartments should not be located (Postleitzahlen exklusive).
@@ -133,6 +135,25 @@ path_files: str = 'data'
 # Set to None to ignore
 max_apartment_age: int | None = None
 
+# Whether to evaluate the requirements that reject most apartments first.
+# This does not change which apartments are found, but speeds up filtering long lists of apartments.
+reorder_filter_checks: bool = False
+
+# Storage backend for known apartments
+# Valid values:
+# - 'json': one json file per platform and category, rewritten on every change
+# - 'sqlite': sqlite database (apartments.sqlite3) in path_files. Existing json files are migrated on the first run.
+# - 'jsonl': append-only log per platform and category. Existing json files are migrated on the first run.
+# - 'binary': compact binary file per platform and category. Existing json files are migrated on the first run.
+storage_backend: str = 'json'
+
+# Only for storage_backend 'jsonl': share of removed records (0.0 - 1.0) in a log that triggers rewriting the log
+jsonl_compaction_threshold: float = 0.3
+
+# Delete logged errors which are older than this number of days. The errors are deleted in blocks of one week.
+# Set to None to keep all errors
+error_log_retention: int | None = None
+
 # The sender's email address used to send notifications about new apartment listings.
 email_from_address: str = ''
 
@@ -146,4 +167,69 @@ email_send_status: bool = False
 
 # Whether to only send an email listing new apartment if there are new apartments available.
 # If set to False an email will be sent after each run (by default: daily) even if there are no new apartments available.
-notify_on_new_apartments_only: bool = True
\ No newline at end of file
+notify_on_new_apartments_only: bool = True
+
+# Whether to notify about apartments that have already been sent but whose cold or warm rent has been reduced since.
+notify_on_price_drop: bool = False
+
+# Number of new apartments after which an email is sent while a platform is still being searched.
+# The remaining apartments are sent at the end of the run. Set to None to send a single email per run.
+notify_early_batch_size: int | None = None
+
+# Only for notify_early_batch_size: seconds after which new apartments are sent while a platform is still being
+# searched, even if notify_early_batch_size has not been reached. Set to None to only send full batches.
+notify_early_interval: int | None = None
+
+# Short names of the apartment platforms to search (see core/platform_registry.py), e.g., ['gvg'].
+# Other platforms are neither loaded nor searched. Set to None to search all platforms.
+# Changes are not applied by reloading the daemon, restart it instead.
+platforms_enabled: list[str] | None = None
+
+# Maximum number of apartment platforms that are searched in parallel.
+# Set to None to search all platforms at the same time.
+max_parallel_platforms: int | None = None
+
+# Maximum number of seconds each run of a platform may take to request apartments.
+# If a platform is slow, the apartments requested so far are saved and sent and the skipped apartments are requested
+# first by the next run. Set to None to request all apartments regardless of the duration.
+platform_time_budget: int | None = None
+
+# Only for the daemon mode (main.py --daemon): minutes between two runs of each platform
+daemon_interval: int = 1440
+
+# Only for the daemon mode: minutes between two runs of single platforms overriding daemon_interval and the default
+# interval of the platform (see core/platform_registry.py),
+# e.g., {'gvg': 60}
+platform_intervals: dict[str, int] = {}
+
+# Only for the daemon mode: whether to adapt the interval of each platform to the number of new apartments it
+# published on the same weekday in the past weeks. Replaces daemon_interval and platform_intervals, but no platform is
+# searched less often than every daemon_interval minutes. The chosen intervals are printed once per day.
+adaptive_polling: bool = False
+
+# Only for adaptive_polling: average time in minutes between the release of an apartment and the notification
+# to be reached. Platforms are not searched more often than required for this.
+polling_target_latency: int = 60
+
+# Only for adaptive_polling: maximum number of runs per day of all platforms together.
+# Platforms publishing more apartments are searched more often. Each platform is still searched at least every
+# daemon_interval minutes, even if this exceeds the budget.
+polling_budget: int = 48
+
+# Whether to detect apartments listed on multiple platforms.
+# Such apartments are fully listed only in the first email and only referenced in the emails of other platforms.
+# The stored apartments of all platforms are loaded at startup to detect them.
+detect_duplicates_across_platforms: bool = False
+
+# Additional search profiles, e.g., for several persons searching for apartments at the same time.
+# Each platform is requested only once per run, the apartments are filtered, stored and sent separately per profile.
+# Maps the name of each profile to all settings that differ from the settings above, e.g.:
+# profiles = {
+#     'anna': {'rent_cold_max': 900, 'email_to_address': 'anna@example.com'},
+#     'ben': {'rooms_min': 3, 'email_to_address': 'ben@example.com'}
+# }
+# The files of each profile are stored in a subdirectory of path_files named like the profile.
+# Settings affecting the whole run (platforms_enabled, max_parallel_platforms, platform_time_budget and the settings
+# of the daemon mode) apply to all profiles and cannot be set per profile.
+# Set to None to only use the settings above.
+profiles: dict[str, dict] | None = None
@@ -17,6 +17,7 @@ default_exchange_apartment: No
 """
 import os
 import re
+from collections.abc import Iterator
 
 from core.wohnungssucher_base import WohnungssucherBase
 
@@ -52,6 +53,7 @@ url = 'https://www.gvgnet.de/mietobjekte/wohnobjekte/'
 filename_savefile_0 = 'gvg_0.json'
 filename_savefile_1 = 'gvg_1.json'
 filename_logfile = 'gvg_errors.json'
+filename_id_index = 'gvg_known_ids.txt'
 
 
 ####################
@@ -63,6 +65,7 @@ class WSGVG(WohnungssucherBase):
         path_savefile_0 = os.path.join(config['path_files'], filename_savefile_0)
         path_savefile_1 = os.path.join(config['path_files'], filename_savefile_1)
         path_logfile = os.path.join(config['path_files'], filename_logfile)
+        path_id_index = os.path.join(config['path_files'], filename_id_index)
         super().__init__(
             config_user=config,
             defaults_ws=defaults_ws,
@@ -71,27 +74,31 @@ class WSGVG(WohnungssucherBase):
             path_savefile_0=path_savefile_0,
             path_savefile_1=path_savefile_1,
             path_logfile=path_logfile,
-            exp_keys_apts_raw=expected_keys_apts_raw
+            exp_keys_apts_raw=expected_keys_apts_raw,
+            path_id_index=path_id_index
         )
 
-    def request_all_apartments_raw(self) -> list[dict]:
+    def request_all_apartments_raw(self) -> Iterator[dict]:
         html_full = self.request_url(self.url_platform)
         if html_full is None:
             raise ValueError(f'Request to webpage with url "{self.url_platform}" returned status code different than 200')
 
         html_apts = html_full.get_elements_by_class('elementor-button elementor-button-link elementor-size-xs')
 
-        apartments_raw = []
+        urls_apts = []
         for html_apts_each in html_apts:
             url_apt = html_apts_each.attributes['href']
             if not url_apt.startswith('https://www.gvgnet.de/mietobjekte'):
                 continue
-            apt_raw = self.request_apartment(url_apt)
+            urls_apts.append(url_apt)
 
-            if apt_raw is not None:
-                apartments_raw.append(apt_raw)
+        yield from self.request_apartments(urls_apts)
 
-        return apartments_raw
+    def get_apartment_id_from_url(self, url: str) -> str | None:
+        apt_id = re.findall('mietobjekte/[^/]*', url)
+        if len(apt_id) != 1:
+            return None
+        return apt_id[0][12:]
 
     def request_apartment(self, url: str) -> dict | None:
         # load html of apartment
@@ -108,11 +115,11 @@ class WSGVG(WohnungssucherBase):
         apt_raw['url'] = url
 
         # extract id
-        apt_id = re.findall('mietobjekte/[^/]*', url)
-        if len(apt_id) != 1:
+        apt_id = self.get_apartment_id_from_url(url)
+        if apt_id is None:
             self.log_error(f'Could not find apartment id in url {url}. Maybe url format has changed? Skipping apartment')
             return None
-        apt_raw['id'] = apt_id[0][12:]
+        apt_raw['id'] = apt_id
 
         # extract description
         search_class = 'product_title entry-title elementor-heading-title elementor-size-default'
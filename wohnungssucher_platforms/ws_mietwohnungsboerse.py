@@ -1,6 +1,9 @@
 import os.path
 import re
+from collections.abc import Iterator
+from urllib.parse import quote
 
+from core.search_urls import get_zip_prefixes, merge_listings
 from core.wohnungssucher_base import WohnungssucherBase
 
 ##################
@@ -45,10 +48,14 @@ expected_keys_apts_raw = [
 ]
 
 apartment_portal_name = 'Mietwohnungsboerse'
-url = 'https://www.mietwohnungsboerse.de/Immobilien.htm?action_form=search&vermarktungsart=MIETE_PACHT&plz=8%2C9'
+url_search = 'https://www.mietwohnungsboerse.de/Immobilien.htm?action_form=search&vermarktungsart=MIETE_PACHT&plz={}'
+url = url_search.format(quote('8,9', safe=''))
+# maximum number of searches for zip code prefixes if the user only searches for specific zip codes
+max_searches = 8
 filename_savefile_0 = 'mietwohnungsboerse_0.json'
 filename_savefile_1 = 'mietwohnungsboerse_1.json'
 filename_logfile = 'mietwohnungsboerse_errors.json'
+filename_id_index = 'mietwohnungsboerse_known_ids.txt'
 
 ####################
 # CLASS DEFINITION #
@@ -60,6 +67,7 @@ class WSMietwohnungsboerse(WohnungssucherBase):
         path_savefile_0 = os.path.join(config['path_files'], filename_savefile_0)
         path_savefile_1 = os.path.join(config['path_files'], filename_savefile_1)
         path_logfile = os.path.join(config['path_files'], filename_logfile)
+        path_id_index = os.path.join(config['path_files'], filename_id_index)
         super().__init__(
             config_user=config,
             defaults_ws=defaults_ws,
@@ -68,27 +76,41 @@ class WSMietwohnungsboerse(WohnungssucherBase):
             path_savefile_0=path_savefile_0,
             path_savefile_1=path_savefile_1,
             path_logfile=path_logfile,
-            exp_keys_apts_raw=expected_keys_apts_raw
+            exp_keys_apts_raw=expected_keys_apts_raw,
+            path_id_index=path_id_index
         )
 
-    def request_all_apartments_raw(self) -> list[dict]:
-        html_full = self.request_url(self.url_platform)
-        if html_full is None:
-            raise ValueError(f'Request to webpage with url "{self.url_platform}" returned status code different than 200')
-        html_apts = html_full.get_element_by_id('immo-container-results')
-        if html_apts is None:
-            self.log_error_html_content_not_found('id', 'immo-container-results', critical=True)
-
-        apartments_raw = []
-        for html_apts_each in html_apts.children:
-            url_part = html_apts_each.children[1].children[0].attributes['href']
-            url_apt = self.parse_url(self.url_platform, url_part)
-            apt_raw = self.request_apartment(url_apt)
-
-            if apt_raw is not None:
-                apartments_raw.append(apt_raw)
-
-        return apartments_raw
+    def get_search_urls(self) -> list[str]:
+        # the search parameter plz filters by zip code prefixes
+        if self.zips_searched is None:
+            return [self.url_platform]
+        return [url_search.format(x) for x in get_zip_prefixes(self.zips_searched, max_searches)]
+
+    def request_all_apartments_raw(self) -> Iterator[dict]:
+        urls_search = self.get_search_urls()
+        listings = []
+        for url_search_each, html_full in zip(urls_search, self.request_urls(urls_search)):
+            if html_full is None:
+                raise ValueError(f'Request to webpage with url "{url_search_each}" '
+                                 f'returned status code different than 200')
+            html_apts = html_full.get_element_by_id('immo-container-results')
+            if html_apts is None:
+                self.log_error_html_content_not_found('id', 'immo-container-results', critical=True)
+
+            urls_apts = []
+            teasers = []
+            for html_apts_each in html_apts.children:
+                url_part = html_apts_each.children[1].children[0].attributes['href']
+                urls_apts.append(self.parse_url(self.url_platform, url_part))
+                teasers.append(html_apts_each.inner_html)
+            listings.append(self.prefilter_listing(urls_apts, teasers))
+
+        yield from self.request_apartments(merge_listings(listings))
+
+    def get_apartment_id_from_url(self, url: str) -> None:
+        # the id is the object number only shown on the apartment page, hence all pages are requested in the order
+        # of the listing (pages skipped by the previous run are still requested first)
+        return None
 
     def request_apartment(self, url: str) -> dict | None:
         # load html of apartment